@@ -0,0 +1,86 @@
+"""Байты и задержка на один /start: загрузка логотипа каждый раз против file_id.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_brand --starts 20 --uplink-kbit 1000
+
+Отправка фото моделируется как RTT плюс передача байтов через канал
+с заданной пропускной способностью (типичный канал поезда - 0.5-2 Мбит/с).
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+from types import SimpleNamespace
+
+from brand import BrandImage
+
+
+class UplinkMessage:
+    """Сообщение, отправка фото через которое стоит RTT + размер / канал"""
+
+    def __init__(self, rtt, uplink_bytes_per_s):
+        self.rtt = rtt
+        self.uplink = uplink_bytes_per_s
+        self.bytes_sent = 0
+
+    async def reply_photo(self, photo, **kwargs):
+        if isinstance(photo, str):
+            size = len(photo)
+        else:
+            size = len(photo) if isinstance(photo, bytes) else os.fstat(photo.fileno()).st_size
+        self.bytes_sent += size
+        await asyncio.sleep(self.rtt + size / self.uplink)
+        return SimpleNamespace(photo=[SimpleNamespace(file_id="AgACAgIAAxkBAAIBrand")])
+
+
+async def upload_every_time(path, message, starts):
+    latencies = []
+    for _ in range(starts):
+        started = time.perf_counter()
+        with open(path, "rb") as photo:
+            await message.reply_photo(photo)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+async def reuse_file_id(path, message, starts, cache_path):
+    brand = BrandImage(path, cache_path)
+    latencies = []
+    for _ in range(starts):
+        started = time.perf_counter()
+        await brand.send(message)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def report(name, latencies, message, starts):
+    print(
+        f"{name:>10}: байт на /start={message.bytes_sent / starts:10.0f}  "
+        f"первый={latencies[0] * 1000:7.0f} мс  p50={statistics.median(latencies) * 1000:7.0f} мс"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--image", default=os.getenv("BRAND_IMAGE_PATH", "assets/brand.jpg"))
+    parser.add_argument("--starts", type=int, default=20)
+    parser.add_argument("--rtt", type=float, default=0.15)
+    parser.add_argument("--uplink-kbit", type=float, default=1000)
+    args = parser.parse_args()
+    logging.getLogger("brand").setLevel(logging.WARNING)
+    uplink = args.uplink_kbit * 1000 / 8
+
+    print(f"Картинка: {args.image}, {os.path.getsize(args.image)} байт")
+    message = UplinkMessage(args.rtt, uplink)
+    report("upload", asyncio.run(upload_every_time(args.image, message, args.starts)), message, args.starts)
+    with tempfile.TemporaryDirectory() as tmp:
+        message = UplinkMessage(args.rtt, uplink)
+        latencies = asyncio.run(reuse_file_id(args.image, message, args.starts, os.path.join(tmp, "id.json")))
+        report("file_id", latencies, message, args.starts)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Рассылка объявления 10k пассажирам через OutboundQueue: скорость, лимиты Telegram и досылка после сбоя.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_broadcast --recipients 10000 --scale 10 --crash-at 0.5
+
+Заглушка Telegram (benchmarks/telegram_stub.py) отвечает 429 на сообщения
+сверх 30 в секунду на бота и сверх четырёх в секунду в чате, а доля
+--blocked пассажиров «заблокировала бота» (403). Лимиты заглушки и очереди
+умножены на scale, чтобы прогон занимал секунды, а не минуты; время
+в реальном масштабе - измеренное, умноженное на scale.
+С --crash-at бот «падает», обработав эту долю получателей: цикл событий
+закрывается без Broadcaster.stop(), как при SIGKILL, и новый Broadcaster
+досылает остаток из сохранённого состояния. Повторы - пассажиры, получившие
+объявление дважды (сообщения, отправленные после последнего сохранения).
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import tempfile
+import time
+
+from telegram.ext import ExtBot
+from telegram.request import HTTPXRequest
+
+from benchmarks.telegram_stub import TOKEN, TelegramStub
+from broadcast import Broadcaster
+from outbound import OutboundQueue
+from scheduler import DeletionScheduler
+
+CONDUCTOR_CHAT = -100123
+
+
+async def phase(stub, args, state_dir, recipients=None, stop_at=None):
+    """Один запуск бота: ставит рассылку (или досылает сохранённую) и ждёт её конца или stop_at обработанных"""
+    limiter = OutboundQueue(
+        global_rate=30 * args.scale, private_rate=1.0 * args.scale, private_burst=3 * args.scale
+    )
+    bot = ExtBot(
+        TOKEN, base_url=stub.base_url, rate_limiter=limiter,
+        request=HTTPXRequest(connection_pool_size=256, pool_timeout=None)
+    )
+    await bot.initialize()
+    scheduler = DeletionScheduler(bot, os.path.join(state_dir, "pending_deletions.json"))
+    broadcaster = Broadcaster(
+        bot, scheduler, os.path.join(state_dir, "broadcasts.json"),
+        concurrency=args.concurrency, save_interval=args.save_interval / args.scale
+    )
+    await broadcaster.start()
+    if recipients is not None:
+        broadcaster.announce("Красноярск через 15 минут, стоянка 15 минут", recipients, "поезд №042А",
+                             origin=CONDUCTOR_CHAT)
+    while len(broadcaster):
+        processed = broadcaster.delivered + broadcaster.blocked + broadcaster.failed
+        if stop_at is not None and processed >= stop_at:
+            # Сбой: задачи бота обрываются без stop() - ни последнего сохранения, ни отчёта
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await bot.shutdown()
+            return broadcaster.stats(), len(scheduler)
+        await asyncio.sleep(0.01)
+    await broadcaster.stop()
+    await bot.shutdown()
+    return broadcaster.stats(), len(scheduler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipients", type=int, default=10000)
+    parser.add_argument("--scale", type=float, default=10, help="множитель лимитов Telegram")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.05, help="задержка Bot API, с")
+    parser.add_argument("--blocked", type=float, default=0.02, help="доля пассажиров, заблокировавших бота")
+    parser.add_argument("--crash-at", type=float, default=0.5, help="доля получателей до сбоя; 0 - без сбоя")
+    parser.add_argument("--save-interval", type=float, default=5.0, help="в реальном масштабе, с")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    rng = random.Random(args.seed)
+    recipients = [100000000 + i for i in range(args.recipients)]
+    blocked = rng.sample(recipients, int(len(recipients) * args.blocked))
+    stub = TelegramStub(
+        latency=args.latency, flood_limit=int(30 * args.scale), chat_limit=int(4 * args.scale),
+        blocked_chats=blocked, seed=args.seed
+    ).start()
+
+    results = []
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory() as state_dir:
+        if args.crash_at:
+            results.append(asyncio.run(phase(stub, args, state_dir, recipients,
+                                             stop_at=int(len(recipients) * args.crash_at))))
+            results.append(asyncio.run(phase(stub, args, state_dir)))
+        else:
+            results.append(asyncio.run(phase(stub, args, state_dir, recipients)))
+    elapsed = time.perf_counter() - started
+    stub.stop()
+
+    # Счётчик сообщений заглушки по чатам: сколько раз каждый пассажир получил объявление
+    received = [stub._message_ids[chat_id] for chat_id in recipients]
+    delivered = sum(1 for count in received if count)
+    duplicates = sum(1 for count in received if count > 1)
+    rate = stub.calls["sendMessage"] / elapsed
+    print(f"Получателей: {len(recipients):,}, заблокировали бота: {len(blocked):,}, "
+          f"лимит: {30 * args.scale:.0f} сообщений/с (scale {args.scale:g})\n")
+    for number, (stats, deletions) in enumerate(results, 1):
+        print(f"  запуск {number}: {stats}, поставлено на удаление: {deletions:,}")
+    print(f"\nДоставлено: {delivered:,} из {len(recipients) - len(blocked):,} доступных, повторов: {duplicates:,}")
+    print(f"Отчёт проводнику: {'да' if stub._message_ids[CONDUCTOR_CHAT] else 'нет'}")
+    print(f"Время: {elapsed:.1f} с, {rate:.1f} сообщений/с ({rate / (30 * args.scale):.0%} лимита), "
+          f"в реальном масштабе ~{elapsed * args.scale / 60:.1f} мин")
+    print(f"Ответов 429 от Telegram: {stub.errors[429]}, 403: {stub.errors[403]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Доля попаданий и стоимость обращения к кэшу ответов на потоке вопросов.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_cache --questions 20000
+
+Вопросы выбираются по закону Ципфа из типичных для поезда и слегка
+варьируются (регистр, пунктуация, эмодзи, вежливые слова). Время течёт
+по модельным часам: один вопрос в секунду.
+"""
+import argparse
+import random
+import time
+
+from cache import ResponseCache, is_time_dependent
+
+QUESTIONS = [
+    "где кипяток",
+    "пароль от wifi",
+    "когда Красноярск",
+    "где туалет",
+    "можно ли курить в поезде",
+    "где мы сейчас",
+    "сколько стоит чай",
+    "есть ли розетки в купе",
+    "как позвать проводника",
+    "какая следующая остановка",
+    "можно ли перейти в другой вагон",
+    "где взять постельное бельё",
+    "работает ли мобильная связь",
+    "что делать если украли вещи",
+    "где сушить мокрые вещи",
+    "можно ли провозить алкоголь",
+]
+PREFIXES = ["", "", "подскажите, ", "а ", "Здравствуйте! ", "скажите пожалуйста "]
+SUFFIXES = ["", "?", "??", "!", " 🙏", " ?😊", "..."]
+
+
+def variant(rng, question):
+    text = rng.choice(PREFIXES) + question + rng.choice(SUFFIXES)
+    return text.upper() if rng.random() < 0.1 else text
+
+
+class ModelClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--questions", type=int, default=20000)
+    parser.add_argument("--size", type=int, default=1000)
+    parser.add_argument("--ttl", type=int, default=1800)
+    parser.add_argument("--short-ttl", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    weights = [1 / rank for rank in range(1, len(QUESTIONS) + 1)]
+    stream = [variant(rng, q) for q in rng.choices(QUESTIONS, weights, k=args.questions)]
+
+    clock = ModelClock()
+    cache = ResponseCache(max_size=args.size, ttl=args.ttl, short_ttl=args.short_ttl, clock=clock)
+    elapsed = 0.0
+    time_dependent_hits = time_dependent_total = 0
+    for question in stream:
+        clock.now += 1.0
+        started = time.perf_counter()
+        answer = cache.get(question)
+        if answer is None:
+            cache.put(question, "ответ")
+        elapsed += time.perf_counter() - started
+        if is_time_dependent(question):
+            time_dependent_total += 1
+            time_dependent_hits += answer is not None
+
+    stats = cache.stats()
+    print(f"Вопросов: {args.questions}, уникальных ключей в кэше: {stats['size']}")
+    print(f"Попаданий: {stats['hits']}, промахов: {stats['misses']}, вытеснений: {stats['evictions']}")
+    print(f"Доля попаданий: {stats['hit_rate']:.1%} (без кэша каждый вопрос - запрос к GigaChat)")
+    print(f"Вопросы о положении поезда: {time_dependent_hits}/{time_dependent_total} из кэша "
+          f"(TTL {args.short_ttl} с)")
+    print(f"Среднее время обращения к кэшу: {elapsed / args.questions * 1e6:.1f} мкс")
+
+
+if __name__ == "__main__":
+    main()
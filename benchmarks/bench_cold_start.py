@@ -0,0 +1,159 @@
+"""Холодный запуск бота: время до первого ответа на /start и фазы запуска.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_cold_start --runs 5 --budget 1.5
+
+Каждый прогон запускает `python bot.py` отдельным процессом в режиме polling
+против заглушек Telegram и GigaChat (benchmarks/telegram_stub.py,
+benchmarks/gigachat_stub.py): первый getUpdates возвращает /start, присланный,
+пока бот был остановлен, как после перезапуска дино. Время до первого
+ответа - от запуска процесса до первого sendPhoto/sendMessage. Сравниваются:
+  фоновый     - bot.py как есть: gigachat импортируется в фоне после запуска;
+  при импорте - gigachat импортируется до bot.py;
+  как раньше  - вдобавок on_startup ждёт токен GigaChat до начала polling.
+В двух последних режимах gigachat загружается до отсчёта в bot.py, поэтому
+их фаза импортов короче - разница видна во времени до ответа.
+Фазы - из отчёта о запуске в логе бота (startup.py). Если медиана времени
+до первого ответа бота как есть больше --budget секунд, код выхода 1.
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.gigachat_stub import GigaChatStub
+from benchmarks.telegram_stub import TOKEN, TelegramStub
+
+MODES = {
+    "фоновый": [sys.executable, "bot.py"],
+    "при импорте": [sys.executable, "-c", "import gigachat, runpy; runpy.run_path('bot.py', run_name='__main__')"],
+    "как раньше": [sys.executable, "-c", (
+        "import gigachat, runpy, llm\n"
+        "start = llm.GigaChatService.start\n"
+        "async def blocking_start(self):\n"
+        "    await self.warm_up()\n"
+        "    await start(self)\n"
+        "llm.GigaChatService.start = blocking_start\n"
+        "runpy.run_path('bot.py', run_name='__main__')\n"
+    )],
+}
+
+PASSENGER = 4242
+START_UPDATE = {
+    "update_id": 1,
+    "message": {
+        "message_id": 1,
+        "date": int(time.time()),
+        "chat": {"id": PASSENGER, "type": "private"},
+        "from": {"id": PASSENGER, "is_bot": False, "first_name": "Пассажир"},
+        "text": "/start",
+        "entities": [{"type": "bot_command", "offset": 0, "length": 6}],
+    },
+}
+
+_PHASE = re.compile(r"([^,:]+?) (\d+\.\d+) с")
+
+
+def run_once(command, gigachat, args):
+    """(секунд до первого ответа, {фаза: секунд}, прогрев GigaChat в секундах или None)"""
+    telegram = TelegramStub(latency=args.tg_latency, updates=[START_UPDATE]).start()
+    lines = []
+    with tempfile.TemporaryDirectory() as state_dir:
+        env = dict(
+            os.environ,
+            PYTHONUNBUFFERED="1",
+            TELEGRAM_BOT_TOKEN=TOKEN,
+            TELEGRAM_API_URL=telegram.base_url,
+            GIGACHAT_API_KEY="c3R1YjpzdHVi",
+            GIGACHAT_SCOPE="GIGACHAT_API_PERS",
+            GIGACHAT_BASE_URL=gigachat.client_options["base_url"],
+            GIGACHAT_AUTH_URL=gigachat.client_options["auth_url"],
+            BOT_MODE="polling",
+            METRICS_PORT="0",
+            BRAND_FILE_ID_PATH=os.path.join(state_dir, "brand_file_id.json"),
+            DELETION_QUEUE_PATH=os.path.join(state_dir, "pending_deletions.json"),
+            JOURNAL_PATH=os.path.join(state_dir, "requests.jsonl"),
+            PROFILES_PATH=os.path.join(state_dir, "profiles.sqlite3"),
+            BROADCAST_STATE_PATH=os.path.join(state_dir, "broadcasts.json"),
+        )
+        started = time.monotonic()
+        process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                   text=True, encoding="utf-8")
+        reader = threading.Thread(target=lambda: lines.extend(process.stderr), daemon=True)
+        reader.start()
+        deadline = started + args.timeout
+        while time.monotonic() < deadline and not telegram.first_calls.keys() & {"sendPhoto", "sendMessage"}:
+            time.sleep(0.005)
+        # Прогрев GigaChat идёт в фоне - дать ему закончиться, чтобы попасть в отчёт
+        while time.monotonic() < deadline and not any("GigaChat прогрет" in line for line in lines):
+            time.sleep(0.01)
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        reader.join(timeout=1)
+    telegram.stop()
+
+    first = [telegram.first_calls[method] for method in ("sendPhoto", "sendMessage") if method in telegram.first_calls]
+    if not first:
+        sys.stderr.write("".join(lines[-20:]))
+        raise RuntimeError("Бот не ответил на /start за отведённое время")
+    phases, warmup = {}, None
+    for line in lines:
+        if "⏱️ Запуск за" in line:
+            phases = {name.strip(): float(value) for name, value in _PHASE.findall(line.split(": ", 1)[1])}
+        elif "GigaChat прогрет" in line:
+            warmup = float(re.search(r"за (\d+\.\d+) с", line).group(1))
+    return min(first) - started, phases, warmup
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=1.5, help="допустимая медиана до первого ответа, с")
+    parser.add_argument("--tg-latency", type=float, default=0.05, help="задержка Bot API, с")
+    parser.add_argument("--auth-delay", type=float, default=0.3, help="выдача токена GigaChat, с")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    gigachat = GigaChatStub(auth_delay=args.auth_delay).start()
+    results = {}
+    try:
+        for mode, command in MODES.items():
+            results[mode] = [run_once(command, gigachat, args) for _ in range(args.runs)]
+    finally:
+        gigachat.stop()
+
+    print(f"{'режим':>12} {'до ответа, с':>13} {'min':>6} {'max':>6} {'прогрев GigaChat, с':>20}")
+    for mode, runs in results.items():
+        ttfr = [run[0] for run in runs]
+        warmups = [run[2] for run in runs if run[2] is not None]
+        warmup = f"{statistics.median(warmups):20.2f}" if warmups else f"{'-':>20}"
+        print(f"{mode:>12} {statistics.median(ttfr):13.2f} {min(ttfr):6.2f} {max(ttfr):6.2f} {warmup}")
+
+    print("\nФазы запуска (медиана), с:")
+    names = list(dict.fromkeys(name for runs in results.values() for run in runs for name in run[1]))
+    print(f"  {'':>24}" + "".join(f"{mode:>13}" for mode in results))
+    for name in names:
+        cells = []
+        for runs in results.values():
+            values = [run[1][name] for run in runs if name in run[1]]
+            cells.append(f"{statistics.median(values):13.2f}" if values else f"{'-':>13}")
+        print(f"  {name:>24}" + "".join(cells))
+
+    median = statistics.median(run[0] for run in results["фоновый"])
+    if median > args.budget:
+        print(f"\n❌ Регрессия: до первого ответа {median:.2f} с при бюджете {args.budget:.2f} с")
+        sys.exit(1)
+    print(f"\n✅ До первого ответа {median:.2f} с, бюджет {args.budget:.2f} с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Память истории диалогов и размер запроса к GigaChat при 10k активных пассажиров.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_conversation --passengers 10000 --turns 30
+
+Каждый пассажир задаёт turns вопросов с ответами типичной длины.
+Сравниваются неограниченный список реплик (вся поездка в каждом запросе)
+и ConversationStore: кольцевой буфер на CONVERSATION_TURNS пар и бюджет
+токенов истории CONVERSATION_TOKEN_BUDGET.
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+import bot
+from conversation import ConversationStore, estimate_tokens
+
+SYSTEM = "Вы - AI Provodnik, умный помощник пассажиров в поезде №042А «Россия» Москва-Владивосток."
+QUESTIONS = ["Когда будет Новосибирск?", "А сколько стоит чай?", "Где взять кипяток?", "А можно плед?"]
+
+
+def answer(rng):
+    return "Ответ проводника на вопрос пассажира. " * rng.randint(3, 25)
+
+
+def unbounded(args, rng):
+    histories = {}
+    for user_id in range(args.passengers):
+        history = histories[user_id] = []
+        for turn in range(args.turns):
+            history.append({"role": "user", "content": QUESTIONS[turn % len(QUESTIONS)]})
+            history.append({"role": "assistant", "content": answer(rng)})
+    return histories, lambda user_id, question: [
+        {"role": "system", "content": SYSTEM}, *histories[user_id], {"role": "user", "content": question}
+    ]
+
+
+def bounded(args, rng):
+    store = ConversationStore(
+        max_turns=bot.CONVERSATION_TURNS,
+        token_budget=bot.CONVERSATION_TOKEN_BUDGET,
+        idle_ttl=bot.CONVERSATION_IDLE_TTL,
+    )
+    for user_id in range(args.passengers):
+        for turn in range(args.turns):
+            store.remember(user_id, QUESTIONS[turn % len(QUESTIONS)], answer(rng))
+    return store, lambda user_id, question: store.messages(user_id, SYSTEM, question)
+
+
+def measure(name, build, args):
+    rng = random.Random(args.seed)
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    store, messages = build(args, rng)
+    memory = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    tokens = [
+        sum(estimate_tokens(m["content"]) for m in messages(user_id, "А сколько ехать?"))
+        for user_id in range(args.passengers)
+    ]
+    elapsed = time.perf_counter() - started
+    print(
+        f"{name:>10}: память {memory / 2**20:7.1f} МБ ({memory / args.passengers / 1024:5.1f} КБ/пассажир)  "
+        f"запрос в среднем {sum(tokens) / len(tokens):6.0f} токенов, макс. {max(tokens):6d}  "
+        f"сборка {elapsed / args.passengers * 1e6:5.1f} мкс"
+    )
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--passengers", type=int, default=10000)
+    parser.add_argument("--turns", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(
+        f"Пассажиров: {args.passengers}, вопросов у каждого: {args.turns}; "
+        f"буфер {bot.CONVERSATION_TURNS} пар, бюджет {bot.CONVERSATION_TOKEN_BUDGET} токенов"
+    )
+    measure("без границ", unbounded, args)
+    store = measure("буфер", bounded, args)
+
+    # Диалоги без активности дольше idle_ttl забываются
+    now = time.monotonic() + store.idle_ttl + 1
+    store.clock = lambda: now
+    store.history(0)
+    print(f"После {store.idle_ttl} с тишины: диалогов {len(store)}, забыто {store.evictions}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Память, число задач и вызовов API при 10k сообщений в очереди на удаление.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_deletion --messages 10000 --chats 200
+
+Сравниваются прежний подход (задача asyncio.sleep на каждое сообщение,
+которая держит объект Message) и DeletionScheduler.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+
+from scheduler import DeletionScheduler
+
+
+class BotReply:
+    """Объект с размером, сравнимым с telegram.Message ответа бота"""
+
+    def __init__(self, chat_id, message_id, bot):
+        self.chat_id = chat_id
+        self.message_id = message_id
+        self.text = "<b>🤖 AI Provodnik:</b>\n\n" + "Ответ проводника. " * 30
+        self.entities = [{"type": "bold", "offset": 0, "length": 17}]
+        self.chat = {"id": chat_id, "type": "private", "first_name": "Иван"}
+        self.from_user = {"id": 777, "is_bot": True, "first_name": "AI Provodnik"}
+        self.date = time.time()
+        self.bot = bot
+
+    async def delete(self):
+        await self.bot.delete_message(self.chat_id, self.message_id)
+
+
+class CountingBot:
+    def __init__(self):
+        self.calls = 0
+
+    async def delete_message(self, chat_id, message_id):
+        self.calls += 1
+
+    async def delete_messages(self, chat_id, message_ids):
+        self.calls += 1
+
+
+async def delete_message_later(message, delay):
+    """Прежняя реализация из bot.py"""
+    await asyncio.sleep(delay)
+    await message.delete()
+
+
+async def per_message_tasks(args):
+    bot = CountingBot()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    for i in range(args.messages):
+        message = BotReply(i % args.chats, i, bot)
+        asyncio.create_task(delete_message_later(message, args.delay))
+    await asyncio.sleep(0)
+    memory = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    tasks = len(asyncio.all_tasks()) - 1
+    await asyncio.sleep(args.delay + 0.5)
+    return memory, tasks, bot.calls
+
+
+async def central_scheduler(args, state_path):
+    bot = CountingBot()
+    scheduler = DeletionScheduler(bot, state_path)
+    await scheduler.start()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    for i in range(args.messages):
+        message = BotReply(i % args.chats, i, bot)
+        scheduler.schedule(message.chat_id, message.message_id, args.delay)
+    memory = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    tasks = len(asyncio.all_tasks()) - 1
+    await asyncio.sleep(args.delay + scheduler.batch_window + 0.5)
+    await scheduler.stop()
+    return memory, tasks, bot.calls
+
+
+async def restart_recovery(args, state_path):
+    scheduler = DeletionScheduler(CountingBot(), state_path)
+    for i in range(args.messages):
+        scheduler.schedule(i % args.chats, i, 3600)
+    await scheduler.stop()
+    restored = DeletionScheduler(CountingBot(), state_path)
+    restored._load()
+    return len(restored)
+
+
+def report(name, memory, tasks, calls):
+    print(f"{name:>10}: память={memory / 1024:8.0f} КиБ  задач={tasks:6d}  вызовов API={calls:6d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=10000)
+    parser.add_argument("--chats", type=int, default=200)
+    parser.add_argument("--delay", type=float, default=1.0)
+    args = parser.parse_args()
+
+    report("tasks", *asyncio.run(per_message_tasks(args)))
+    with tempfile.TemporaryDirectory() as tmp:
+        state_path = os.path.join(tmp, "pending.json")
+        report("scheduler", *asyncio.run(central_scheduler(args, state_path)))
+        restored = asyncio.run(restart_recovery(args, state_path))
+    print(f"После перезапуска восстановлено {restored} из {args.messages} ожидающих удалений")
+
+
+if __name__ == "__main__":
+    main()
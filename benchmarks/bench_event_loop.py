@@ -0,0 +1,102 @@
+"""Задержка кнопок, пока N медленных запросов к GigaChat находятся в работе.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_event_loop --llm-calls 20 --llm-delay 3
+
+Сравниваются два режима заглушки GigaChat:
+  blocking - синхронное ожидание (как прежний giga.chat внутри обработчика)
+  async    - асинхронное ожидание (как giga.achat)
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+from types import SimpleNamespace
+
+import gigachat
+
+import bot
+import llm
+from benchmarks.fakes import bot_context, callback_update, text_update
+
+
+class SlowGigaChat:
+    """Заглушка GigaChat с настраиваемой задержкой ответа"""
+
+    delay = 3.0
+    blocking = False
+
+    def __init__(self, **kwargs):
+        pass
+
+    async def achat(self, payload):
+        if self.blocking:
+            time.sleep(self.delay)
+        else:
+            await asyncio.sleep(self.delay)
+        message = SimpleNamespace(content="Кипяток в конце вагона ♨️")
+        usage = SimpleNamespace(prompt_tokens=60, completion_tokens=12, total_tokens=72)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+
+async def run(llm_calls, clicks, interval):
+    giga = llm.GigaChatService(
+        credentials="stub", scope="GIGACHAT_API_PERS", max_concurrency=bot.GIGACHAT_MAX_CONCURRENCY
+    )
+    # Кэш и ограничитель отключены, а вопросы разные и не из справки:
+    # каждый запрос доходит до GigaChat
+    context = bot_context(gigachat=giga)
+    started = time.perf_counter()
+    llm_tasks = [
+        asyncio.create_task(bot.handle_message(text_update(f"Посоветуйте книгу в дорогу №{i}"), context))
+        for i in range(llm_calls)
+    ]
+
+    latencies = []
+    for i in range(clicks):
+        expected = started + i * interval
+        await asyncio.sleep(max(0.0, expected - time.perf_counter()))
+        await bot.button_handler(callback_update("faq"), context)
+        latencies.append(time.perf_counter() - expected)
+
+    await asyncio.gather(*llm_tasks)
+    return latencies
+
+
+def report(mode, latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f"{mode:>8}: p50={statistics.median(latencies) * 1000:8.1f} мс  "
+        f"p95={p95 * 1000:8.1f} мс  max={latencies[-1] * 1000:8.1f} мс"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--llm-calls", type=int, default=20)
+    parser.add_argument("--llm-delay", type=float, default=3.0)
+    parser.add_argument("--clicks", type=int, default=50)
+    parser.add_argument("--interval", type=float, default=0.1)
+    args = parser.parse_args()
+
+    logging.getLogger("bot").setLevel(logging.WARNING)
+    logging.getLogger("llm").setLevel(logging.WARNING)
+    # Клиент создаётся лениво (GigaChatService.client) из gigachat.GigaChat
+    gigachat.GigaChat = SlowGigaChat
+    # Измеряется обычный (не потоковый) путь ответа
+    bot.GIGACHAT_STREAMING = False
+    SlowGigaChat.delay = args.llm_delay
+
+    print(
+        f"LLM-запросов в работе: {args.llm_calls}, задержка {args.llm_delay} с, "
+        f"лимит одновременных: {bot.GIGACHAT_MAX_CONCURRENCY}"
+    )
+    for mode in ("blocking", "async"):
+        SlowGigaChat.blocking = mode == "blocking"
+        report(mode, asyncio.run(run(args.llm_calls, args.clicks, args.interval)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Пропускная способность и задержки обработчиков на заглушках Telegram и GigaChat.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_handlers --updates 3000 --rate 100
+
+Приложение собирается так же, как в bot.main() (bot.build_application),
+но Bot API и GigaChat заменены локальными заглушками с настраиваемой
+задержкой и долей ошибок (benchmarks/telegram_stub.py,
+benchmarks/gigachat_stub.py). Генератор (benchmarks/updates.py) подаёт
+/start, нажатия кнопок и вопросы с частотой rate, каждое обновление
+проходит через Application.process_update. Для start, button_handler и
+handle_message выводятся пропускная способность и p50/p95/p99.
+Запуски с одинаковым --seed воспроизводимы.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+from collections import Counter, defaultdict
+
+from telegram import Update
+from telegram.ext import Application
+
+import bot
+from benchmarks.gigachat_stub import GigaChatStub
+from benchmarks.telegram_stub import TOKEN, TelegramStub
+from benchmarks.updates import UpdateGenerator
+
+HANDLERS = {"start": "start", "button": "button_handler", "message": "handle_message"}
+
+
+def percentile(values, q):
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+async def run(args, state_dir):
+    telegram = TelegramStub(
+        latency=args.tg_latency, jitter=args.tg_latency / 2, error_rate=args.tg_errors, seed=args.seed
+    ).start()
+    gigachat = GigaChatStub(
+        answer="Ответ проводника: всё будет хорошо, поезд идёт по расписанию 🚂",
+        connect_delay=0.0, auth_delay=0.05, chat_delay=args.llm_delay,
+        error_rate=args.llm_errors, seed=args.seed
+    ).start()
+
+    bot.GIGACHAT_API_KEY = "stub"
+    bot.GIGACHAT_SCOPE = "GIGACHAT_API_PERS"
+    bot.BRAND_FILE_ID_PATH = os.path.join(state_dir, "brand_file_id.json")
+    bot.DELETION_QUEUE_PATH = os.path.join(state_dir, "pending_deletions.json")
+    bot.JOURNAL_PATH = os.path.join(state_dir, "requests.jsonl")
+    bot.PROFILES_PATH = os.path.join(state_dir, "profiles.sqlite3")
+    bot.BROADCAST_STATE_PATH = os.path.join(state_dir, "broadcasts.json")
+    # Сводки заказов уходят в заглушку, как в чат проводников
+    bot.CONDUCTOR_CHAT_ID = "-100123"
+    # Заглушка не ограничивает частоту, а бенчмарк меряет сами обработчики;
+    # очередь исходящих вызовов проверяет bench_send_queue
+    bot.TELEGRAM_GLOBAL_RATE = 0
+    builder = Application.builder().token(TOKEN).base_url(telegram.base_url).updater(None)
+    application = bot.build_application(builder, **gigachat.client_options)
+
+    errors = Counter()
+
+    async def count_error(update, context):
+        errors[type(context.error).__name__] += 1
+
+    application.add_error_handler(count_error)
+    await application.initialize()
+    await application.post_init(application)
+
+    latencies = defaultdict(list)
+    generator = UpdateGenerator(passengers=args.passengers, seed=args.seed)
+
+    async def process(kind, data):
+        update = Update.de_json(data, application.bot)
+        started = time.perf_counter()
+        await application.process_update(update)
+        latencies[kind].append(time.perf_counter() - started)
+
+    tasks = []
+    cpu_started = time.process_time()
+    started = time.perf_counter()
+    for i, (kind, data) in enumerate(generator.take(args.updates)):
+        await asyncio.sleep(max(0.0, started + i / args.rate - time.perf_counter()))
+        tasks.append(asyncio.create_task(process(kind, data)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    cpu = time.process_time() - cpu_started
+
+    limiter = application.bot_data["rate_limiter"].stats()
+    await application.post_shutdown(application)
+    await application.shutdown()
+    telegram.stop()
+    gigachat.stop()
+    return elapsed, cpu, latencies, errors, telegram, gigachat, limiter
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--updates", type=int, default=3000)
+    parser.add_argument("--rate", type=float, default=100, help="обновлений в секунду")
+    parser.add_argument("--passengers", type=int, default=1000)
+    parser.add_argument("--tg-latency", type=float, default=0.05, help="задержка Bot API, с")
+    parser.add_argument("--tg-errors", type=float, default=0.0, help="доля ответов Bot API с ошибкой 500")
+    parser.add_argument("--llm-delay", type=float, default=1.0, help="время ответа GigaChat, с")
+    parser.add_argument("--llm-errors", type=float, default=0.0, help="доля ответов GigaChat с ошибкой 500")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    logging.disable(logging.ERROR)
+    with tempfile.TemporaryDirectory() as state_dir:
+        elapsed, cpu, latencies, errors, telegram, gigachat, limiter = asyncio.run(run(args, state_dir))
+
+    print(
+        f"Обновлений: {args.updates} за {elapsed:.1f} с ({args.updates / elapsed:.0f}/с при подаче {args.rate:.0f}/с), "
+        f"Bot API {args.tg_latency * 1000:.0f} мс / ошибок {args.tg_errors:.0%}, "
+        f"GigaChat {args.llm_delay} с / ошибок {args.llm_errors:.0%}"
+    )
+    for kind, handler in HANDLERS.items():
+        values = sorted(latencies[kind])
+        if not values:
+            continue
+        print(
+            f"{handler:>15}: {len(values):5d} шт. {len(values) / elapsed:6.1f}/с  "
+            f"p50={percentile(values, 0.50) * 1000:7.1f} мс  p95={percentile(values, 0.95) * 1000:7.1f} мс  "
+            f"p99={percentile(values, 0.99) * 1000:7.1f} мс"
+        )
+    print(f"Процессорное время (бот и заглушки): {cpu:.1f} с, {cpu / args.updates * 1000:.2f} мс на обновление")
+    print(f"Вызовы Bot API: {dict(telegram.calls)}")
+    print(f"Запросов к GigaChat: {gigachat.chat_calls}, ошибок заглушек: Telegram {dict(telegram.errors)}, "
+          f"GigaChat {gigachat.errors}")
+    print(f"Ограничитель: {limiter}")
+    if errors:
+        print(f"Необработанные исключения в обработчиках: {dict(errors)}")
+
+
+if __name__ == "__main__":
+    main()
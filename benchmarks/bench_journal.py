@@ -0,0 +1,102 @@
+"""Цена записи в журнал вопросов на пути обработчика и скорость фонового потока.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_journal --entries 200000
+
+Сравниваются:
+  logging  - прежняя строка logger.info с полным текстом вопроса в файл
+             (FileHandler пишет синхронно, прямо в обработчике);
+  Journal  - Journal.record: запись в очередь в памяти, JSON и запись
+             на диск - в потоке журнала пачками.
+Затем журнал с маленьким --max-kb ротируется, и все записи читаются
+обратно (read_journal) вместе со сжатыми частями.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import tempfile
+import time
+
+from journal import Journal, read_journal, rotated_files
+
+from benchmarks.updates import QUESTIONS
+
+ANSWER = "Кипяток есть в титане в начале вагона, он работает круглосуточно ♨️"
+OUTCOMES = ["knowledge", "cache", "gigachat", "shared", "order", "fallback"]
+
+
+def entries(count, seed):
+    rng = random.Random(seed)
+    return [
+        (rng.randrange(1, 10000), rng.choice(QUESTIONS), rng.choice(OUTCOMES), rng.uniform(1, 3000))
+        for _ in range(count)
+    ]
+
+
+def with_logging(path, items):
+    logger = logging.getLogger("bench_journal")
+    logger.propagate = False
+    handler = logging.FileHandler(path, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    started = time.perf_counter()
+    for user_id, question, outcome, ms in items:
+        logger.info(f"Получено сообщение от {user_id}: {question}")
+    elapsed = time.perf_counter() - started
+    logger.removeHandler(handler)
+    handler.close()
+    return elapsed
+
+
+async def with_journal(path, items, max_bytes):
+    journal = Journal(path, flush_interval=0.05, fsync_interval=1.0, max_bytes=max_bytes,
+                      max_pending=len(items) + 1)
+    await journal.start()
+    # Запись кусками по 1000 с передачей управления, как между обработчиками
+    elapsed = 0.0
+    for i in range(0, len(items), 1000):
+        started = time.perf_counter()
+        for user_id, question, outcome, ms in items[i:i + 1000]:
+            journal.record("question", user=user_id, question=question, outcome=outcome, ms=ms, answer=ANSWER)
+        elapsed += time.perf_counter() - started
+        await asyncio.sleep(0)
+    started = time.perf_counter()
+    await journal.stop()
+    drained = time.perf_counter() - started
+    return elapsed, drained, journal.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=200000)
+    parser.add_argument("--max-kb", type=int, default=4096, help="размер файла журнала до ротации")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    items = entries(args.entries, args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        logged = with_logging(os.path.join(directory, "bot.log"), items)
+        path = os.path.join(directory, "requests.jsonl")
+        recorded, drained, stats = asyncio.run(with_journal(path, items, args.max_kb * 1024))
+
+        print(f"Записей: {args.entries}")
+        print(f"  logging.info в файл: {logged / args.entries * 1e6:6.2f} мкс на запись в обработчике")
+        print(
+            f"  Journal.record:      {recorded / args.entries * 1e6:6.2f} мкс на запись в обработчике, "
+            f"остаток дописан за {drained * 1000:.0f} мс после остановки"
+        )
+        archives = rotated_files(path)
+        size = sum(os.path.getsize(name) for name in archives + [path] if os.path.exists(name))
+        print(f"  {stats}, частей .gz: {len(archives)}, на диске {size / 1024:.0f} КБ")
+
+        started = time.perf_counter()
+        read = sum(1 for _ in read_journal(path))
+        print(f"Прочитано обратно: {read} записей за {time.perf_counter() - started:.2f} с")
+        assert read == stats["written"], (read, stats)
+
+
+if __name__ == "__main__":
+    main()
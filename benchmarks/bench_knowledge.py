@@ -0,0 +1,83 @@
+"""Доля вопросов, на которые бот отвечает локально, и время поиска.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_knowledge
+
+Для каждого вопроса из выборки указаны разделы, которыми на него можно
+ответить, или None, если нужен GigaChat (расписание, погода, советы).
+"""
+import argparse
+import statistics
+import time
+
+from content import KNOWLEDGE_SECTIONS
+from knowledge import KnowledgeIndex
+
+SAMPLE = [
+    ("где взять кипяток?", ("faq",)),
+    ("где кипяток", ("faq", "menu")),
+    ("пароль от wifi", ("info",)),
+    ("пароль от вай фай", ("info",)),
+    ("можно ли курить в поезде", ("info",)),
+    ("есть ли розетки в купе", ("info",)),
+    ("можно ли провозить алкоголь", ("faq",)),
+    ("где сушить мокрые вещи", ("faq",)),
+    ("работает ли мобильная связь", ("faq",)),
+    ("можно ли поменять место", ("faq",)),
+    ("как оплатить картой", ("info", "menu")),
+    ("какие настольные игры есть", ("entertainment",)),
+    ("телефон полиции", ("info",)),
+    ("есть ли аптечка", ("services",)),
+    ("можно ли выйти на станции", ("faq",)),
+    ("можно ли перейти в другой вагон", ("faq",)),
+    ("сколько стоит чай", ("menu",)),
+    ("сколько стоит доширак", ("menu",)),
+    ("что делать если украли вещи", ("faq",)),
+    ("какая температура в вагоне", ("info",)),
+    ("когда Красноярск", None),
+    ("где мы сейчас", None),
+    ("какая погода во Владивостоке", None),
+    ("посоветуй книгу про сибирь", None),
+    ("куда положить чемодан", None),
+    ("расскажи анекдот", None),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    index = KnowledgeIndex.from_sections(KNOWLEDGE_SECTIONS)
+    build_ms = (time.perf_counter() - started) * 1000
+    print(f"Индекс: {len(index.passages)} фрагментов, построен за {build_ms:.1f} мс")
+
+    local = correct = wrong = 0
+    latencies = []
+    for question, expected in SAMPLE:
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            passage = index.answer(question)
+            latencies.append(time.perf_counter() - started)
+        if passage is not None:
+            local += 1
+            if expected and passage.section in expected:
+                correct += 1
+            else:
+                wrong += 1
+        if args.verbose:
+            found = f"{passage.section}: {passage.text[:40]!r}" if passage else "-> GigaChat"
+            print(f"  {question!r:36} {found}")
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"Ответ без GigaChat: {local}/{len(SAMPLE)} ({local / len(SAMPLE):.0%}), "
+          f"из них верных разделов: {correct}, ошибочных: {wrong}")
+    print(f"Время answer(): p50={statistics.median(latencies) * 1000:.3f} мс  "
+          f"p99={p99 * 1000:.3f} мс  max={latencies[-1] * 1000:.3f} мс")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Задержка одного вопроса: новый клиент GigaChat на каждый запрос против общего.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_llm_client --requests 30
+
+Используется настоящий SDK GigaChat и локальная заглушка API
+(benchmarks/gigachat_stub.py), поэтому видны и новые соединения,
+и лишние запросы токена.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from gigachat import GigaChat
+
+from benchmarks.gigachat_stub import GigaChatStub
+from llm import GigaChatService
+
+PROMPT = "Пассажир Иван: Где взять кипяток?\n\nПроводник:"
+
+
+async def per_request_client(stub, requests):
+    """Прежнее поведение: новый клиент на каждый вопрос"""
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        async with GigaChat(credentials="stub", scope="GIGACHAT_API_PERS",
+                            verify_ssl_certs=False, **stub.client_options) as giga:
+            await giga.achat(PROMPT)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+async def shared_client(stub, requests):
+    """Общий клиент из main() с прогретым токеном"""
+    service = GigaChatService(credentials="stub", scope="GIGACHAT_API_PERS", **stub.client_options)
+    # В боте прогрев идёт в фоне после запуска; здесь - дождаться его до первого запроса
+    await service.warm_up()
+    await service.start()
+    latencies = []
+    try:
+        for _ in range(requests):
+            started = time.perf_counter()
+            await service.chat(PROMPT)
+            latencies.append(time.perf_counter() - started)
+    finally:
+        await service.close()
+    return latencies
+
+
+def report(name, latencies, stub, before):
+    connections = stub.connections - before[0]
+    auth_calls = stub.auth_calls - before[1]
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f"{name:>12}: mean={statistics.mean(latencies) * 1000:7.1f} мс  "
+        f"p50={statistics.median(latencies) * 1000:7.1f} мс  p95={p95 * 1000:7.1f} мс  "
+        f"соединений={connections}  запросов токена={auth_calls}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=30)
+    parser.add_argument("--connect-delay", type=float, default=0.05)
+    parser.add_argument("--auth-delay", type=float, default=0.2)
+    parser.add_argument("--chat-delay", type=float, default=0.3)
+    args = parser.parse_args()
+
+    stub = GigaChatStub(
+        connect_delay=args.connect_delay,
+        auth_delay=args.auth_delay,
+        chat_delay=args.chat_delay,
+    ).start()
+    try:
+        for name, scenario in (("per-request", per_request_client), ("shared", shared_client)):
+            before = (stub.connections, stub.auth_calls)
+            report(name, asyncio.run(scenario(stub, args.requests)), stub, before)
+    finally:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
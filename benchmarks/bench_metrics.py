@@ -0,0 +1,64 @@
+"""Накладные расходы метрик: запись в гистограмму, обёртка обработчика и отдача /metrics.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_metrics --calls 50000
+
+Обработчик button_handler вызывается с заглушками Telegram без сети
+напрямую и через instrumentation.timed; разница - цена метрик на одно
+нажатие. Для сравнения: один вызов Bot API занимает десятки миллисекунд.
+"""
+import argparse
+import asyncio
+import time
+
+import bot
+from benchmarks.fakes import bot_context, callback_update
+from content import SCREENS
+from instrumentation import timed
+from metrics import REGISTRY, Histogram, Registry
+
+
+async def handler_cost(handler, calls, context):
+    keys = list(SCREENS)
+    updates = [callback_update(keys[i % len(keys)]) for i in range(calls)]
+    started = time.process_time()
+    for update in updates:
+        await handler(update, context)
+    return (time.process_time() - started) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=50000)
+    args = parser.parse_args()
+
+    histogram = Histogram("bench_seconds", "bench", ["method"], registry=Registry())
+    child = histogram.labels("sendMessage")
+    started = time.perf_counter()
+    for i in range(args.calls):
+        child.observe(i * 1e-5)
+    observe = (time.perf_counter() - started) / args.calls
+    started = time.perf_counter()
+    for i in range(args.calls):
+        histogram.labels("sendMessage").observe(i * 1e-5)
+    labelled = (time.perf_counter() - started) / args.calls
+    print(f"Histogram.observe: {observe * 1e9:.0f} нс, с поиском по меткам: {labelled * 1e9:.0f} нс")
+
+    context = bot_context()
+    raw = asyncio.run(handler_cost(bot.button_handler, args.calls, context))
+    wrapped = asyncio.run(handler_cost(timed(bot.button_handler), args.calls, context))
+    print(
+        f"button_handler: {raw * 1e6:.1f} мкс без метрик, {wrapped * 1e6:.1f} мкс с метриками "
+        f"(+{(wrapped - raw) * 1e6:.2f} мкс на нажатие)"
+    )
+
+    started = time.perf_counter()
+    page = REGISTRY.render()
+    print(
+        f"/metrics: {len(page.splitlines())} строк, {len(page.encode()) / 1024:.1f} КБ, "
+        f"формирование {(time.perf_counter() - started) * 1000:.2f} мс"
+    )
+
+
+if __name__ == "__main__":
+    main()
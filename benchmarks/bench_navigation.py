@@ -0,0 +1,139 @@
+"""Число вызовов Telegram Bot API на типичных маршрутах по меню.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_navigation --think 4
+
+Маршрут начинается с /start и состоит из нажатий кнопок с паузой think
+секунд. Считаются вызовы sendMessage/sendPhoto, editMessageText,
+answerCallbackQuery и deleteMessages (через DeletionScheduler на
+подставных часах), а также число сообщений, оставшихся в чате.
+Сравниваются MENU_NAVIGATION=send (новое сообщение на каждое нажатие)
+и MENU_NAVIGATION=edit (экран открывается в том же сообщении).
+"""
+import argparse
+import asyncio
+import os
+from collections import Counter
+from types import SimpleNamespace
+
+import bot
+from benchmarks.fakes import bot_context
+from scheduler import DeletionScheduler
+
+ROUTES = {
+    "поезд и назад": ["my_train", "back_to_menu"],
+    "FAQ, услуги, меню": ["faq", "back_to_menu", "services", "back_to_menu", "menu"],
+    "позвать проводника": ["conductor", "call_conductor", "back_to_menu"],
+    "обход всех разделов": [
+        "my_train", "back_to_menu", "location", "back_to_menu", "info", "back_to_menu",
+        "faq", "back_to_menu", "entertainment", "back_to_menu", "conductor", "request_linen",
+    ],
+}
+
+
+class Chat:
+    """Чат одного пассажира: счётчик вызовов API и живые сообщения"""
+
+    def __init__(self):
+        self.calls = Counter()
+        self.alive = set()
+        self.next_id = 1
+
+    def message(self):
+        message = ChatMessage(self, self.next_id)
+        self.alive.add(self.next_id)
+        self.next_id += 1
+        return message
+
+
+class ChatMessage:
+    """Сообщение бота в чате пассажира; ответ на него - новое живое сообщение"""
+
+    def __init__(self, chat, message_id):
+        self.chat = chat
+        self.chat_id = 1
+        self.message_id = message_id
+
+    async def reply_text(self, text, **kwargs):
+        self.chat.calls["sendMessage"] += 1
+        return self.chat.message()
+
+
+class FakeQuery:
+    def __init__(self, chat, data, message):
+        self.chat = chat
+        self.data = data
+        self.message = message
+
+    async def answer(self):
+        self.chat.calls["answerCallbackQuery"] += 1
+
+    async def edit_message_text(self, text, **kwargs):
+        self.chat.calls["editMessageText"] += 1
+        return self.message
+
+
+class FakeBrand:
+    def __init__(self, chat):
+        self.chat = chat
+
+    async def send(self, message):
+        self.chat.calls["sendPhoto"] += 1
+        return self.chat.message()
+
+
+class FakeBot:
+    def __init__(self, chat):
+        self.chat = chat
+
+    async def delete_messages(self, chat_id, message_ids):
+        self.chat.calls["deleteMessages"] += 1
+        self.chat.alive.difference_update(message_ids)
+
+
+async def run_route(mode, clicks, think):
+    bot.MENU_NAVIGATION = mode
+    chat = Chat()
+    now = [0.0]
+    scheduler = DeletionScheduler(FakeBot(chat), os.devnull, clock=lambda: now[0])
+    # Пассажир без места: кнопки вызова показывают подсказку /seat
+    context = bot_context(deletion_scheduler=scheduler, brand_image=FakeBrand(chat))
+
+    command = chat.message()
+    chat.alive.discard(command.message_id)
+    await bot.start(SimpleNamespace(message=command, callback_query=None), context)
+    # Пассажир нажимает кнопки последнего пришедшего сообщения
+    for data in clicks:
+        now[0] += think
+        menu = ChatMessage(chat, max(chat.alive))
+        await bot.button_handler(SimpleNamespace(message=None, callback_query=FakeQuery(chat, data, menu)), context)
+    peak = len(chat.alive)
+
+    # Тот же цикл, что у DeletionScheduler._run, но на подставных часах
+    while scheduler._heap:
+        now[0] = max(now[0], scheduler._heap[0][0])
+        for chat_id, message_ids in scheduler._pop_due().items():
+            await scheduler._delete_batch(chat_id, message_ids)
+    return chat.calls, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--think", type=float, default=4.0, help="пауза между нажатиями, с")
+    args = parser.parse_args()
+
+    columns = ["sendMessage", "sendPhoto", "editMessageText", "answerCallbackQuery", "deleteMessages"]
+    print(f"{'маршрут':>22} {'режим':>5} " + " ".join(f"{c[:12]:>12}" for c in columns) + f" {'всего':>6} {'в чате':>6}")
+    totals = Counter()
+    for name, clicks in ROUTES.items():
+        for mode in ("send", "edit"):
+            calls, peak = asyncio.run(run_route(mode, clicks, args.think))
+            total = sum(calls.values())
+            totals[mode] += total
+            print(f"{name:>22} {mode:>5} " + " ".join(f"{calls[c]:12d}" for c in columns) + f" {total:6d} {peak:6d}")
+    print(f"Всего вызовов API: send={totals['send']}, edit={totals['edit']} "
+          f"({totals['edit'] / totals['send']:.0%})")
+
+
+if __name__ == "__main__":
+    main()
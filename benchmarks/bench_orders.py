@@ -0,0 +1,175 @@
+"""Локальный разбор заказов еды: скорость, точность, сэкономленные вызовы GigaChat и сводки проводникам.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_orders --messages 20000 --orders 0.4 --requests 0.1
+
+Поток сообщений - заказы по меню (с количествами, падежами, разговорными
+названиями и опечатками) вперемешку с обычными вопросами пассажиров
+и просьбами без вопросительного знака («хочу поменять место»), которые
+начинаются так же, как заказы, но должны уйти в справку или GigaChat.
+Раньше каждый заказ уходил в GigaChat как обычный вопрос: справочный
+поиск (KnowledgeIndex.answer) заказы не распознаёт. Затем те же заказы
+за --hours часов раскладываются по --cars вагонам: без сводок проводник
+получал бы сообщение на каждый заказ, со сводками - одно на вагон раз
+в --interval секунд.
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from content import KNOWLEDGE_SECTIONS, MENU_TEXT
+from knowledge import KnowledgeIndex
+from orders import FoodMenu, OrderDesk
+
+from benchmarks.updates import QUESTIONS
+
+# Как пассажиры называют позиции меню: формы слов, сокращения, опечатки
+SPOKEN = {
+    "Чай чёрный": ["чай чёрный", "чёрного чая", "черный чай"],
+    "Чай зелёный": ["зелёный чай", "чаю зеленого"],
+    "Кофе растворимый": ["кофе растворимый", "растворимого кофе"],
+    "Кофе 3 в 1": ["кофе 3 в 1", "кофе 3в1"],
+    "Какао": ["какао"],
+    "Горячий шоколад": ["горячий шоколад", "горячего шоколада"],
+    "Лапша Доширак (говядина)": ["доширак", "лапшу доширак", "дошик", "дширак"],
+    "Лапша Роллтон (курица)": ["роллтон", "лапшу роллтон", "ролтон"],
+    "Пюре быстрого приготовления": ["пюре"],
+    "Каша овсяная моментальная": ["овсяную кашу", "кашу овсяную"],
+    "Супчик в стакане": ["супчик", "суп в стакане"],
+    "Печенье (упаковка)": ["печенье", "печенья"],
+    "Шоколад Алёнка": ["шоколадку алёнка", "аленку"],
+    "Чипсы Lay's": ["чипсы", "лейс"],
+    "Сухарики": ["сухарики", "сухариков"],
+    "Орешки солёные": ["орешки", "солёных орешков"],
+    "Конфеты (ассорти)": ["конфеты", "конфет"],
+    "Вода минеральная 0.5л": ["воду минеральную", "минералку"],
+    "Сок в ассортименте 0.2л": ["сок", "сока"],
+    "Coca-Cola 0.33л": ["колу", "coca-cola"],
+    "Энергетик Red Bull": ["энергетик", "ред булл"],
+    "Бутерброды (сыр/колбаса)": ["бутерброд", "бутерброды"],
+    "Пирожки (в ассортименте)": ["пирожки", "пирожок"],
+    "Сосиски в тесте": ["сосиску в тесте", "сосиски в тесте"],
+}
+INTENTS = ["Хочу", "Принесите, пожалуйста,", "Можно мне", "Закажу", "Дайте", "Мне", ""]
+QUANTITIES = [("", 1), ("", 1), ("2 ", 2), ("две ", 2), ("три ", 3), ("x2 ", 2)]
+MENU_QUESTIONS = ["Сколько стоит кофе?", "Есть ли доширак?", "Какие есть снеки", "Где купить воду?"]
+# Просьбы и вопросы из FAQ, похожие на заказ: глагол заказа, но товара из меню нет
+REQUESTS = [
+    "Хочу поменять место", "хочу поменять место на нижнее", "Мне нужно постельное бельё",
+    "Можно открыть окно", "хочу пересесть в другой вагон", "Нужна розетка для телефона",
+    "Дайте второе одеяло", "мне холодно в купе", "Можно мне к проводнику", "Хочу сдать билет",
+    "Нужно разбудить меня в Перми", "Принесите плед", "хочу вызвать проводника", "Мне нужен врач",
+    "Хочу подключиться к wi-fi", "Дайте полотенце", "Хочу поменять постель", "Можно сменить вагон",
+    "Хочу пожаловаться на соседей", "Мне нужна справка о поездке", "Хочу выйти на следующей станции",
+]
+
+
+def make_order(rng, names):
+    count = rng.choice((1, 1, 2, 3))
+    expected = {}
+    parts = []
+    for name in rng.sample(names, count):
+        prefix, quantity = rng.choice(QUANTITIES)
+        parts.append(prefix + rng.choice(SPOKEN[name]))
+        expected[name] = quantity
+    intent = rng.choice(INTENTS)
+    if not intent and all(quantity == 1 for quantity in expected.values()):
+        # Без глагола и количества перечисление остаётся вопросом - таким заказ не пишут
+        intent = "Хочу"
+    return f"{intent} {' и '.join(parts)}".strip(), expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--orders", type=float, default=0.4, help="доля заказов в потоке сообщений")
+    parser.add_argument("--requests", type=float, default=0.1, help="доля просьб, похожих на заказ")
+    parser.add_argument("--cars", type=int, default=15)
+    parser.add_argument("--hours", type=float, default=3)
+    parser.add_argument("--interval", type=float, default=120, help="период сводок проводнику, с")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    menu = FoodMenu.from_text(MENU_TEXT)
+    knowledge = KnowledgeIndex.from_sections(KNOWLEDGE_SECTIONS)
+    # Названия с однозначным разговорным написанием (у «кофе», «чая» без уточнения бот переспрашивает)
+    names = [item.name for item in menu.items]
+    assert set(names) == set(SPOKEN), set(names) ^ set(SPOKEN)
+
+    messages = []
+    for _ in range(args.messages):
+        kind = rng.random()
+        if kind < args.orders:
+            messages.append(make_order(rng, names))
+        elif kind < args.orders + args.requests:
+            messages.append((rng.choice(REQUESTS), None))
+        else:
+            messages.append((rng.choice(QUESTIONS + MENU_QUESTIONS), None))
+
+    started = time.perf_counter()
+    parsed = [menu.parse_order(text) for text, _ in messages]
+    elapsed = time.perf_counter() - started
+
+    correct = wrong = missed = false_orders = avoided = 0
+    false_examples = set()
+    for (text, expected), order in zip(messages, parsed):
+        if expected is None:
+            if order is not None:
+                false_orders += 1
+                false_examples.add(text)
+            continue
+        if order is None:
+            missed += 1
+            continue
+        if {item.name: quantity for item, quantity in order.lines} == expected:
+            correct += 1
+        else:
+            wrong += 1
+        if knowledge.answer(text) is None:
+            avoided += 1
+    orders = sum(1 for _, expected in messages if expected is not None)
+    requests = sum(1 for text, _ in messages if text in REQUESTS)
+
+    print(f"Сообщений: {len(messages)}, из них заказов: {orders}, просьб, похожих на заказ: {requests}")
+    print(f"Разбор: {elapsed / len(messages) * 1e6:.1f} мкс на сообщение, {len(messages) / elapsed:,.0f} сообщений/с")
+    print(
+        f"Заказы: распознано верно {correct} ({correct / orders:.1%}), с ошибкой {wrong}, "
+        f"пропущено {missed}; вопросов, принятых за заказ: {false_orders}"
+    )
+    for text in sorted(false_examples)[:5]:
+        print(f"  принято за заказ: «{text}»")
+    print(f"Вызовов GigaChat сэкономлено: {avoided} ({avoided / len(messages):.1%} всех сообщений)")
+
+    # Сводки: заказы равномерно за hours часов, сводка раз в interval секунд
+    sent = []
+
+    class Bot:
+        async def send_message(self, chat_id, text, **kwargs):
+            sent.append((chat_id, text))
+
+    async def batch():
+        desk = OrderDesk(Bot(), default_chat=1, interval=args.interval)
+        accepted = [order for order in parsed if order is not None and order.lines]
+        duration = args.hours * 3600
+        moments = sorted(rng.uniform(0, duration) for _ in accepted)
+        next_flush = args.interval
+        for moment, order in zip(moments, accepted):
+            while moment >= next_flush:
+                await desk.flush()
+                next_flush += args.interval
+            desk.add(order, car=rng.randrange(1, args.cars + 1), seat=rng.randrange(1, 37), passenger="Иван")
+            await desk.flush(full_only=True)
+        await desk.flush()
+        return len(accepted), desk.stats()
+
+    accepted, stats = asyncio.run(batch())
+    print(
+        f"Проводникам за {args.hours:g} ч, {args.cars} вагонов: {accepted} сообщений по одному на заказ -> "
+        f"{stats['digests']} сводок ({accepted / max(stats['digests'], 1):.1f} заказа на сводку)"
+    )
+
+
+if __name__ == "__main__":
+    main()
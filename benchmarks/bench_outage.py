@@ -0,0 +1,111 @@
+"""Задержка ответа пассажиру, когда GigaChat зависает: без защиты и с автоматом защиты.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_outage --rate 2
+
+Заглушка GigaChat (benchmarks/gigachat_stub.py) проходит три фазы:
+  норма          - ответ за llm-delay секунд;
+  сбой           - запросы зависают на hang секунд;
+  восстановление - снова нормальные ответы.
+Вопросы приходят с частотой rate в handle_message.
+Режимы:
+  без защиты - нет срока ответа и автомата, ожидание ограничено только
+               таймаутом SDK (30 с);
+  с защитой  - срок ответа --timeout, автомат открывается после
+               --failures сбоев и через --recovery с пробует снова.
+Ответом из справки считается сообщение с фрагментом раздела FAQ/информация.
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+
+import bot
+from benchmarks.fakes import bot_context, text_update
+from benchmarks.gigachat_stub import GigaChatStub
+from breaker import CircuitBreaker
+from llm import GigaChatService
+
+QUESTIONS = [
+    "До скольки открыт ресторан",
+    "Сколько стоит постельное бельё",
+    "Можно ли курить в тамбуре",
+    "Где розетка для телефона",
+    "Когда санитарная зона",
+]
+PHASES = (("норма", 10, False), ("сбой", 20, True), ("восстановление", 20, False))
+
+
+async def run(protected, stub, args):
+    if protected:
+        breaker = CircuitBreaker(failure_threshold=args.failures, recovery_timeout=args.recovery)
+        timeout = args.timeout
+    else:
+        breaker = CircuitBreaker(failure_threshold=float("inf"))
+        timeout = None
+    giga = GigaChatService(
+        credentials="stub", scope="GIGACHAT_API_PERS", max_concurrency=100,
+        timeout=timeout, breaker=breaker, **stub.client_options
+    )
+    await giga.start()
+    context = bot_context(gigachat=giga)
+
+    results = {name: [] for name, _, _ in PHASES}
+
+    async def ask(phase, user_id):
+        replies = []
+        update = text_update(f"{QUESTIONS[user_id % len(QUESTIONS)]} №{user_id}", user_id, replies)
+        started = time.perf_counter()
+        await bot.handle_message(update, context)
+        fallback = "Из раздела" in replies[-1] and "недоступен" in replies[-1]
+        results[phase].append((time.perf_counter() - started, fallback))
+
+    tasks = []
+    user_id = 0
+    for phase, count, outage in PHASES:
+        stub.chat_delay = args.hang if outage else args.llm_delay
+        for _ in range(count):
+            user_id += 1
+            tasks.append(asyncio.create_task(ask(phase, user_id)))
+            await asyncio.sleep(1 / args.rate)
+    await asyncio.gather(*tasks)
+    await giga.close()
+    return results, breaker
+
+
+def report(mode, results, breaker):
+    print(f"{mode}:")
+    for phase, values in results.items():
+        latencies = sorted(latency for latency, _ in values)
+        fallbacks = sum(fallback for _, fallback in values)
+        print(
+            f"  {phase:>15}: p50={statistics.median(latencies):6.2f} с  "
+            f"p95={latencies[int(len(latencies) * 0.95) - 1]:6.2f} с  max={latencies[-1]:6.2f} с  "
+            f"ответов из справки {fallbacks}/{len(values)}"
+        )
+    print(f"  автомат: {breaker.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rate", type=float, default=2.0, help="вопросов в секунду")
+    parser.add_argument("--llm-delay", type=float, default=0.3)
+    parser.add_argument("--hang", type=float, default=60.0, help="сколько висит запрос во время сбоя, с")
+    parser.add_argument("--timeout", type=float, default=2.0)
+    parser.add_argument("--failures", type=int, default=3)
+    parser.add_argument("--recovery", type=float, default=5.0)
+    args = parser.parse_args()
+
+    logging.disable(logging.ERROR)
+    bot.GIGACHAT_STREAMING = False
+    for mode, protected in (("без защиты", False), ("с защитой", True)):
+        stub = GigaChatStub(connect_delay=0.0, auth_delay=0.0).start()
+        try:
+            report(mode, *asyncio.run(run(protected, stub, args)))
+        finally:
+            stub.stop()
+
+
+if __name__ == "__main__":
+    main()
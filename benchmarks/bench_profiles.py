@@ -0,0 +1,139 @@
+"""Профили пассажиров: загрузка при запуске, память и запись изменений на 100k профилей.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_profiles --profiles 100000 --changes 1000
+
+Сравниваются два способа хранить профили между перезапусками:
+  sqlite  - ProfileStore: Profile со __slots__ в памяти, SQLite в режиме WAL,
+            изменения записываются пачкой (одна транзакция на flush);
+  pickle  - словарь профилей-словарей, который целиком перезаписывается
+            в файл при каждом сохранении.
+Для каждого выводятся время загрузки при запуске, память профилей
+в процессе (tracemalloc), размер файла, время сохранения --changes
+изменённых профилей и время чтения профиля в обработчике.
+"""
+import argparse
+import asyncio
+import os
+import pickle
+import random
+import tempfile
+import time
+import tracemalloc
+
+from profiles import ProfileStore
+
+TRAINS = ("042А", "025Н")
+TRIPS = ("2026-10-12", "2026-10-14", "2026-10-16")
+
+
+def make_profiles(count, rng):
+    return {
+        100000000 + user_id: (rng.choice(TRAINS), rng.choice(TRIPS), rng.randint(1, 20), rng.randint(1, 54))
+        for user_id in range(count)
+    }
+
+
+def measure_load(load):
+    """(результат, секунд, байт памяти) для функции загрузки: время - без tracemalloc, он замедляет"""
+    started = time.perf_counter()
+    result = load()
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    traced = load()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del traced
+    return result, elapsed, memory
+
+
+def measure_get(get, keys):
+    started = time.perf_counter()
+    for key in keys:
+        get(key)
+    return (time.perf_counter() - started) / len(keys)
+
+
+async def run_sqlite(path, profiles, changes):
+    # Заполнение базы: все профили одной пачкой, как после долгой работы бота
+    store = ProfileStore(path)
+    await store.start()
+    for user_id, (train, trip, car, seat) in profiles.items():
+        store.set(user_id, train=train, trip=trip, car=car, seat=seat)
+    await store.stop()
+
+    def load():
+        loaded = ProfileStore(path)
+        loaded.load()
+        return loaded
+
+    store, load_time, memory = measure_load(load)
+    started = time.perf_counter()
+    for user_id, car, seat in changes:
+        store.set(user_id, train=TRAINS[0], trip=TRIPS[0], car=car, seat=seat)
+    set_time = (time.perf_counter() - started) / len(changes)
+    started = time.perf_counter()
+    await store.flush()
+    flush_time = time.perf_counter() - started
+    get_time = measure_get(store.get, [user_id for user_id, _, _ in changes])
+    await store.stop()
+    size = sum(os.path.getsize(path + suffix) for suffix in ("", "-wal") if os.path.exists(path + suffix))
+    return load_time, memory, size, set_time, flush_time, get_time
+
+
+def run_pickle(path, profiles, changes):
+    data = {
+        user_id: {"train": train, "trip": trip, "car": car, "seat": seat}
+        for user_id, (train, trip, car, seat) in profiles.items()
+    }
+    with open(path, "wb") as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    del data
+
+    def load():
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    data, load_time, memory = measure_load(load)
+    started = time.perf_counter()
+    for user_id, car, seat in changes:
+        data[user_id] = {"train": TRAINS[0], "trip": TRIPS[0], "car": car, "seat": seat}
+    set_time = (time.perf_counter() - started) / len(changes)
+    # Сохранение - весь файл заново, сколько бы профилей ни изменилось
+    started = time.perf_counter()
+    with open(path + ".tmp", "wb") as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(path + ".tmp", path)
+    flush_time = time.perf_counter() - started
+    get_time = measure_get(data.get, [user_id for user_id, _, _ in changes])
+    return load_time, memory, os.path.getsize(path), set_time, flush_time, get_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", type=int, default=100000)
+    parser.add_argument("--changes", type=int, default=1000, help="изменённых профилей между сохранениями")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    profiles = make_profiles(args.profiles, rng)
+    changes = [(rng.choice(list(profiles)), rng.randint(1, 20), rng.randint(1, 54)) for _ in range(args.changes)]
+
+    print(f"Профилей: {args.profiles:,}, изменений между сохранениями: {args.changes:,}\n")
+    print(f"{'хранение':>8} {'загрузка, с':>12} {'память, МБ':>11} {'Б/профиль':>10} {'файл, МБ':>9} "
+          f"{'set, мкс':>9} {'сохранение, мс':>15} {'get, нс':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        results = {
+            "sqlite": asyncio.run(run_sqlite(os.path.join(directory, "profiles.sqlite3"), profiles, changes)),
+            "pickle": run_pickle(os.path.join(directory, "profiles.pickle"), profiles, changes),
+        }
+    for name, (load_time, memory, size, set_time, flush_time, get_time) in results.items():
+        print(f"{name:>8} {load_time:12.3f} {memory / 2 ** 20:11.1f} {memory / args.profiles:10.0f} "
+              f"{size / 2 ** 20:9.1f} {set_time * 1e6:9.2f} {flush_time * 1e3:15.1f} {get_time * 1e9:8.0f}")
+
+
+if __name__ == "__main__":
+    main()
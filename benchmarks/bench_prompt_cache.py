@@ -0,0 +1,121 @@
+"""Входящие токены и задержка GigaChat при разной сборке запроса.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_prompt_cache --passengers 20 --turns 5
+
+Каждый пассажир задаёт turns вопросов подряд, история диалога копится
+в ConversationStore. Сравниваются:
+  строка  - прежний запрос одной репликой user: инструкции, справка, имя и вопрос;
+  system  - роли system/user/assistant, но справка и имя внутри system,
+            поэтому начало запроса меняется с каждым вопросом;
+  сессии  - bot.build_prompt: system одинаков для поезда, справка и имя
+            в вопросе, запросы пассажира идут с X-Session-ID.
+«запрос, мс» - средняя длительность вызова GigaChat (GigaChatService.stats),
+p50 и p95 - вместе с ожиданием в очереди --concurrency одновременных запросов.
+Заглушка (benchmarks/gigachat_stub.py) засчитывает в кэш совпадающее
+с прошлым запросом сессии начало и тратит --prefill-delay секунд на каждый
+входящий токен не из кэша.
+"""
+import argparse
+import asyncio
+import logging
+import random
+import statistics
+import time
+
+import bot
+from content import KNOWLEDGE_SECTIONS
+from conversation import ConversationStore
+from knowledge import KnowledgeIndex
+from llm import GigaChatService, build_chat
+from timetable import Timetable
+
+from benchmarks.gigachat_stub import GigaChatStub
+from benchmarks.updates import QUESTIONS
+
+ANSWER = (
+    "Кипяток есть в титане в начале вагона, он работает круглосуточно ♨️ "
+    "Если титан пуст, скажите проводнику - он вскипятит воду за несколько минут."
+)
+
+
+def single_string(train, reference, user_name, question, history):
+    system_message, text = bot.build_prompt(train, reference, user_name, question)
+    prompt = f"{system_message}\n\n{text}\n\nПроводник:"
+    return build_chat([{"role": "user", "content": prompt}]), False
+
+
+def system_reference(train, reference, user_name, question, history):
+    system_message, _ = bot.build_prompt(train, None, user_name, question)
+    system_message += f"\n\nСправочная информация о поезде:\n{reference}\n\nПассажира зовут {user_name}."
+    return build_chat(history(system_message, question)), False
+
+
+def sessions(train, reference, user_name, question, history):
+    system_message, text = bot.build_prompt(train, reference, user_name, question)
+    return build_chat(history(system_message, text)), True
+
+
+SCENARIOS = (("строка", single_string), ("system", system_reference), ("сессии", sessions))
+
+
+async def run(stub, scenario, args, train, knowledge):
+    service = GigaChatService(credentials="stub", scope="GIGACHAT_API_PERS",
+                              max_concurrency=args.concurrency, **stub.client_options)
+    await service.warm_up()
+    await service.start()
+    store = ConversationStore()
+    latencies = []
+
+    async def passenger(user_id):
+        rng = random.Random(user_id)
+        user_name = f"Пассажир{user_id}"
+        for _ in range(args.turns):
+            question = rng.choice(QUESTIONS)
+            payload, with_session = scenario(
+                train, knowledge.context(question), user_name, question,
+                lambda system, text: store.messages(user_id, system, text)
+            )
+            started = time.perf_counter()
+            response = await service.chat(payload, session_id=user_id if with_session else None)
+            latencies.append(time.perf_counter() - started)
+            store.remember(user_id, question, response.choices[0].message.content)
+
+    try:
+        await asyncio.gather(*(passenger(user_id) for user_id in range(args.passengers)))
+    finally:
+        await service.close()
+    return latencies, service.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--passengers", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--chat-delay", type=float, default=0.05)
+    parser.add_argument("--prefill-delay", type=float, default=0.0002, help="секунд на входящий токен не из кэша")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    train = Timetable.load(bot.TRAINS_PATH).train()
+    knowledge = KnowledgeIndex.from_sections(KNOWLEDGE_SECTIONS)
+    print(f"{'запрос':>8} {'запросов':>9} {'токенов на запрос':>18} {'из кэша':>8} {'запрос, мс':>11} {'p50 с очередью':>15} {'p95':>6}")
+    for name, scenario in SCENARIOS:
+        stub = GigaChatStub(answer=ANSWER, connect_delay=0, auth_delay=0, chat_delay=args.chat_delay,
+                            prefill_delay=args.prefill_delay).start()
+        try:
+            latencies, stats = asyncio.run(run(stub, scenario, args, train, knowledge))
+        finally:
+            stub.stop()
+        latencies.sort()
+        print(
+            f"{name:>8} {stats['requests']:>9} {stats['prompt'] / stats['requests']:18.0f} "
+            f"{stub.precached_tokens / stub.prompt_tokens:8.1%} "
+            f"{stats['mean_latency'] * 1000:11.0f} {statistics.median(latencies) * 1000:15.0f} "
+            f"{latencies[int(len(latencies) * 0.95) - 1] * 1000:6.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
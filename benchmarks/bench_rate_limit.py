@@ -0,0 +1,150 @@
+"""Нагрузочный тест: запросы к заглушке GigaChat с ограничителем и объединением вопросов.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_rate_limit --passengers 300 --duration 10 --llm-delay 2
+
+За duration секунд каждый пассажир задаёт один популярный вопрос
+(распределение Ципфа), а один пассажир присылает spam вопросов в секунду.
+Сравниваются режимы:
+  none     - без ограничений (как раньше, но с кэшем ответов);
+  limit    - корзины токенов на пассажира и общая;
+  coalesce - ограничитель и объединение одинаковых вопросов в работе.
+"""
+import argparse
+import asyncio
+import logging
+import random
+import statistics
+import time
+from types import SimpleNamespace
+
+import gigachat
+
+import bot
+import llm
+from benchmarks.fakes import bot_context, text_update
+from cache import ResponseCache
+from ratelimit import RateLimiter
+from singleflight import SingleFlight
+
+QUESTIONS = [
+    "Посоветуйте книгу в дорогу",
+    "Чем заняться ребёнку в поезде?",
+    "Можно ли провозить кошку?",
+    "Как лучше спать в поезде?",
+    "Что посмотреть в Новосибирске?",
+    "Сколько часовых поясов мы проедем?",
+    "Расскажи анекдот",
+    "Какая погода во Владивостоке?",
+]
+
+
+class StubGigaChat:
+    """Заглушка GigaChat: считает запросы и отвечает с задержкой"""
+
+    delay = 2.0
+    calls = 0
+
+    def __init__(self, **kwargs):
+        pass
+
+    async def achat(self, payload):
+        StubGigaChat.calls += 1
+        await asyncio.sleep(self.delay)
+        message = SimpleNamespace(content="Ответ проводника 🚂")
+        usage = SimpleNamespace(prompt_tokens=60, completion_tokens=12, total_tokens=72)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+
+class NoFlight:
+    """Без объединения: каждый вызов выполняет запрос сам"""
+
+    def __contains__(self, key):
+        return False
+
+    async def run(self, key, factory):
+        return await factory(), True
+
+
+async def run(mode, args):
+    StubGigaChat.calls = 0
+    unlimited = RateLimiter(float("inf"), 1, float("inf"), 1)
+    limiter = RateLimiter(
+        user_rate=bot.USER_RATE_LIMIT / 60,
+        user_burst=bot.USER_RATE_BURST,
+        global_rate=bot.GLOBAL_RATE_LIMIT / 60,
+        global_burst=bot.GLOBAL_RATE_BURST,
+    )
+    context = bot_context(
+        gigachat=llm.GigaChatService(credentials="stub", scope="GIGACHAT_API_PERS", max_concurrency=1000),
+        answer_cache=ResponseCache(),
+        rate_limiter=unlimited if mode == "none" else limiter,
+        llm_flights=SingleFlight() if mode == "coalesce" else NoFlight(),
+    )
+
+    rng = random.Random(args.seed)
+    weights = [1 / (rank + 1) for rank in range(len(QUESTIONS))]
+    schedule = [
+        (rng.uniform(0, args.duration), user_id, rng.choices(QUESTIONS, weights)[0])
+        for user_id in range(args.passengers)
+    ]
+    spam_count = int(args.spam * args.duration)
+    schedule += [(i / args.spam, -1, f"Вопрос номер {i}") for i in range(spam_count)]
+    schedule.sort()
+
+    latencies = []
+
+    async def ask(user_id, text):
+        update = text_update(text, user_id)
+        sent = time.perf_counter()
+        await bot.handle_message(update, context)
+        latencies.append(time.perf_counter() - sent)
+
+    started = time.perf_counter()
+    tasks = []
+    for offset, user_id, text in schedule:
+        await asyncio.sleep(max(0.0, started + offset - time.perf_counter()))
+        tasks.append(asyncio.create_task(ask(user_id, text)))
+    await asyncio.gather(*tasks)
+    return latencies, context.bot_data
+
+
+def report(mode, latencies, bot_data):
+    limiter = bot_data["rate_limiter"].stats()
+    flights = bot_data["llm_flights"]
+    followers = flights.followers if isinstance(flights, SingleFlight) else 0
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f"{mode:>8}: GigaChat={StubGigaChat.calls:5d}  кэш={bot_data['answer_cache'].hits:5d}  "
+        f"объединено={followers:5d}  отказ(пассажир)={limiter['throttled_user']:5d}  "
+        f"отказ(общий)={limiter['throttled_global']:5d}  "
+        f"p50={statistics.median(latencies):5.2f} с  p95={p95:5.2f} с"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--passengers", type=int, default=300)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--spam", type=float, default=5.0, help="вопросов в секунду от одного пассажира")
+    parser.add_argument("--llm-delay", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    # Клиент создаётся лениво (GigaChatService.client) из gigachat.GigaChat
+    gigachat.GigaChat = StubGigaChat
+    bot.GIGACHAT_STREAMING = False
+    StubGigaChat.delay = args.llm_delay
+
+    print(
+        f"Пассажиров: {args.passengers} за {args.duration:.0f} с, спам {args.spam:.0f}/с, "
+        f"задержка GigaChat {args.llm_delay} с"
+    )
+    for mode in ("none", "limit", "coalesce"):
+        report(mode, *asyncio.run(run(mode, args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Процессорное время button_handler на одно нажатие по каждому экрану.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_screens --clicks 20000
+
+Сравниваются готовый реестр экранов (compile_screens при запуске) и
+прежняя схема, где цепочка if/elif на каждое нажатие заново собирала
+клавиатуру InlineKeyboardMarkup. Отправка в Telegram заменена заглушкой,
+поэтому измеряется только работа самого обработчика.
+"""
+import argparse
+import asyncio
+import time
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+import bot
+from benchmarks.fakes import bot_context, callback_update
+from content import BACK_TO_MENU, SCREENS
+from screens import RENDERERS, compile_screens
+
+
+async def legacy_button_handler(update, context):
+    """Прежняя схема: перебор экранов по очереди и новая клавиатура на каждое нажатие"""
+    query = update.callback_query
+    await query.answer()
+    for key, spec in SCREENS.items():
+        if query.data == key:
+            buttons = spec.get("buttons", BACK_TO_MENU)
+            reply_markup = InlineKeyboardMarkup(
+                [[InlineKeyboardButton(label, callback_data=data)] for label, data in buttons]
+            )
+            text = spec["text"]
+            if "dynamic" in spec:
+                text = text.format(**RENDERERS[spec["dynamic"]](context))
+            sent_message = await query.message.reply_text(text, reply_markup=reply_markup)
+            context.bot_data["deletion_scheduler"].schedule(sent_message.chat_id, sent_message.message_id, 60)
+            return
+
+
+async def measure(handler, data, clicks, context):
+    update = callback_update(data)
+    started = time.process_time()
+    for _ in range(clicks):
+        await handler(update, context)
+    return (time.process_time() - started) / clicks
+
+
+async def run(clicks):
+    # Пассажир без места: кнопки вызова показывают подсказку /seat
+    context = bot_context()
+    # Сравнивается только выбор экрана, поэтому обе схемы отправляют новое сообщение
+    bot.MENU_NAVIGATION = "send"
+    keys = [key for key in SCREENS if key not in ("main_menu", "help", "conductor_unavailable", "seat_required")]
+    print(f"{'экран':>16} {'if/elif, мкс':>14} {'реестр, мкс':>12}")
+    totals = [0.0, 0.0]
+    for key in keys:
+        legacy = await measure(legacy_button_handler, key, clicks, context)
+        compiled = await measure(bot.button_handler, key, clicks, context)
+        totals[0] += legacy
+        totals[1] += compiled
+        print(f"{key:>16} {legacy * 1e6:14.1f} {compiled * 1e6:12.1f}")
+    print(f"{'в среднем':>16} {totals[0] / len(keys) * 1e6:14.1f} {totals[1] / len(keys) * 1e6:12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clicks", type=int, default=20000)
+    args = parser.parse_args()
+    started = time.perf_counter()
+    compile_screens(SCREENS)
+    print(f"Сборка реестра экранов при запуске: {(time.perf_counter() - started) * 1000:.2f} мс")
+    asyncio.run(run(args.clicks))
+
+
+if __name__ == "__main__":
+    main()
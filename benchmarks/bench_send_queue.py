@@ -0,0 +1,104 @@
+"""Всплеск из 5k вызовов Bot API: прямая отправка против OutboundQueue.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_send_queue --sends 5000 --chats 1000 --scale 3
+
+Заглушка Telegram (benchmarks/telegram_stub.py) ведёт себя как флуд-контроль
+Telegram: отвечает 429 на сообщения сверх 30 в секунду на бота и сверх
+четырёх за секунду в одном чате. Лимиты заглушки и очереди
+умножены на scale, чтобы прогон занимал секунды, а не минуты.
+Всплеск - ответы пассажирам (sendMessage) вперемешку с фоновым удалением
+(deleteMessages); все вызовы ставятся одновременно. Потерянным считается
+вызов, завершившийся ошибкой.
+"""
+import argparse
+import asyncio
+import logging
+import random
+import statistics
+import time
+from collections import defaultdict
+
+from telegram.ext import ExtBot
+from telegram.request import HTTPXRequest
+
+from benchmarks.telegram_stub import TOKEN, TelegramStub
+from outbound import OutboundQueue
+
+
+async def run(queued, args):
+    # Как у Telegram: 30 сообщений в секунду на бота, в чате - около одного
+    # в секунду с короткими всплесками
+    stub = TelegramStub(
+        latency=args.latency, flood_limit=30 * args.scale, chat_limit=4 * args.scale, retry_after=1
+    ).start()
+    limiter = OutboundQueue(
+        global_rate=30 * args.scale, private_rate=1.0 * args.scale, private_burst=3 * args.scale
+    ) if queued else None
+    bot = ExtBot(
+        TOKEN, base_url=stub.base_url, rate_limiter=limiter,
+        request=HTTPXRequest(connection_pool_size=256, pool_timeout=None)
+    )
+    await bot.initialize()
+
+    rng = random.Random(args.seed)
+    latencies = defaultdict(list)
+    dropped = defaultdict(int)
+
+    async def send(kind, chat_id):
+        started = time.perf_counter()
+        try:
+            if kind == "interactive":
+                await bot.send_message(chat_id, "Ответ проводника 🚂")
+            else:
+                await bot.delete_messages(chat_id, [1, 2, 3])
+        except Exception:
+            dropped[kind] += 1
+            return
+        latencies[kind].append(time.perf_counter() - started)
+
+    calls = [
+        ("background" if rng.random() < args.background else "interactive", 1000 + rng.randrange(args.chats))
+        for _ in range(args.sends)
+    ]
+    started = time.perf_counter()
+    await asyncio.gather(*(send(kind, chat_id) for kind, chat_id in calls))
+    elapsed = time.perf_counter() - started
+    await bot.shutdown()
+    stub.stop()
+    return elapsed, latencies, dropped, stub, limiter
+
+
+def report(mode, elapsed, latencies, dropped, stub, limiter):
+    print(f"{mode}: {elapsed:.1f} с, ответов 429 от заглушки: {stub.errors[429]}")
+    for kind in ("interactive", "background"):
+        values = sorted(latencies[kind])
+        total = len(values) + dropped[kind]
+        line = f"  {kind:>11}: доставлено {len(values)}/{total}, потеряно {dropped[kind]}"
+        if values:
+            line += (
+                f"  p50={statistics.median(values):6.2f} с  "
+                f"p95={values[int(len(values) * 0.95) - 1]:6.2f} с  max={values[-1]:6.2f} с"
+            )
+        print(line)
+    if limiter is not None:
+        print(f"  очередь: {limiter.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sends", type=int, default=5000)
+    parser.add_argument("--chats", type=int, default=1000)
+    parser.add_argument("--background", type=float, default=0.3, help="доля фоновых удалений")
+    parser.add_argument("--latency", type=float, default=0.03, help="задержка Bot API, с")
+    parser.add_argument("--scale", type=float, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    for mode, queued in (("прямая отправка", False), ("OutboundQueue", True)):
+        report(mode, *asyncio.run(run(queued, args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Время до первого видимого текста и число правок при потоковом ответе.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_streaming --tokens 300 --token-delay 0.02
+
+Заглушка GigaChat выдаёт ответ по фрагментам с заданной задержкой.
+Каждая промежуточная правка проверяется на корректность HTML: все
+теги закрыты, а текст модели (в том числе «<», «&») экранирован.
+"""
+import argparse
+import asyncio
+import time
+from html.parser import HTMLParser
+
+from streaming import StreamStats, stream_to_message
+
+HEADER = "<b>🤖 AI Provodnik:</b>\n\n"
+# Фрагменты с символами, которые ломают HTML-разметку Telegram без экранирования
+TOKENS = ["Кипяток ", "в конце ", "вагона ", "<b>", "бесплатно", " & ", "всегда ", "горячий", "! ♨️ "]
+
+
+class TagBalance(HTMLParser):
+    """Проверка, что все открытые теги закрыты"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack = []
+        self.errors = 0
+
+    def handle_starttag(self, tag, attrs):
+        self.stack.append(tag)
+
+    def handle_endtag(self, tag):
+        if not self.stack or self.stack.pop() != tag:
+            self.errors += 1
+
+
+def is_valid_html(text):
+    parser = TagBalance()
+    parser.feed(text)
+    parser.close()
+    return parser.errors == 0 and not parser.stack
+
+
+class RecordingMessage:
+    """Сообщение, запоминающее время и текст каждой правки"""
+
+    def __init__(self, edit_latency):
+        self.edit_latency = edit_latency
+        self.edits = []
+
+    async def edit_text(self, text, **kwargs):
+        await asyncio.sleep(self.edit_latency)
+        self.edits.append((time.monotonic(), text))
+
+
+async def token_stream(count, delay):
+    for i in range(count):
+        await asyncio.sleep(delay)
+        yield TOKENS[i % len(TOKENS)]
+
+
+async def run(args):
+    stats = StreamStats()
+    message = RecordingMessage(args.edit_latency)
+    started = time.monotonic()
+    await stream_to_message(
+        message, token_stream(args.tokens, args.token_delay), HEADER,
+        min_interval=args.interval, stats=stats
+    )
+    finished = time.monotonic()
+    invalid = sum(not is_valid_html(text) for _, text in message.edits)
+    gaps = [b[0] - a[0] for a, b in zip(message.edits, message.edits[1:])]
+
+    print(f"Фрагментов: {args.tokens}, генерация ~{args.tokens * args.token_delay:.1f} с")
+    print(f"Без потока первый текст виден через {finished - started:.2f} с (весь ответ целиком)")
+    print(f"С потоком первый текст виден через {stats.percentile(0.5):.2f} с")
+    print(f"Правок сообщения: {len(message.edits)} (вместо {args.tokens} без объединения), "
+          f"минимальный интервал между правками: {min(gaps, default=0):.2f} с")
+    print(f"Некорректных HTML на промежуточных шагах: {invalid}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=300)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--edit-latency", type=float, default=0.1)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Поиск положения поезда по расписанию: поисков в секунду.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_timetable --lookups 200000
+
+Сравниваются:
+  линейный поиск - перебор остановок до текущего перегона;
+  бисекция       - Train.position по отсортированным моментам прибытия/отправления;
+  Timetable      - положение с кэшем на минуту, как его получают экраны;
+  экран          - полный текст «Где мы сейчас» без кэша полей и с кэшем.
+Кроме поездов из data/trains.json проверяется синтетический поезд
+на --stops остановок, где разница между перебором и бисекцией заметнее.
+"""
+import argparse
+import random
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+
+import screens
+from content import SCREENS
+from timetable import Timetable, Train
+
+TRAINS_PATH = "data/trains.json"
+
+
+def linear_position(train, now):
+    """Прежний способ: перебор остановок по порядку"""
+    trip_start = train.trip_start(now)
+    offset = (now - trip_start).total_seconds()
+    stops = train.stops
+    for index, stop in enumerate(stops):
+        arrive = stop.arrive if stop.arrive is not None else stop.depart
+        depart = stop.depart if stop.depart is not None else stop.arrive
+        if offset < arrive:
+            previous = stops[index - 1]
+            share = (offset - previous.depart) / (arrive - previous.depart)
+            return index - 1, previous.km + share * (stop.km - previous.km)
+        if offset < depart:
+            return index, stop.km
+    return len(stops) - 1, stops[-1].km
+
+
+def synthetic_train(count):
+    """Поезд на count остановок: 20 км и 20 минут между ними, стоянка 2 минуты"""
+    stops = [{"station": "Станция 0", "km": 0, "depart": "0 00:00"}]
+    minute = 0
+    for i in range(1, count):
+        minute += 20
+        stop = {"station": f"Станция {i}", "km": 20 * i,
+                "arrive": f"{minute // 1440} {minute % 1440 // 60:02d}:{minute % 60:02d}"}
+        if i < count - 1:
+            minute += 2
+            stop["depart"] = f"{minute // 1440} {minute % 1440 // 60:02d}:{minute % 60:02d}"
+        stops.append(stop)
+    return Train("999Т", {"name": "Синтетический", "first_departure": "2026-01-01 00:00",
+                          "period_days": (minute // 1440) + 1, "stops": stops})
+
+
+def rate(function, moments):
+    started = time.perf_counter()
+    for now in moments:
+        function(now)
+    return len(moments) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lookups", type=int, default=200000)
+    parser.add_argument("--stops", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    timetable = Timetable.load(TRAINS_PATH)
+    trains = list(timetable.trains.values()) + [synthetic_train(args.stops)]
+    rng = random.Random(args.seed)
+
+    print(f"{'поезд':>8} {'остановок':>10} {'перебор, поиск/с':>18} {'бисекция, поиск/с':>19}")
+    for train in trains:
+        # Случайные моменты внутри рейса, отправившегося первым
+        duration = train.stops[-1].arrive - train.stops[0].depart
+        start = train.first_day + timedelta(seconds=train.stops[0].depart)
+        moments = [start + timedelta(seconds=rng.uniform(0, duration)) for _ in range(args.lookups)]
+        for now in moments[:1000]:
+            assert linear_position(train, now)[0] == train.position(now).index
+        linear = rate(lambda now: linear_position(train, now), moments)
+        bisected = rate(train.position, moments)
+        print(f"{train.number:>8} {len(train.stops):>10} {linear:18,.0f} {bisected:19,.0f}")
+
+    # Много пассажиров одного поезда в пределах минуты: расчёт один, остальные - из кэша
+    now = timetable.clock()
+    context = SimpleNamespace(user_data={}, bot_data={"timetable": timetable})
+    numbers = [rng.choice(list(timetable.trains)) for _ in range(args.lookups)]
+    started = time.perf_counter()
+    for number in numbers:
+        timetable.position(number)
+    cached = args.lookups / (time.perf_counter() - started)
+    print(f"\nTimetable.position с кэшем на минуту: {cached:,.0f} поисков/с ({timetable.stats()})")
+
+    screen = screens.compile_screens(SCREENS)["location"]
+    uncached = screens._location_fields.__wrapped__
+    position = timetable.train().position(now)
+    count = args.lookups // 10
+    started = time.perf_counter()
+    for _ in range(count):
+        screen.text.format(**uncached(position))
+    plain = count / (time.perf_counter() - started)
+    started = time.perf_counter()
+    for _ in range(count):
+        screen.render(context)
+    rendered = count / (time.perf_counter() - started)
+    print(f"Экран «Где мы сейчас»: {plain:,.0f} показов/с без кэша полей, {rendered:,.0f} показов/с с кэшем")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Пропускная способность обработки обновлений в зависимости от числа активных чатов.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_update_processor --updates 1000 --chats 1,10,100,1000
+
+Обновления приходят пачкой, как после паузы в long polling, и подаются
+в обработчик так же, как это делает Application._update_fetcher. Обработчик
+ждёт --fast секунд (вызов Bot API), а доля --slow-share обновлений -
+--slow секунд (ответ GigaChat). Сравниваются:
+  по очереди   - Application по умолчанию (concurrent_updates=1);
+  параллельно  - SimpleUpdateProcessor: быстро, но порядок в чате не гарантирован;
+  по чатам     - ChatUpdateProcessor: параллельно между чатами, по очереди в чате.
+«нарушений порядка» - обновления, обработка которых началась раньше, чем
+закончилось предыдущее обновление того же чата.
+"""
+import argparse
+import asyncio
+import random
+import time
+from types import SimpleNamespace
+
+from telegram.ext import SimpleUpdateProcessor
+
+from processor import ChatUpdateProcessor
+
+
+def make_updates(count, chats, rng):
+    updates = []
+    for number in range(count):
+        chat_id = rng.randrange(chats)
+        updates.append(SimpleNamespace(
+            update_id=number,
+            effective_chat=SimpleNamespace(id=chat_id),
+            effective_user=SimpleNamespace(id=chat_id),
+        ))
+    return updates
+
+
+async def run(processor, updates, args, rng):
+    delays = [args.slow if rng.random() < args.slow_share else args.fast for _ in updates]
+    finished = {}
+    violations = 0
+
+    async def handle(update, delay):
+        nonlocal violations
+        chat_id = update.effective_chat.id
+        # Предыдущее обновление чата ещё не закончилось - порядок нарушен
+        if finished.get(chat_id, -1) != update.previous:
+            violations += 1
+        await asyncio.sleep(delay)
+        finished[chat_id] = update.update_id
+
+    last = {}
+    for update in updates:
+        update.previous = last.get(update.effective_chat.id, -1)
+        last[update.effective_chat.id] = update.update_id
+
+    await processor.initialize()
+    started = time.perf_counter()
+    if processor.max_concurrent_updates > 1:
+        await asyncio.gather(*(
+            asyncio.create_task(processor.process_update(update, handle(update, delay)))
+            for update, delay in zip(updates, delays)
+        ))
+    else:
+        for update, delay in zip(updates, delays):
+            await processor.process_update(update, handle(update, delay))
+    elapsed = time.perf_counter() - started
+    await processor.shutdown()
+    return len(updates) / elapsed, violations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--updates", type=int, default=1000)
+    parser.add_argument("--chats", default="1,10,100,1000")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--fast", type=float, default=0.005)
+    parser.add_argument("--slow", type=float, default=0.3)
+    parser.add_argument("--slow-share", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'чатов':>6} {'обработчик':>12} {'обновлений/с':>13} {'нарушений порядка':>18}  статистика")
+    for chats in (int(value) for value in args.chats.split(",")):
+        for name, make in (
+            ("по очереди", lambda: SimpleUpdateProcessor(1)),
+            ("параллельно", lambda: SimpleUpdateProcessor(args.concurrency)),
+            ("по чатам", lambda: ChatUpdateProcessor(args.concurrency)),
+        ):
+            rng = random.Random(args.seed)
+            updates = make_updates(args.updates, chats, rng)
+            processor = make()
+            rate, violations = asyncio.run(run(processor, updates, args, rng))
+            stats = processor.stats() if isinstance(processor, ChatUpdateProcessor) else ""
+            print(f"{chats:>6} {name:>12} {rate:13,.0f} {violations:>18}  {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Web App со справкой: запросов в секунду и байт на показ против экрана в чате.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_webapp --requests 20000 --connections 20
+
+Страницы собираются WebApp.build из templates/ и content.SCREENS
+и отдаются встроенным HTTPServer. Клиенты держат keep-alive соединения
+и запрашивают случайные разделы:
+  без сжатия - Accept-Encoding не указан;
+  сжатые     - Accept-Encoding: gzip, br (brotli, если пакет установлен);
+  повторный  - If-None-Match с ETag прошлого ответа: 304 без тела.
+Байты на показ - заголовки и тело ответа. Для сравнения - тот же экран
+в чате: запрос editMessageText с текстом и клавиатурой и ответ Bot API,
+который повторяет текст сообщения (без entities - оценка снизу).
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import bot
+from content import SCREENS
+from httpserver import HTTPServer
+from knowledge import strip_html
+from screens import compile_screens
+from webapp import WebApp
+
+
+async def fetch(reader, writer, path, headers):
+    lines = [f"GET {path} HTTP/1.1", "Host: localhost", *(f"{name}: {value}" for name, value in headers.items())]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    fields = dict(
+        line.split(": ", 1) for line in head.decode("latin-1").split("\r\n")[1:] if ": " in line
+    )
+    length = int(fields.get("Content-Length", 0))
+    body = await reader.readexactly(length) if length and status != 304 else b""
+    return status, fields, len(head) + len(body)
+
+
+async def client(port, paths, requests, mode, rng, totals):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    etags = {}
+    for _ in range(requests):
+        path = rng.choice(paths)
+        headers = {}
+        if mode != "без сжатия":
+            headers["Accept-Encoding"] = "gzip, br"
+        if mode == "повторный" and path in etags:
+            headers["If-None-Match"] = etags[path]
+        status, fields, size = await fetch(reader, writer, path, headers)
+        etags[path] = fields.get("ETag")
+        totals["bytes"] += size
+        totals[status] = totals.get(status, 0) + 1
+    writer.close()
+
+
+async def run(args):
+    webapp = WebApp.build(bot.TEMPLATES_DIR, SCREENS, prefix=bot.WEBAPP_PATH)
+    server = HTTPServer()
+    webapp.route(server)
+    port = await server.start("127.0.0.1", 0)
+    paths = sorted(webapp.pages)
+    per_client = args.requests // args.connections
+    results = {}
+    try:
+        for mode in ("без сжатия", "сжатые", "повторный"):
+            totals = {"bytes": 0}
+            started = time.perf_counter()
+            await asyncio.gather(*(
+                client(port, paths, per_client, mode, random.Random(args.seed + i), totals)
+                for i in range(args.connections)
+            ))
+            results[mode] = (per_client * args.connections / (time.perf_counter() - started), totals)
+    finally:
+        await server.stop()
+    return webapp, results
+
+
+def chat_bytes(key):
+    """Байты запроса editMessageText и ответа Bot API для экрана key"""
+    screen = compile_screens(SCREENS)[key]
+    markup = screen.reply_markup.to_dict() if screen.reply_markup else None
+    request = {"chat_id": 123456789, "message_id": 100, "text": screen.text, "parse_mode": "HTML",
+               "reply_markup": markup}
+    response = {"ok": True, "result": {
+        "message_id": 100, "from": {"id": 1, "is_bot": True, "first_name": "AI Provodnik"},
+        "chat": {"id": 123456789, "type": "private"}, "date": 0, "edit_date": 0,
+        "text": strip_html(screen.text), "reply_markup": markup,
+    }}
+    return sum(len(json.dumps(data, ensure_ascii=False).encode("utf-8")) for data in (request, response))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--connections", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    webapp, results = asyncio.run(run(args))
+    print(f"{'показ':>11} {'запросов/с':>11} {'байт на показ':>14}  ответы")
+    for mode, (rate, totals) in results.items():
+        count = sum(value for key, value in totals.items() if key != "bytes")
+        statuses = {key: value for key, value in totals.items() if key != "bytes"}
+        print(f"{mode:>11} {rate:11,.0f} {totals['bytes'] / count:14,.0f}  {statuses}")
+
+    print("\nРаздел в чате (editMessageText, запрос + ответ) против страницы Web App:")
+    for path, page in sorted(webapp.pages.items()):
+        key = path.rsplit("/", 1)[1]
+        if key not in SCREENS:
+            continue
+        compressed = page.brotli or page.gzip or page.body
+        print(
+            f"  {key:>14}: в чате {chat_bytes(key):6,} Б, страница {len(page.body):6,} Б, "
+            f"сжатая {len(compressed):6,} Б, повторный показ - только заголовки 304"
+        )
+
+
+if __name__ == "__main__":
+    main()
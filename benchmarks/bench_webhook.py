@@ -0,0 +1,164 @@
+"""Пропускная способность и p99 задержки: вебхук против long polling на локальной заглушке.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_webhook --updates 5000 --rate 500 --rtt 0.05
+
+Генератор создаёт синтетические обновления с заданной частотой.
+  webhook - обновления отправляются POST-запросами на встроенный сервер
+            (webhook_handler с проверкой секрета), задержка сети rtt/2;
+  polling - обновления копятся в заглушке getUpdates, Bot.get_updates
+            забирает их пачками, каждый ответ заглушки задерживается на rtt.
+Задержка - от создания обновления до его появления в очереди обработки.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from types import SimpleNamespace
+from urllib.parse import parse_qs
+
+import httpx
+from telegram import Bot
+
+from httpserver import HTTPServer, Response
+from webhook import SECRET_HEADER, webhook_handler
+
+TOKEN = "123456:BENCH"
+SECRET = "bench-secret"
+
+
+def make_update(update_id):
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": 1000 + update_id % 500, "type": "private"},
+            "from": {"id": 1000 + update_id % 500, "is_bot": False, "first_name": "Иван"},
+            "text": "Где кипяток?",
+        },
+    }
+
+
+async def consume(queue, sent_at, count, latencies):
+    for _ in range(count):
+        update = await queue.get()
+        latencies.append(time.perf_counter() - sent_at[update.update_id])
+
+
+async def generate(count, rate, emit):
+    started = time.perf_counter()
+    for i in range(count):
+        await asyncio.sleep(max(0.0, started + i / rate - time.perf_counter()))
+        emit(i)
+
+
+async def run_webhook(args):
+    bot = Bot(TOKEN)
+    application = SimpleNamespace(bot=bot, update_queue=asyncio.Queue())
+    server = HTTPServer()
+    server.route("POST", "/telegram", webhook_handler(application, SECRET))
+    port = await server.start("127.0.0.1", 0)
+
+    sent_at, latencies = {}, []
+    limits = httpx.Limits(max_connections=args.connections)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits) as client:
+        posts = []
+
+        async def post(update_id):
+            await asyncio.sleep(args.rtt / 2)
+            await client.post("/telegram", content=json.dumps(make_update(update_id)),
+                              headers={SECRET_HEADER: SECRET, "Content-Type": "application/json"})
+
+        def emit(update_id):
+            sent_at[update_id] = time.perf_counter()
+            posts.append(asyncio.create_task(post(update_id)))
+
+        started = time.perf_counter()
+        consumer = asyncio.create_task(consume(application.update_queue, sent_at, args.updates, latencies))
+        await generate(args.updates, args.rate, emit)
+        await consumer
+        elapsed = time.perf_counter() - started
+        await asyncio.gather(*posts)
+    await server.stop()
+    return elapsed, latencies
+
+
+async def run_polling(args):
+    pending, sent_at, latencies = [], {}, []
+    arrived = asyncio.Event()
+
+    async def get_me(request):
+        return Response.json({"ok": True, "result": {
+            "id": 1, "is_bot": True, "first_name": "Stub", "username": "stub_bot"}})
+
+    async def get_updates(request):
+        params = {key: values[0] for key, values in parse_qs(request.body.decode()).items()}
+        offset = int(params.get("offset", 0))
+        del pending[:sum(1 for update in pending if update["update_id"] < offset)]
+        if not pending:
+            arrived.clear()
+            try:
+                await asyncio.wait_for(arrived.wait(), float(params.get("timeout", 0)))
+            except asyncio.TimeoutError:
+                pass
+        await asyncio.sleep(args.rtt)
+        return Response.json({"ok": True, "result": pending[:int(params.get("limit", 100))]})
+
+    server = HTTPServer()
+    server.route("POST", f"/bot{TOKEN}/getMe", get_me)
+    server.route("POST", f"/bot{TOKEN}/getUpdates", get_updates)
+    port = await server.start("127.0.0.1", 0)
+
+    def emit(update_id):
+        sent_at[update_id] = time.perf_counter()
+        pending.append(make_update(update_id))
+        arrived.set()
+
+    queue = asyncio.Queue()
+
+    async def poll(bot):
+        offset = 0
+        while True:
+            updates = await bot.get_updates(offset=offset, timeout=5, read_timeout=10)
+            for update in updates:
+                await queue.put(update)
+                offset = update.update_id + 1
+
+    async with Bot(TOKEN, base_url=f"http://127.0.0.1:{port}/bot") as bot:
+        started = time.perf_counter()
+        poller = asyncio.create_task(poll(bot))
+        consumer = asyncio.create_task(consume(queue, sent_at, args.updates, latencies))
+        await generate(args.updates, args.rate, emit)
+        await consumer
+        elapsed = time.perf_counter() - started
+        poller.cancel()
+    await server.stop()
+    return elapsed, latencies
+
+
+def report(name, count, elapsed, latencies):
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        f"{name:>8}: {count / elapsed:8.0f} обновл./с  "
+        f"p50={statistics.median(latencies) * 1000:7.1f} мс  p99={p99 * 1000:7.1f} мс"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--updates", type=int, default=5000)
+    parser.add_argument("--rate", type=float, default=500, help="обновлений в секунду")
+    parser.add_argument("--rtt", type=float, default=0.05, help="сетевая задержка до Telegram, с")
+    parser.add_argument("--connections", type=int, default=40, help="как max_connections у setWebhook")
+    args = parser.parse_args()
+
+    print(f"Обновлений: {args.updates}, частота {args.rate:.0f}/с, RTT {args.rtt * 1000:.0f} мс")
+    report("webhook", args.updates, *asyncio.run(run_webhook(args)))
+    report("polling", args.updates, *asyncio.run(run_polling(args)))
+
+
+if __name__ == "__main__":
+    main()
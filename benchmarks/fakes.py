@@ -0,0 +1,95 @@
+"""Подставные объекты Telegram для прямого вызова обработчиков bot.py без сети.
+
+В отличие от telegram_stub.py здесь нет HTTP: обновление и контекст -
+простые объекты с теми полями, которые читают обработчики, поэтому
+измеряется только работа самого бота. bot_context() собирает bot_data,
+как build_application, но без GigaChat, диска и Telegram: кэш ответов
+выключен, ограничитель вопросов пропускает всё, у чата проводников
+нет адреса.
+"""
+import os
+from types import SimpleNamespace
+
+import bot
+from cache import ResponseCache
+from content import KNOWLEDGE_SECTIONS, MENU_TEXT, SCREENS
+from conversation import ConversationStore
+from journal import Journal
+from knowledge import KnowledgeIndex
+from orders import FoodMenu, OrderDesk
+from ratelimit import RateLimiter
+from scheduler import DeletionScheduler
+from screens import compile_screens
+from singleflight import SingleFlight
+from timetable import Timetable
+
+
+class FakeMessage:
+    """Сообщение Telegram без сети; тексты ответов и правок складываются в replies, если он задан"""
+
+    chat_id = 1
+    message_id = 1
+
+    def __init__(self, text="", replies=None):
+        self.text = text
+        self.replies = replies
+
+    async def reply_text(self, text, **kwargs):
+        if self.replies is not None:
+            self.replies.append(text)
+        return FakeMessage(text, self.replies)
+
+    async def reply_photo(self, photo, **kwargs):
+        return FakeMessage("", self.replies)
+
+    async def edit_text(self, text, **kwargs):
+        if self.replies is not None:
+            self.replies.append(text)
+        return self
+
+    async def delete(self):
+        pass
+
+
+async def _noop(*args, **kwargs):
+    pass
+
+
+def _user(user_id):
+    return SimpleNamespace(id=user_id, first_name=f"Пассажир{user_id}")
+
+
+def text_update(text, user_id=1, replies=None):
+    """Текстовое сообщение пассажира user_id"""
+    return SimpleNamespace(
+        message=FakeMessage(text, replies),
+        callback_query=None,
+        effective_user=_user(user_id),
+    )
+
+
+def callback_update(data, user_id=1):
+    """Нажатие кнопки data в сообщении бота"""
+    query = SimpleNamespace(
+        data=data, answer=_noop, edit_message_text=_noop, message=FakeMessage(), from_user=_user(user_id)
+    )
+    return SimpleNamespace(message=None, callback_query=query, effective_user=query.from_user)
+
+
+def bot_context(**bot_data):
+    """Контекст обработчика; bot_data заменяет или дополняет объекты по умолчанию"""
+    defaults = {
+        "answer_cache": ResponseCache(ttl=0),
+        "knowledge": KnowledgeIndex.from_sections(KNOWLEDGE_SECTIONS),
+        "timetable": Timetable.load(bot.TRAINS_PATH),
+        "screens": compile_screens(SCREENS),
+        "food_menu": FoodMenu.from_text(MENU_TEXT),
+        "order_desk": OrderDesk(bot=None),
+        "journal": Journal(None),
+        "deletion_scheduler": DeletionScheduler(bot=None, state_path=os.devnull),
+        "rate_limiter": RateLimiter(float("inf"), 1, float("inf"), 1),
+        "conversations": ConversationStore(),
+        "llm_flights": SingleFlight(),
+    }
+    defaults.update(bot_data)
+    return SimpleNamespace(user_data={}, bot_data=defaults)
@@ -0,0 +1,195 @@
+"""Локальная заглушка GigaChat API для бенчмарков.
+
+Отвечает на запрос токена и на /chat/completions в формате настоящего API,
+в том числе потоком (stream=true, text/event-stream). Задержка нового
+соединения имитирует TLS-рукопожатие, задержка выдачи токена - обмен
+OAuth; доля error_rate запросов к модели завершается ошибкой 500.
+
+Расход токенов (usage) считается по длине сообщений запроса. Как и настоящий
+API, заглушка помнит последний запрос каждой сессии (заголовок X-Session-ID):
+совпадающие с ним первые сообщения засчитываются в precached_prompt_tokens,
+а остальные входящие токены добавляют к ответу prefill_delay секунд на токен.
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class GigaChatStub:
+    """HTTP-заглушка GigaChat в отдельном потоке"""
+
+    def __init__(self, answer="Кипяток в конце вагона ♨️", connect_delay=0.05, auth_delay=0.2,
+                 chat_delay=0.3, token_ttl=1800, error_rate=0.0, chunks=8, prefill_delay=0.0, seed=None):
+        self.answer = answer
+        self.connect_delay = connect_delay
+        self.auth_delay = auth_delay
+        self.chat_delay = chat_delay
+        self.token_ttl = token_ttl
+        self.error_rate = error_rate
+        self.chunks = chunks
+        self.prefill_delay = prefill_delay
+        self.connections = 0
+        self.auth_calls = 0
+        self.chat_calls = 0
+        self.errors = 0
+        self.prompt_tokens = 0
+        self.precached_tokens = 0
+        self._sessions = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        # Клиент, не дождавшийся зависшего ответа, закрывает соединение - это не ошибка заглушки
+        self._server.handle_error = lambda request, client_address: None
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    @property
+    def client_options(self):
+        """Параметры GigaChat(...) для работы через заглушку"""
+        return {"base_url": f"{self.url}/api/v1", "auth_url": f"{self.url}/api/v2/oauth"}
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                stub._count("connections")
+                time.sleep(stub.connect_delay)
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                request = self.rfile.read(length)
+                if self.path.endswith("/oauth"):
+                    stub._count("auth_calls")
+                    time.sleep(stub.auth_delay)
+                    body = {
+                        "access_token": "stub-token",
+                        "expires_at": int((time.time() + stub.token_ttl) * 1000),
+                    }
+                elif self.path.endswith("/chat/completions"):
+                    stub._count("chat_calls")
+                    if stub._fails():
+                        time.sleep(stub.chat_delay / 2)
+                        self._send_json({"status": 500, "message": "stub failure"}, status=500)
+                        return
+                    payload = json.loads(request or b"{}")
+                    usage = stub.usage(payload.get("messages", []), self.headers.get("X-Session-ID"))
+                    time.sleep((usage["prompt_tokens"] - usage["precached_prompt_tokens"]) * stub.prefill_delay)
+                    if payload.get("stream"):
+                        self._send_stream(usage)
+                        return
+                    time.sleep(stub.chat_delay)
+                    body = stub.completion(usage)
+                else:
+                    self.send_error(404)
+                    return
+                self._send_json(body)
+
+            def _send_json(self, body, status=200):
+                data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_stream(self, usage):
+                """Ответ фрагментами SSE, равномерно распределёнными по chat_delay"""
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for piece in stub.pieces(usage):
+                    time.sleep(stub.chat_delay / stub.chunks)
+                    self._write_chunk(f"data: {json.dumps(piece, ensure_ascii=False)}\n\n")
+                self._write_chunk("data: [DONE]\n\n")
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _write_chunk(self, text):
+                data = text.encode("utf-8")
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+    def _fails(self):
+        with self._lock:
+            failed = self._random.random() < self.error_rate
+            self.errors += failed
+        return failed
+
+    def usage(self, messages, session_id):
+        """Расход токенов запроса; начало, совпавшее с прошлым запросом сессии, - из кэша"""
+        sizes = [len(message.get("content", "")) // 3 + 1 for message in messages]
+        keys = [(message.get("role"), message.get("content")) for message in messages]
+        precached = 0
+        with self._lock:
+            if session_id:
+                previous = self._sessions.get(session_id, [])
+                # Последнее сообщение - новый вопрос, он в кэш не попадает
+                for size, key, cached in zip(sizes[:-1], keys, previous):
+                    if key != cached:
+                        break
+                    precached += size
+                self._sessions[session_id] = keys
+            self.prompt_tokens += sum(sizes)
+            self.precached_tokens += precached
+        completion = len(self.answer) // 3 + 1
+        return {
+            "prompt_tokens": sum(sizes),
+            "completion_tokens": completion,
+            "total_tokens": sum(sizes) + completion,
+            "precached_prompt_tokens": precached,
+        }
+
+    def pieces(self, usage=None):
+        """Фрагменты потокового ответа в формате chat.completion.chunk; расход - в последнем"""
+        size = max(1, -(-len(self.answer) // self.chunks))
+        for i in range(0, len(self.answer), size):
+            piece = {
+                "choices": [{"delta": {"role": "assistant", "content": self.answer[i:i + size]}, "index": 0}],
+                "created": int(time.time()),
+                "model": "GigaChat",
+                "object": "chat.completion",
+            }
+            if usage and i + size >= len(self.answer):
+                piece["usage"] = usage
+            yield piece
+
+    def completion(self, usage=None):
+        return {
+            "choices": [{
+                "message": {"role": "assistant", "content": self.answer},
+                "index": 0,
+                "finish_reason": "stop",
+            }],
+            "created": int(time.time()),
+            "model": "GigaChat",
+            "object": "chat.completion",
+            "usage": usage or {"prompt_tokens": 60, "completion_tokens": 12, "total_tokens": 72},
+        }
@@ -0,0 +1,167 @@
+"""Локальная заглушка Telegram Bot API для бенчмарков.
+
+Работает на встроенном HTTPServer в отдельном потоке со своим циклом
+событий, чтобы не занимать цикл бота: Bot(token, base_url=stub.base_url)
+отправляет запросы сюда. Отвечает
+на методы, которые использует бот, объектами в формате настоящего API.
+Каждый ответ задерживается на latency ± jitter секунд; доля error_rate
+запросов завершается ошибкой 500, доля flood_rate - ошибкой 429 с
+retry_after. С flood_limit/chat_limit заглушка, как Telegram, отвечает 429
+на отправку сообщений сверх стольких в секунду на бота / на один чат.
+Отправка в чаты из blocked_chats завершается ошибкой 403, как у Telegram,
+когда пассажир заблокировал бота. Первый getUpdates возвращает updates,
+следующие - пустой список; first_calls - время (time.monotonic) первого
+вызова каждого метода.
+"""
+import asyncio
+import random
+import re
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from urllib.parse import parse_qs
+
+from httpserver import HTTPServer, Response
+
+TOKEN = "123456:BENCH"
+BOT_USER = {"id": 123456, "is_bot": True, "first_name": "AI Provodnik", "username": "provodnik_bench_bot"}
+
+# Поле chat_id в multipart-запросе sendPhoto
+_MULTIPART_CHAT_ID = re.compile(rb'name="chat_id"\r\n\r\n(-?\d+)')
+
+METHODS = (
+    "getMe", "sendMessage", "sendPhoto", "editMessageText", "editMessageReplyMarkup",
+    "answerCallbackQuery", "deleteMessage", "deleteMessages", "setWebhook", "deleteWebhook",
+    "setChatMenuButton", "getUpdates",
+)
+
+
+class TelegramStub:
+    """HTTP-заглушка Bot API со счётчиками вызовов по методам"""
+
+    def __init__(self, latency=0.05, jitter=0.0, error_rate=0.0, flood_rate=0.0, retry_after=1,
+                 flood_limit=None, chat_limit=None, blocked_chats=(), updates=(), seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.flood_rate = flood_rate
+        self.retry_after = retry_after
+        self.flood_limit = flood_limit
+        self.chat_limit = chat_limit
+        self.blocked_chats = set(blocked_chats)
+        self.updates = list(updates)
+        self.first_calls = {}
+        self.calls = Counter()
+        self.errors = Counter()
+        self.port = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._random = random.Random(seed)
+        self._message_ids = Counter()
+        self._recent = deque()
+        self._recent_by_chat = defaultdict(deque)
+        self._server = HTTPServer()
+        for method in METHODS:
+            self._server.route("POST", f"/bot{TOKEN}/{method}", self._handler(method))
+
+    @property
+    def base_url(self):
+        """Значение base_url для Bot/ApplicationBuilder"""
+        return f"http://127.0.0.1:{self.port}/bot"
+
+    def start(self):
+        self._thread.start()
+        self.port = self._call(self._server.start("127.0.0.1", 0))
+        return self
+
+    def stop(self):
+        self._call(self._server.stop())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def _call(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def _handler(self, method):
+        async def handle(request):
+            self.calls[method] += 1
+            self.first_calls.setdefault(method, time.monotonic())
+            delay = self.latency + self._random.uniform(-self.jitter, self.jitter)
+            await asyncio.sleep(max(0.0, delay))
+            roll = self._random.random()
+            flooded = method.startswith(("send", "edit")) and self._flooded(request)
+            if roll < self.error_rate and not flooded:
+                self.errors[500] += 1
+                return Response.json({"ok": False, "error_code": 500, "description": "Internal Server Error"}, 500)
+            if flooded or roll < self.error_rate + self.flood_rate:
+                self.errors[429] += 1
+                return Response.json({
+                    "ok": False,
+                    "error_code": 429,
+                    "description": f"Too Many Requests: retry after {self.retry_after}",
+                    "parameters": {"retry_after": self.retry_after},
+                }, 429)
+            if method == "sendMessage" and self.blocked_chats and self._chat_id(request) in self.blocked_chats:
+                self.errors[403] += 1
+                return Response.json({
+                    "ok": False, "error_code": 403, "description": "Forbidden: bot was blocked by the user"
+                }, 403)
+            return Response.json({"ok": True, "result": self._result(method, request)})
+
+        return handle
+
+    def _flooded(self, request):
+        """Превышен ли лимит сообщений за последнюю секунду (отправка учитывается только при успехе)"""
+        now = time.monotonic()
+        params = parse_qs(request.body.decode("utf-8", "replace")) if request.body[:2] != b"--" else {}
+        chat = self._recent_by_chat[params.get("chat_id", [""])[0]]
+        for window in (self._recent, chat):
+            while window and window[0] <= now - 1:
+                window.popleft()
+        if self.flood_limit is not None and len(self._recent) >= self.flood_limit:
+            return True
+        if self.chat_limit is not None and len(chat) >= self.chat_limit:
+            return True
+        self._recent.append(now)
+        chat.append(now)
+        return False
+
+    @staticmethod
+    def _chat_id(request):
+        values = parse_qs(request.body.decode("utf-8", "replace")).get("chat_id")
+        return int(values[0]) if values else None
+
+    def _result(self, method, request):
+        if method == "getMe":
+            return BOT_USER
+        if method == "getUpdates":
+            updates, self.updates = self.updates, []
+            return updates
+        if method == "sendPhoto":
+            match = _MULTIPART_CHAT_ID.search(request.body)
+            chat_id = int(match.group(1)) if match else 0
+            message = self._message(chat_id)
+            message["photo"] = [{"file_id": "stub-photo", "file_unique_id": "stub", "width": 1280, "height": 720}]
+            return message
+        params = {key: values[0] for key, values in parse_qs(request.body.decode("utf-8")).items()}
+        if method == "sendMessage":
+            message = self._message(int(params["chat_id"]))
+            message["text"] = params.get("text", "")
+            return message
+        if method == "editMessageText":
+            message = self._message(int(params["chat_id"]), int(params["message_id"]))
+            message["text"] = params.get("text", "")
+            return message
+        return True
+
+    def _message(self, chat_id, message_id=None):
+        if message_id is None:
+            self._message_ids[chat_id] += 1
+            message_id = self._message_ids[chat_id]
+        return {
+            "message_id": message_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": BOT_USER,
+        }
@@ -0,0 +1,89 @@
+"""Генератор синтетических обновлений Telegram: /start, нажатия кнопок и вопросы.
+
+Обновления - словари в формате Bot API, как их присылает Telegram;
+Update.de_json превращает их в объекты для Application.process_update.
+"""
+import random
+import time
+
+from content import SCREENS
+
+# Вопросы из справки, популярные вопросы и уникальные - в разных долях
+QUESTIONS = [
+    "Где взять кипяток?",
+    "Когда работает вагон-ресторан?",
+    "Есть ли в поезде Wi-Fi?",
+    "Как зарядить телефон?",
+    "Посоветуйте книгу в дорогу",
+    "Чем заняться ребёнку в поезде?",
+    "Можно ли провозить кошку?",
+    "Как лучше спать в поезде?",
+]
+
+KINDS = ("start", "button", "message")
+
+
+class UpdateGenerator:
+    """Поток обновлений от passengers пассажиров с заданной долей каждого вида"""
+
+    def __init__(self, passengers=1000, mix=(0.1, 0.6, 0.3), unique_questions=0.2, seed=None):
+        self.passengers = passengers
+        self.mix = mix
+        self.unique_questions = unique_questions
+        self._random = random.Random(seed)
+        self._update_id = 0
+        self._buttons = [key for key in SCREENS if key not in ("main_menu", "help")] + ["back_to_menu"]
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        """(вид обновления, данные обновления)"""
+        kind = self._random.choices(KINDS, self.mix)[0]
+        user_id = 1000 + self._random.randrange(self.passengers)
+        self._update_id += 1
+        if kind == "start":
+            return kind, self._message(user_id, "/start", command=True)
+        if kind == "button":
+            return kind, self._callback(user_id, self._random.choice(self._buttons))
+        if self._random.random() < self.unique_questions:
+            text = f"Вопрос пассажира №{self._update_id} про поездку"
+        else:
+            weights = [1 / (rank + 1) for rank in range(len(QUESTIONS))]
+            text = self._random.choices(QUESTIONS, weights)[0]
+        return kind, self._message(user_id, text)
+
+    def take(self, count):
+        return [next(self) for _ in range(count)]
+
+    def _user(self, user_id):
+        return {"id": user_id, "is_bot": False, "first_name": f"Пассажир{user_id}"}
+
+    def _message(self, user_id, text, command=False):
+        message = {
+            "message_id": self._update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": self._user(user_id),
+            "text": text,
+        }
+        if command:
+            message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(text)}]
+        return {"update_id": self._update_id, "message": message}
+
+    def _callback(self, user_id, data):
+        return {
+            "update_id": self._update_id,
+            "callback_query": {
+                "id": str(self._update_id),
+                "from": self._user(user_id),
+                "chat_instance": str(user_id),
+                "data": data,
+                "message": {
+                    "message_id": self._update_id,
+                    "date": int(time.time()),
+                    "chat": {"id": user_id, "type": "private"},
+                    "text": "Меню",
+                },
+            },
+        }
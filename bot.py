@@ -1,12 +1,46 @@
+import time
+# Отсчёт холодного запуска (startup.py) - до остальных импортов, чтобы учесть и их
+STARTED = time.perf_counter()
 import os
+import html
+import re
 import logging
 import asyncio
-from datetime import datetime
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
-from telegram.ext import Application, CommandHandler, MessageHandler, CallbackQueryHandler, filters, ContextTypes
+import math
+import secrets
+from telegram import MenuButtonWebApp, Update, WebAppInfo
+from telegram.ext import Application, CommandHandler, MessageHandler, CallbackQueryHandler, TypeHandler, filters, ContextTypes
 from telegram.constants import ParseMode
-from gigachat import GigaChat
+from telegram.error import BadRequest
 from dotenv import load_dotenv
+from llm import GigaChatService, build_chat
+from breaker import CircuitBreaker, CircuitOpenError
+from cache import ResponseCache
+from content import CONDUCTOR_REQUESTS, KNOWLEDGE_SECTIONS, MENU_TEXT, SCREENS
+from knowledge import KnowledgeIndex, strip_html
+from conversation import ConversationStore, refers_back
+from orders import FoodMenu, OrderDesk
+from journal import Journal
+from profiles import MAX_CAR, ProfileStore, parse_place
+from broadcast import Broadcaster
+from ratelimit import RateLimiter
+from singleflight import SingleFlight
+from textnorm import normalize_question
+from screens import NO_PLACE, compile_screens
+from timetable import Timetable, trip_label
+from streaming import StreamStats, stream_to_message
+from brand import BrandImage
+from scheduler import DeletionScheduler
+from httpserver import HTTPServer
+from webhook import webhook_handler, health_handler, serve_webhook
+from outbound import OutboundQueue
+from processor import ChatUpdateProcessor
+from webapp import WebApp
+from instrumentation import ERRORS, PENDING_DELETIONS, InstrumentedRequest, count_error, metrics_handler, timed
+from startup import StartupTimer
+
+STARTUP = StartupTimer(STARTED)
+STARTUP.mark("imports")
 
 # Настройка логирования
 logging.basicConfig(
@@ -17,26 +51,145 @@ logger = logging.getLogger(__name__)
 
 # Загрузка переменных окружения
 load_dotenv()
+STARTUP.mark("dotenv")
 
 # Получение конфигурационных данных
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
+# Адрес своего сервера Bot API (например, http://localhost:8081/bot); по умолчанию - api.telegram.org
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL")
 GIGACHAT_API_KEY = os.getenv("GIGACHAT_API_KEY")
 GIGACHAT_SCOPE = os.getenv("GIGACHAT_SCOPE")
 GIGACHAT_VERIFY_SSL = os.getenv("GIGACHAT_VERIFY_SSL", "false").lower() == "true"
 BRAND_IMAGE_PATH = os.getenv("BRAND_IMAGE_PATH", "assets/brand.jpg")
+BRAND_FILE_ID_PATH = os.getenv("BRAND_FILE_ID_PATH", "state/brand_file_id.json")
+DELETION_QUEUE_PATH = os.getenv("DELETION_QUEUE_PATH", "state/pending_deletions.json")
+# Публичный https-адрес Web App со справкой (например, https://bot.example.ru/app/):
+# его открывает кнопка меню рядом с полем ввода. Страницы отдаёт встроенный сервер по WEBAPP_PATH
 MENU_URL = os.getenv("MENU_URL")
+WEBAPP_PATH = os.getenv("WEBAPP_PATH", "/app")
+WEBAPP_MAX_AGE = int(os.getenv("WEBAPP_MAX_AGE", "3600"))
+TEMPLATES_DIR = os.getenv("TEMPLATES_DIR", "templates")
+# Расписания поездов и номер поезда, который показывается, пока пассажир не выбрал свой
+TRAINS_PATH = os.getenv("TRAINS_PATH", "data/trains.json")
+TRAIN_NUMBER = os.getenv("TRAIN_NUMBER")
+GIGACHAT_MAX_CONCURRENCY = int(os.getenv("GIGACHAT_MAX_CONCURRENCY", "4"))
+
+# Срок ответа GigaChat (секунды) и автомат защиты: после стольких сбоев подряд
+# вопросы сразу получают ответ из справки, пробный запрос - через RECOVERY секунд
+GIGACHAT_TIMEOUT = float(os.getenv("GIGACHAT_TIMEOUT", "20"))
+GIGACHAT_BREAKER_FAILURES = int(os.getenv("GIGACHAT_BREAKER_FAILURES", "5"))
+GIGACHAT_BREAKER_RECOVERY = float(os.getenv("GIGACHAT_BREAKER_RECOVERY", "30"))
+
+# Потоковый вывод ответа: сообщение дописывается не чаще раза в интервал (секунды)
+GIGACHAT_STREAMING = os.getenv("GIGACHAT_STREAMING", "true").lower() == "true"
+STREAM_EDIT_INTERVAL = float(os.getenv("STREAM_EDIT_INTERVAL", "1.0"))
+
+# Кэш ответов: размер, срок жизни и короткий срок для вопросов о положении поезда
+# (ANSWER_CACHE_SHORT_TTL=0 - такие ответы не кэшируются вовсе)
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "1000"))
+ANSWER_CACHE_TTL = int(os.getenv("ANSWER_CACHE_TTL", "1800"))
+ANSWER_CACHE_SHORT_TTL = int(os.getenv("ANSWER_CACHE_SHORT_TTL", "60"))
+
+# Ограничение вопросов к GigaChat (в минуту): на пассажира и на весь бот, с запасом burst
+USER_RATE_LIMIT = float(os.getenv("USER_RATE_LIMIT", "5"))
+USER_RATE_BURST = int(os.getenv("USER_RATE_BURST", "3"))
+GLOBAL_RATE_LIMIT = float(os.getenv("GLOBAL_RATE_LIMIT", "120"))
+GLOBAL_RATE_BURST = int(os.getenv("GLOBAL_RATE_BURST", "30"))
+
+# Память диалога: пар вопрос-ответ на пассажира, бюджет токенов истории в запросе
+# и через сколько секунд тишины диалог начинается заново
+CONVERSATION_TURNS = int(os.getenv("CONVERSATION_TURNS", "4"))
+CONVERSATION_TOKEN_BUDGET = int(os.getenv("CONVERSATION_TOKEN_BUDGET", "1000"))
+CONVERSATION_IDLE_TTL = int(os.getenv("CONVERSATION_IDLE_TTL", "900"))
+
+# Сводки заказов еды проводникам: общий чат и чаты по вагонам («7:-100123,8:-100456»),
+# сводка уходит раз в ORDER_DIGEST_INTERVAL секунд или сразу при ORDER_DIGEST_MAX заказах
+CONDUCTOR_CHAT_ID = os.getenv("CONDUCTOR_CHAT_ID")
+CONDUCTOR_CHATS = os.getenv("CONDUCTOR_CHATS", "")
+ORDER_DIGEST_INTERVAL = float(os.getenv("ORDER_DIGEST_INTERVAL", "120"))
+ORDER_DIGEST_MAX = int(os.getenv("ORDER_DIGEST_MAX", "10"))
+# Повторное нажатие «позвать проводника» в течение стольких секунд не шлёт новое сообщение
+CONDUCTOR_CALL_COOLDOWN = float(os.getenv("CONDUCTOR_CALL_COOLDOWN", "120"))
+
+# Объявления проводников (/announce из чатов проводников) пассажирам, указавшим место:
+# BROADCAST_CONCURRENCY одновременных отправок, удаление у пассажиров через BROADCAST_TTL секунд
+BROADCAST_STATE_PATH = os.getenv("BROADCAST_STATE_PATH", "state/broadcasts.json")
+BROADCAST_CONCURRENCY = int(os.getenv("BROADCAST_CONCURRENCY", "16"))
+BROADCAST_TTL = int(os.getenv("BROADCAST_TTL", "1800"))
+
+# Исходящие вызовы Bot API (в секунду): на весь бот и на личный чат с запасом burst,
+# для групп - в минуту. TELEGRAM_GLOBAL_RATE=0 - без очереди
+TELEGRAM_GLOBAL_RATE = float(os.getenv("TELEGRAM_GLOBAL_RATE", "30"))
+TELEGRAM_CHAT_RATE = float(os.getenv("TELEGRAM_CHAT_RATE", "1"))
+TELEGRAM_CHAT_BURST = int(os.getenv("TELEGRAM_CHAT_BURST", "3"))
+TELEGRAM_GROUP_RATE = float(os.getenv("TELEGRAM_GROUP_RATE", "20"))
+
+# Обработка обновлений: столько одновременно для разных чатов, в одном чате - по порядку.
+# UPDATE_CONCURRENCY=1 - все обновления строго по очереди, как раньше
+UPDATE_CONCURRENCY = int(os.getenv("UPDATE_CONCURRENCY", "64"))
+UPDATE_MAX_PENDING = int(os.getenv("UPDATE_MAX_PENDING", "4096"))
+
+# Режим получения обновлений: polling или webhook
+BOT_MODE = os.getenv("BOT_MODE", "polling").lower()
+WEBHOOK_URL = os.getenv("WEBHOOK_URL")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/telegram")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET") or secrets.token_urlsafe(32)
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8080"))
+
+# Порт встроенного сервера в режиме polling: /metrics и Web App (в режиме вебхука - на основном порту)
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+# Журнал вопросов и ответов (JSONL) для разбора частых вопросов: пусто - не вести.
+# Сброс на диск раз в JOURNAL_FSYNC_INTERVAL секунд, сжатие и новый файл после JOURNAL_MAX_MB
+JOURNAL_PATH = os.getenv("JOURNAL_PATH", "state/requests.jsonl") or None
+JOURNAL_FSYNC_INTERVAL = float(os.getenv("JOURNAL_FSYNC_INTERVAL", "5"))
+JOURNAL_MAX_MB = float(os.getenv("JOURNAL_MAX_MB", "50"))
+JOURNAL_BACKUPS = int(os.getenv("JOURNAL_BACKUPS", "10"))
+
+# Профили пассажиров (поезд, вагон, место) в SQLite: пусто - только в памяти до перезапуска.
+# Изменения записываются пачками раз в PROFILES_FLUSH_INTERVAL секунд
+PROFILES_PATH = os.getenv("PROFILES_PATH", "state/profiles.sqlite3") or None
+PROFILES_FLUSH_INTERVAL = float(os.getenv("PROFILES_FLUSH_INTERVAL", "2"))
+
+# Навигация по меню: edit - экран открывается в том же сообщении, send - новым сообщением
+MENU_NAVIGATION = os.getenv("MENU_NAVIGATION", "edit").lower()
+
+# Бот обрабатывает только сообщения и нажатия кнопок
+ALLOWED_UPDATES = [Update.MESSAGE, Update.CALLBACK_QUERY]
 
 # Время автоудаления сообщений (в секундах)
 AUTO_DELETE_TIME = 60
 
 
-async def delete_message_later(message, delay=AUTO_DELETE_TIME):
-    """Удаляет сообщение через заданное время"""
-    try:
-        await asyncio.sleep(delay)
-        await message.delete()
-    except Exception as e:
-        logger.error(f"Не удалось удалить сообщение: {e}")
+def schedule_deletion(context: ContextTypes.DEFAULT_TYPE, message, delay=AUTO_DELETE_TIME):
+    """Ставит сообщение в общую очередь автоудаления"""
+    context.bot_data["deletion_scheduler"].schedule(message.chat_id, message.message_id, delay)
+
+
+def build_prompt(train, reference, user_name, question):
+    """Системное сообщение и текст вопроса для GigaChat.
+
+    Системное сообщение одинаково для всех пассажиров поезда, а справка и имя
+    идут в вопрос: начало запроса (system и история диалога) не меняется
+    от вопроса к вопросу и берётся из кэша сессии GigaChat"""
+    system_message = (
+        f"Вы - AI Provodnik, умный помощник пассажиров в поезде №{train.number} «{train.name}» "
+        f"{train.route}. "
+        "Отвечайте вежливо, кратко и по существу. Используйте эмодзи для дружелюбности. "
+        "Перед вопросом может быть справочная информация о поезде - опирайтесь на неё."
+    )
+    parts = []
+    if reference:
+        parts.append(f"Справочная информация о поезде:\n{reference}")
+    parts.append(f"Пассажир {user_name}: {question}")
+    return system_message, "\n\n".join(parts)
+
+
+def addresses(answer, name):
+    """Обращается ли ответ GigaChat (уже экранированный для HTML) к пассажиру по имени.
+    Имя ищется отдельным словом: «Ян» не находится в «январе»"""
+    return re.search(rf"(?<!\w){re.escape(html.escape(name, quote=False))}(?!\w)", answer) is not None
 
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -46,64 +199,63 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if update.message:
         chat = update.message
         # Отправка логотипа только при первом запуске
+        # После первой загрузки картинка отправляется по file_id, без повторной передачи байтов
         try:
-            with open(BRAND_IMAGE_PATH, 'rb') as photo:
-                await chat.reply_photo(photo)
+            await context.bot_data["brand_image"].send(chat)
         except Exception as e:
             logger.error(f"Ошибка отправки картинки: {e}")
-    elif update.callback_query:
-        chat = update.callback_query.message
-        await update.callback_query.answer()
     else:
         return
     
-    keyboard = [
-        [InlineKeyboardButton("🚂 Мой поезд", callback_data='my_train')],
-        [InlineKeyboardButton("🍜 Меню у проводника", callback_data='menu')],
-        [InlineKeyboardButton("🎯 Услуги в поезде", callback_data='services')],
-        [InlineKeyboardButton("📍 Где мы сейчас?", callback_data='location')],
-        [InlineKeyboardButton("ℹ️ Полезная информация", callback_data='info')],
-        [InlineKeyboardButton("❓ Частые вопросы", callback_data='faq')],
-        [InlineKeyboardButton("📞 Связаться с проводником", callback_data='conductor')],
-        [InlineKeyboardButton("🎮 Развлечения", callback_data='entertainment')],
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    welcome_message = (
-        "<b>🚂 Здравствуйте! Я AI Provodnik</b> - ваш цифровой помощник в пути!\n\n"
-        "Я помогу вам с:\n"
-        "✅ Информацией о поезде и маршруте\n"
-        "✅ Заказом еды и напитков\n"
-        "✅ Услугами в вагоне\n"
-        "✅ Ответами на любые вопросы\n\n"
-        "<i>Выберите нужный раздел или просто задайте вопрос:</i>"
-    )
-    
+    screen = context.bot_data["screens"]["main_menu"]
     sent_message = await chat.reply_text(
-        welcome_message, 
-        reply_markup=reply_markup,
+        screen.render(context),
+        reply_markup=screen.reply_markup,
         parse_mode=ParseMode.HTML
     )
     
     # Запланировать удаление через 60 секунд
-    asyncio.create_task(delete_message_later(sent_message))
+    schedule_deletion(context, sent_message)
 
 
 async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Обработчик команды /help"""
-    help_text = (
-        "<b>ℹ️ Помощь по использованию бота:</b>\n\n"
-        "🚂 /start - Главное меню\n"
-        "❓ /help - Эта справка\n\n"
-        "<b>💬 Вы можете:</b>\n"
-        "• Выбрать нужный раздел из меню\n"
-        "• Задать любой вопрос текстом\n"
-        "• Попросить помощь в любое время\n\n"
-        "Я работаю 24/7 и всегда рад помочь! 🤖\n\n"
-        "<i>⏱️ Сообщения автоматически удаляются через 60 секунд</i>"
+    screen = context.bot_data["screens"]["help"]
+    sent_message = await update.message.reply_text(screen.render(context), parse_mode=ParseMode.HTML)
+    schedule_deletion(context, sent_message)
+
+
+async def show_screen(query, context: ContextTypes.DEFAULT_TYPE, screen):
+    """Показывает экран в сообщении с нажатой кнопкой, а если его нельзя изменить - новым сообщением"""
+    text = screen.render(context)
+    if MENU_NAVIGATION == "edit":
+        try:
+            await query.edit_message_text(
+                text,
+                reply_markup=screen.reply_markup,
+                parse_mode=ParseMode.HTML
+            )
+        except BadRequest as e:
+            # Повторное нажатие на ту же кнопку: сообщение уже показывает этот экран
+            if "not modified" not in str(e).lower():
+                logger.warning(f"Не удалось изменить сообщение меню, отправляем новое: {e}")
+                sent_message = await query.message.reply_text(
+                    text,
+                    reply_markup=screen.reply_markup,
+                    parse_mode=ParseMode.HTML
+                )
+                schedule_deletion(context, sent_message)
+                return
+        # Меню живёт, пока им пользуются: срок удаления отсчитывается от последнего нажатия
+        schedule_deletion(context, query.message)
+        return
+    
+    sent_message = await query.message.reply_text(
+        text,
+        reply_markup=screen.reply_markup,
+        parse_mode=ParseMode.HTML
     )
-    sent_message = await update.message.reply_text(help_text, parse_mode=ParseMode.HTML)
-    asyncio.create_task(delete_message_later(sent_message))
+    schedule_deletion(context, sent_message)
 
 
 async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -111,462 +263,565 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
     
-    if query.data == 'back_to_menu':
-        await start(update, context)
+    # Экраны собраны при запуске: готовые тексты и клавиатуры, рендерятся только динамические поля
+    key = "main_menu" if query.data == 'back_to_menu' else query.data
+    request = CONDUCTOR_REQUESTS.get(key)
+    if request is not None:
+        # «Проводник вызван» - только если просьба действительно ушла в чат проводника вагона
+        desk = context.bot_data["order_desk"]
+        car, seat = context.user_data.get("car"), context.user_data.get("seat")
+        if car is None or seat is None:
+            key = "seat_required"
+        elif not desk.accepts(car) or not await desk.call(
+            request, car, seat, passenger=html.escape(query.from_user.first_name), user_id=query.from_user.id
+        ):
+            key = "conductor_unavailable"
+    screen = context.bot_data["screens"].get(key)
+    if screen is None:
+        logger.warning(f"Неизвестная кнопка: {query.data}")
         return
     
-    # Кнопка "Назад" для всех меню
-    back_button = [[InlineKeyboardButton("◀️ Назад в меню", callback_data='back_to_menu')]]
-    
-    if query.data == 'my_train':
-        train_text = (
-            "<b>🚂 ИНФОРМАЦИЯ О ВАШЕМ ПОЕЗДЕ</b>\n\n"
-            "🎫 Поезд: <b>№042А «Россия»</b>\n"
-            "📍 Маршрут: <b>Москва → Владивосток</b>\n"
-            "🚉 Отправление: Москва (Ярославский вокзал) - <code>13:20</code>\n"
-            "🏁 Прибытие: Владивосток - через 6 дней, <code>02:25</code>\n\n"
-            
-            "<b>📊 ТЕКУЩИЙ СТАТУС:</b>\n"
-            "⏱️ В пути: <i>2 дня 14 часов</i>\n"
-            "📍 Последняя станция: <b>Новосибирск</b>\n"
-            "⏰ Время стоянки было: 25 минут\n"
-            "➡️ Следующая остановка: <b>Красноярск</b> (через 8 часов)\n\n"
-            
-            "<b>🗺️ ОСНОВНЫЕ ОСТАНОВКИ:</b>\n"
-            "✅ Москва → Киров → Пермь → Екатеринбург → Тюмень → Омск → Новосибирск\n"
-            "➡️ Красноярск → Иркутск → Улан-Удэ → Чита → Хабаровск → Владивосток\n\n"
-            
-            "🚃 Ваш вагон: <b>№7</b> (купе)\n"
-            "🔢 Место: <b>24</b> (верхнее)\n\n"
-            
-            "<i>💡 Для уточнения информации задайте вопрос в чат</i>"
-        )
-        sent_message = await query.message.reply_text(
-            train_text,
-            reply_markup=InlineKeyboardMarkup(back_button),
-            parse_mode=ParseMode.HTML
-        )
-        asyncio.create_task(delete_message_later(sent_message))
-    
-    elif query.data == 'menu':
-        menu_text = (
-            "<b>🍜 МЕНЮ У ПРОВОДНИКА</b>\n\n"
-            
-            "<b>☕ ГОРЯЧИЕ НАПИТКИ:</b>\n"
-            "• Чай чёрный - <code>50₽</code>\n"
-            "• Чай зелёный - <code>50₽</code>\n"
-            "• Кофе растворимый - <code>80₽</code>\n"
-            "• Кофе 3 в 1 - <code>60₽</code>\n"
-            "• Какао - <code>70₽</code>\n"
-            "• Горячий шоколад - <code>90₽</code>\n\n"
-            
-            "<b>🍜 БЫСТРОЕ ПИТАНИЕ:</b>\n"
-            "• Лапша Доширак (говядина) - <code>120₽</code>\n"
-            "• Лапша Роллтон (курица) - <code>100₽</code>\n"
-            "• Пюре быстрого приготовления - <code>80₽</code>\n"
-            "• Каша овсяная моментальная - <code>70₽</code>\n"
-            "• Супчик в стакане - <code>110₽</code>\n\n"
-            
-            "<b>🍪 СНЕКИ И СЛАДОСТИ:</b>\n"
-            "• Печенье (упаковка) - <code>80₽</code>\n"
-            "• Шоколад Алёнка - <code>90₽</code>\n"
-            "• Чипсы Lay's - <code>120₽</code>\n"
-            "• Сухарики - <code>70₽</code>\n"
-            "• Орешки солёные - <code>100₽</code>\n"
-            "• Конфеты (ассорти) - <code>150₽</code>\n\n"
-            
-            "<b>🥤 ХОЛОДНЫЕ НАПИТКИ:</b>\n"
-            "• Вода минеральная 0.5л - <code>60₽</code>\n"
-            "• Сок в ассортименте 0.2л - <code>80₽</code>\n"
-            "• Coca-Cola 0.33л - <code>100₽</code>\n"
-            "• Энергетик Red Bull - <code>150₽</code>\n\n"
-            
-            "<b>🍞 ГОТОВАЯ ЕДА:</b>\n"
-            "• Бутерброды (сыр/колбаса) - <code>150₽</code>\n"
-            "• Пирожки (в ассортименте) - <code>80₽</code>\n"
-            "• Сосиски в тесте - <code>100₽</code>\n\n"
-            
-            "<b>💰 ОПЛАТА:</b>\n"
-            "Наличные или карта (Мир, Visa, MasterCard)\n\n"
-            
-            "<b>📞 ДЛЯ ЗАКАЗА:</b>\n"
-            "Нажмите 'Связаться с проводником' → 'Заказать еду в купе'\n"
-            "Или напишите в чат что хотите заказать\n\n"
-            "♨️ <i>Кипяток для лапши/чая - БЕСПЛАТНО (в конце вагона)</i>"
-        )
-        sent_message = await query.message.reply_text(
-            menu_text,
-            reply_markup=InlineKeyboardMarkup(back_button),
-            parse_mode=ParseMode.HTML
-        )
-        asyncio.create_task(delete_message_later(sent_message))
-    
-    elif query.data == 'services':
-        services_text = (
-            "<b>🎯 УСЛУГИ В ВАШЕМ ПОЕЗДЕ</b>\n\n"
-            
-            "<b>☕ ПИТАНИЕ:</b>\n"
-            "• Напитки и снеки у проводника\n"
-            "• Доставка еды в купе\n"
-            "• Горячая вода (бесплатно)\n\n"
-            
-            "<b>🛏️ ПОСТЕЛЬНОЕ БЕЛЬЁ:</b>\n"
-            "• Комплект включён в стоимость\n"
-            "• Смена белья по запросу\n"
-            "• Дополнительные подушки/одеяла\n\n"
-            
-            "<b>🚿 ГИГИЕНА:</b>\n"
-            "• Туалеты в начале и конце вагона\n"
-            "• Умывальники с горячей водой\n"
-            "• Мыло и полотенца у проводника\n\n"
-            
-            "<b>📱 СВЯЗЬ И ИНТЕРНЕТ:</b>\n"
-            "• Wi-Fi в вагоне (бесплатно)\n"
-            "• Розетки в каждом купе (220В)\n"
-            "• Зарядные устройства у проводника\n\n"
-            
-            "<b>🎮 РАЗВЛЕЧЕНИЯ:</b>\n"
-            "• Библиотека книг/журналов\n"
-            "• Настольные игры\n"
-            "• Фильмы и музыка (бесплатно)\n\n"
-            
-            "<b>🏥 МЕДИЦИНА:</b>\n"
-            "• Аптечка первой помощи\n"
-            "• Вызов врача на станциях\n\n"
-            
-            "<b>🔐 БЕЗОПАСНОСТЬ:</b>\n"
-            "• Охрана поезда\n"
-            "• Камеры видеонаблюдения\n"
-            "• Тревожная кнопка в купе\n\n"
-            
-            "<i>📞 Для заказа услуг нажмите 'Связаться с проводником'</i>"
-        )
-        sent_message = await query.message.reply_text(
-            services_text,
-            reply_markup=InlineKeyboardMarkup(back_button),
-            parse_mode=ParseMode.HTML
-        )
-        asyncio.create_task(delete_message_later(sent_message))
-    
-    elif query.data == 'location':
-        current_time = datetime.now().strftime("%H:%M")
-        location_text = (
-            f"<b>📍 ГДЕ МЫ СЕЙЧАС</b>\n\n"
-            f"🕐 Текущее время: <code>{current_time}</code> (МСК+4)\n"
-            f"🚂 Поезд находится в движении\n\n"
-            
-            "<b>📊 ПОСЛЕДНЯЯ СТАНЦИЯ:</b>\n"
-            "🚉 <b>Новосибирск-Главный</b>\n"
-            "⏰ Отправление: 45 минут назад\n"
-            "✅ Остановка прошла по расписанию\n\n"
-            
-            "<b>➡️ СЛЕДУЮЩАЯ ОСТАНОВКА:</b>\n"
-            "🚉 <b>Красноярск-Пассажирский</b>\n"
-            "⏱️ Прибытие через: ~8 часов (около 21:30)\n"
-            "⏳ Стоянка: 15 минут\n"
-            "🛒 На вокзале: магазины, кафе, аптека\n\n"
-            
-            "<b>🗺️ ПРОГРЕСС МАРШРУТА:</b>\n"
-            "Пройдено: ████████░░░░░░░░ 40%\n"
-            "Осталось: ~4200 км до Владивостока\n\n"
-            
-            "<b>🌡️ ПОГОДА ЗА БОРТОМ:</b>\n"
-            "🌤️ Малооблачно, <code>-12°C</code>\n"
-            "💨 Ветер: северо-западный, 5 м/с\n\n"
-            
-            "<i>💡 Следите за объявлениями проводника о приближении к станциям</i>"
-        )
-        sent_message = await query.message.reply_text(
-            location_text,
-            reply_markup=InlineKeyboardMarkup(back_button),
-            parse_mode=ParseMode.HTML
-        )
-        asyncio.create_task(delete_message_later(sent_message))
-    
-    elif query.data == 'info':
-        info_text = (
-            "<b>ℹ️ ПОЛЕЗНАЯ ИНФОРМАЦИЯ</b>\n\n"
-            
-            "<b>🕐 РЕЖИМ РАБОТЫ:</b>\n"
-            "• Проводники: круглосуточно\n"
-            "• Туалеты закрываются за 15 мин до/после станций\n\n"
-            
-            "<b>💰 ОПЛАТА:</b>\n"
-            "• Наличные (рубли)\n"
-            "• Банковские карты (Мир, Visa, MasterCard)\n"
-            "• СБП (переводы по номеру телефона)\n\n"
-            
-            "<b>📱 WI-FI:</b>\n"
-            "• Сеть: «RZD_Free_WiFi»\n"
-            "• Пароль: указан в купе на стикере\n"
-            "• Скорость: до 5 Мбит/с\n"
-            "• Без ограничения трафика\n\n"
-            
-            "<b>🔌 РОЗЕТКИ:</b>\n"
-            "• В каждом купе: 2 розетки 220В\n"
-            "• В коридоре: дополнительные розетки\n"
-            "• Можно заряжать ноутбуки и телефоны\n\n"
-            
-            "<b>🌡️ КЛИМАТ:</b>\n"
-            "• Кондиционер работает автоматически\n"
-            "• Температура: +22-24°C\n"
-            "• Регулировка в купе невозможна\n\n"
-            
-            "<b>📦 БАГАЖ:</b>\n"
-            "• Ручная кладь: под столиком и на полках\n"
-            "• Крупные вещи: под нижними полками\n"
-            "• Ценности: храните при себе\n\n"
-            
-            "<b>🚭 КУРЕНИЕ:</b>\n"
-            "• В поезде курение запрещено!\n"
-            "• Курить можно на станциях (в отведённых местах)\n"
-            "• Штраф за курение в поезде: от 1000₽\n\n"
-            
-            "<b>📞 ЭКСТРЕННЫЕ ТЕЛЕФОНЫ:</b>\n"
-            "• Горячая линия РЖД: <code>8-800-775-00-00</code>\n"
-            "• Полиция: <code>102</code>\n"
-            "• Скорая помощь: <code>103</code>\n\n"
-            
-            "<i>💡 При возникновении проблем - нажмите 'Связаться с проводником'</i>"
-        )
-        sent_message = await query.message.reply_text(
-            info_text,
-            reply_markup=InlineKeyboardMarkup(back_button),
-            parse_mode=ParseMode.HTML
-        )
-        asyncio.create_task(delete_message_later(sent_message))
-    
-    elif query.data == 'faq':
-        faq_text = (
-            "<b>❓ ЧАСТЫЕ ВОПРОСЫ</b>\n\n"
-            
-            "❔ <b>Где взять кипяток?</b>\n"
-            "✅ В конце каждого вагона есть титан с кипятком (бесплатно)\n\n"
-            
-            "❔ <b>Можно ли провозить алкоголь?</b>\n"
-            "✅ Да, но распивать можно только в купе и в меру\n"
-            "⛔ Пьяных дебоширов высаживают на ближайшей станции\n\n"
-            
-            "❔ <b>Что делать при краже вещей?</b>\n"
-            "✅ Немедленно сообщить проводнику\n"
-            "✅ На крупных станциях вызовут полицию\n\n"
-            
-            "❔ <b>Можно ли перейти в другой вагон?</b>\n"
-            "✅ Да, все вагоны соединены\n"
-            "⚠️ Будьте осторожны при переходе между вагонами\n\n"
-            
-            "❔ <b>Где купить еду, если нет денег?</b>\n"
-            "✅ На крупных станциях есть магазины и кафе\n"
-            "✅ У проводника можно купить чай/кофе\n\n"
-            
-            "❔ <b>Что делать, если плохо себя чувствую?</b>\n"
-            "✅ Сообщить проводнику\n"
-            "✅ В поезде есть аптечка\n"
-            "✅ На станциях можно вызвать врача\n\n"
-            
-            "❔ <b>Можно ли выйти на станции?</b>\n"
-            "✅ Да, но следите за временем стоянки!\n"
-            "⚠️ Поезд не будет ждать опоздавших\n\n"
-            
-            "❔ <b>Где сушить мокрые вещи?</b>\n"
-            "✅ В купе есть батареи отопления\n"
-            "✅ В туалете есть крючки для одежды\n\n"
-            
-            "❔ <b>Работает ли мобильная связь?</b>\n"
-            "✅ Да, но на некоторых участках может пропадать\n"
-            "✅ В вагоне есть бесплатный Wi-Fi\n\n"
-            
-            "❔ <b>Могу ли я поменять место?</b>\n"
-            "✅ По согласованию с другими пассажирами - да\n"
-            "✅ Официально - только через кассу на станции\n\n"
-            
-            "<i>💬 Не нашли ответ? Задайте вопрос в чат или проводнику!</i>"
-        )
-        sent_message = await query.message.reply_text(
-            faq_text,
-            reply_markup=InlineKeyboardMarkup(back_button),
-            parse_mode=ParseMode.HTML
-        )
-        asyncio.create_task(delete_message_later(sent_message))
-    
-    elif query.data == 'conductor':
-        conductor_keyboard = [
-            [InlineKeyboardButton("📞 Позвать проводника", callback_data='call_conductor')],
-            [InlineKeyboardButton("🍽️ Заказать еду в купе", callback_data='order_food')],
-            [InlineKeyboardButton("🛏️ Попросить бельё/полотенце", callback_data='request_linen')],
-            [InlineKeyboardButton("🔧 Сообщить о проблеме", callback_data='report_issue')],
-            [InlineKeyboardButton("◀️ Назад в меню", callback_data='back_to_menu')]
-        ]
-        conductor_text = (
-            "<b>📞 СВЯЗЬ С ПРОВОДНИКОМ</b>\n\n"
-            "Выберите, чем вам помочь:\n\n"
-            "• Позвать проводника к купе\n"
-            "• Заказать доставку еды\n"
-            "• Попросить постельное бельё\n"
-            "• Сообщить о проблеме\n\n"
-            "⏰ Проводники работают посменно 24/7\n"
-            "⚡ Среднее время отклика: 5-10 минут\n\n"
-            "🚨 <b>В экстренных случаях нажмите тревожную кнопку в купе!</b>"
+    await show_screen(query, context, screen)
+
+
+async def load_profile(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Профиль пассажира из памяти в context.user_data до остальных обработчиков:
+    место читают экраны, заказы еды и GigaChat. Место действует, пока рейс не прибыл"""
+    user = update.effective_user
+    if user is None:
+        return
+    timetable = context.bot_data["timetable"]
+    user_data = context.user_data
+    if "car" in user_data and not timetable.is_over(user_data.get("train"), user_data.get("trip")):
+        return
+    for key in ("train", "trip", "car", "seat"):
+        user_data.pop(key, None)
+    profile = context.bot_data["profiles"].get(user.id)
+    if profile is not None and not timetable.is_over(profile.train, profile.trip):
+        user_data.update(train=profile.train, trip=profile.trip, car=profile.car, seat=profile.seat)
+
+
+def resolve_trip(timetable, train, day):
+    """Рейс по дате, написанной пассажиром или проводником; без даты - последний ушедший рейс в пути.
+    (рейс или None, рейсы поезда в пути)"""
+    trips = timetable.trips(train)
+    if day is not None:
+        return timetable.find_trip(train, day), trips
+    return (trips[0] if trips else None), trips
+
+
+def ask_trip(number, day, trips, example):
+    """Просьба указать дату отправления: поезд с одним номером идёт несколькими рейсами"""
+    lines = []
+    if day is not None:
+        lines.append(f"😔 Поезд №{number} не отправлялся {html.escape(day)} или этот рейс уже прибыл.")
+    lines.append(f"🗓️ Укажите дату отправления поезда, например: <code>{example}</code>")
+    if trips:
+        lines.append(f"Сейчас в пути рейсы от {', '.join(trip_label(trip) for trip in trips)}")
+    return "\n".join(lines)
+
+
+async def seat_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Обработчик команды /seat [поезд] [дата отправления] <вагон> <место> - пассажир указывает место на рейс"""
+    place = parse_place(context.args)
+    timetable = context.bot_data["timetable"]
+    train = context.user_data.get("train")
+    if place is not None and place[0] is not None:
+        train = timetable.find(place[0])
+        if train is None:
+            place = None
+    if place is None:
+        text = (
+            "🎫 Укажите вагон и место, например: <code>/seat 7 24</code>\n"
+            "Если вы едете не в поезде по умолчанию, добавьте номер поезда и дату отправления: "
+            "<code>/seat 042А 15.10 7 24</code>\n\n"
+            f"Поезда: {', '.join(timetable.trains)}"
         )
-        sent_message = await query.message.reply_text(
-            conductor_text,
-            reply_markup=InlineKeyboardMarkup(conductor_keyboard),
-            parse_mode=ParseMode.HTML
+        sent_message = await update.message.reply_text(text, parse_mode=ParseMode.HTML)
+        schedule_deletion(context, sent_message)
+        return
+
+    _, day, car, seat = place
+    train = timetable.train(train).number
+    trip, trips = resolve_trip(timetable, train, day)
+    if trip is None:
+        text = ask_trip(train, day, trips, f"/seat {train} {trip_label(trips[0]) if trips else '15.10'} {car} {seat}")
+    else:
+        context.bot_data["profiles"].set(update.effective_user.id, train=train, trip=trip, car=car, seat=seat)
+        context.user_data.update(train=train, trip=trip, car=car, seat=seat)
+        text = (
+            f"✅ Запомнил: поезд <b>№{train}</b>, рейс от {trip_label(trip)}, "
+            f"вагон <b>№{car}</b>, место <b>№{seat}</b>\n"
+            "Проводник увидит его в вызовах и заказах"
         )
-        asyncio.create_task(delete_message_later(sent_message))
-    
-    elif query.data == 'call_conductor':
-        sent_message = await query.message.reply_text(
-            "<b>✅ Проводник вызван!</b>\n\n"
-            "📍 Ваше купе: <b>№24</b>, вагон <b>№7</b>\n"
-            "⏰ Проводник подойдёт в течение 5-10 минут\n\n"
-            "<i>Пожалуйста, оставайтесь в купе и ожидайте.</i>",
-            reply_markup=InlineKeyboardMarkup(back_button),
+        if day is None and len(trips) > 1:
+            text += (
+                f"\n\nЕсли вы едете рейсом от {trip_label(trips[1])} или раньше, укажите дату отправления: "
+                f"<code>/seat {train} {trip_label(trips[1])} {car} {seat}</code>"
+            )
+    sent_message = await update.message.reply_text(text, parse_mode=ParseMode.HTML)
+    schedule_deletion(context, sent_message)
+
+
+def _split_word(text):
+    """Первое слово и остаток текста (переводы строк в остатке сохраняются)"""
+    parts = text.split(None, 1)
+    if not parts:
+        return "", ""
+    return parts[0], parts[1] if len(parts) > 1 else ""
+
+
+async def announce_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Обработчик команды /announce [поезд] [дата отправления] [вагон N] <текст> из чата проводников -
+    объявление пассажирам рейса"""
+    if not context.bot_data["order_desk"].is_conductor(update.effective_chat.id):
+        logger.warning(f"/announce не из чата проводников: {update.effective_chat.id}")
+        return
+    timetable = context.bot_data["timetable"]
+    # Текст берётся из сообщения, а не из context.args: так сохраняются переводы строк
+    _, rest = _split_word(update.message.text)
+    word, remainder = _split_word(rest)
+    train = timetable.find(word) if word else None
+    if train is None:
+        train = timetable.default
+    else:
+        rest = remainder
+    # Дата рейса - «16.10» или «16.10.2026», если за ней есть текст и такой рейс в пути;
+    # «15.40 стоянка сокращена» - время, а не дата. Без даты - последний ушедший рейс
+    word, remainder = _split_word(rest)
+    day = None
+    if remainder.strip() and timetable.find_trip(train, word) is not None:
+        day = word
+        rest = remainder
+    # Вагон - только словом «вагон»: «15 минут стоянка» не должно уйти в вагон №15
+    car = None
+    word, remainder = _split_word(rest)
+    number, remainder = _split_word(remainder)
+    if word.lower() == "вагон" and number.isdigit() and 1 <= int(number) <= MAX_CAR:
+        car = int(number)
+        rest = remainder
+    text = rest.strip()
+    if not text:
+        await update.message.reply_text(
+            "📣 Объявление пассажирам: <code>/announce текст</code> - всему поезду, "
+            "<code>/announce вагон 7 текст</code> - вагону №7. "
+            "Объявление уходит последнему ушедшему рейсу; для другого рейса добавьте дату отправления: "
+            "<code>/announce 042А 15.10 текст</code>",
             parse_mode=ParseMode.HTML
         )
-        asyncio.create_task(delete_message_later(sent_message))
-    
-    elif query.data == 'order_food':
-        sent_message = await query.message.reply_text(
-            "<b>🍜 Меню доступно по кнопке 'Меню у проводника' в главном меню.</b>\n\n"
-            "📝 <b>Для заказа:</b>\n"
-            "1. Посмотрите меню\n"
-            "2. Напишите в чат что хотите заказать\n"
-            "<i>Например: 'Хочу лапшу Доширак и кофе 3 в 1'</i>\n\n"
-            "3. Проводник принесёт заказ в купе\n\n"
-            "💰 Оплата при получении (наличные или карта)\n"
-            "⏰ Время доставки: 5-10 минут",
-            reply_markup=InlineKeyboardMarkup(back_button),
-            parse_mode=ParseMode.HTML
+        return
+
+    trip, trips = resolve_trip(timetable, train, day)
+    if trip is None:
+        example = f"/announce {train} {trip_label(trips[0]) if trips else '15.10'} текст"
+        await update.message.reply_text(ask_trip(train, day, trips, example), parse_mode=ParseMode.HTML)
+        return
+
+    target = f"поезд №{train}, рейс от {trip_label(trip)}" + (f", вагон №{car}" if car is not None else "")
+    recipients = context.bot_data["profiles"].passengers(train, trip, car, default_train=timetable.default)
+    if not recipients:
+        await update.message.reply_text(f"😔 Нет пассажиров, указавших место через /seat ({target})")
+        return
+    context.bot_data["broadcaster"].announce(
+        f"<b>📢 Объявление проводника</b>\n\n{html.escape(text)}",
+        recipients,
+        target,
+        origin=update.effective_chat.id
+    )
+    estimate = f", около {math.ceil(len(recipients) / TELEGRAM_GLOBAL_RATE)} с" if TELEGRAM_GLOBAL_RATE > 0 else ""
+    await update.message.reply_text(
+        f"📣 Отправляю объявление: {len(recipients)} пассажирам ({target}){estimate}. Отчёт о доставке придёт сюда"
+    )
+
+
+async def take_order(update: Update, context: ContextTypes.DEFAULT_TYPE, order):
+    """Подтверждение распознанного заказа еды; проводник получит его в сводке по вагону.
+    False, если пассажир не указал место или заказ некому передать"""
+    desk = context.bot_data["order_desk"]
+    car, seat = context.user_data.get("car"), context.user_data.get("seat")
+    if order.lines and (car is None or seat is None):
+        # Без места проводник не знает, куда нести заказ
+        sent_message = await update.message.reply_text(
+            f"{NO_PLACE} и повторите заказ", parse_mode=ParseMode.HTML
         )
-        asyncio.create_task(delete_message_later(sent_message))
-    
-    elif query.data == 'request_linen':
-        sent_message = await query.message.reply_text(
-            "<b>✅ Запрос принят!</b>\n\n"
-            "📍 Ваше купе: <b>№24</b>, вагон <b>№7</b>\n"
-            "🛏️ Проводник принесёт:\n"
-            "• Чистое постельное бельё\n"
-            "• Или дополнительное полотенце\n\n"
-            "⏰ В течение 10 минут",
-            reply_markup=InlineKeyboardMarkup(back_button),
+        schedule_deletion(context, sent_message)
+        return False
+    if order.lines and not desk.accepts(car):
+        # Чат проводника не настроен: не обещать пассажиру, что заказ принесут
+        sent_message = await update.message.reply_text(
+            "<b>😔 Заказы через бота сейчас не принимаются.</b>\n\n"
+            "Обратитесь к проводнику вагона: его служебное купе - в начале вагона",
             parse_mode=ParseMode.HTML
         )
-        asyncio.create_task(delete_message_later(sent_message))
-    
-    elif query.data == 'report_issue':
-        sent_message = await query.message.reply_text(
-            "<b>🔧 Опишите проблему в чат:</b>\n\n"
-            "Например:\n"
-            "• Не работает розетка\n"
-            "• Холодно в купе\n"
-            "• Не закрывается дверь\n"
-            "• Шумные соседи\n\n"
-            "<i>Проводник будет уведомлён и решит проблему.</i>",
-            reply_markup=InlineKeyboardMarkup(back_button),
-            parse_mode=ParseMode.HTML
+        schedule_deletion(context, sent_message)
+        logger.warning(f"🧾 Заказ из вагона {car} отклонён: чат проводника не настроен")
+        return False
+    parts = []
+    if order.lines:
+        desk.add(
+            order,
+            car=car,
+            seat=seat,
+            passenger=html.escape(update.effective_user.first_name)
         )
-        asyncio.create_task(delete_message_later(sent_message))
-    
-    elif query.data == 'entertainment':
-        entertainment_text = (
-            "<b>🎮 РАЗВЛЕЧЕНИЯ В ПУТИ</b>\n\n"
-            
-            "<b>📚 БИБЛИОТЕКА:</b>\n"
-            "• Художественная литература\n"
-            "• Журналы и газеты\n"
-            "• Детские книги\n"
-            "📍 У проводника в начале вагона\n\n"
-            
-            "<b>🎬 КИНО И СЕРИАЛЫ:</b>\n"
-            "• Wi-Fi с доступом к онлайн-кинотеатрам\n"
-            "• Рекомендуем: ivi, Okko, КиноПоиск\n"
-            "• Не забудьте наушники!\n\n"
-            
-            "<b>🎲 НАСТОЛЬНЫЕ ИГРЫ:</b>\n"
-            "• Шахматы, шашки\n"
-            "• Карты (дурак, покер)\n"
-            "• Монополия\n"
-            "• Игры для детей\n"
-            "📍 Взять у проводника\n\n"
-            
-            "<b>🎵 МУЗЫКА:</b>\n"
-            "• Spotify, Яндекс.Музыка, VK Музыка\n"
-            "• Работает через Wi-Fi\n"
-            "• Не мешайте соседям - используйте наушники\n\n"
-            
-            "<b>📱 МОБИЛЬНЫЕ ИГРЫ:</b>\n"
-            "Топ игр для долгой дороги:\n"
-            "• Subway Surfers\n"
-            "• Candy Crush\n"
-            "• Chess.com\n"
-            "• Words of Wonders\n\n"
-
-            
-            "<b>🎨 ТВОРЧЕСТВО:</b>\n"
-            "• Раскраски (для детей)\n"
-            "• Блокноты для рисования\n"
-            "• Пазлы\n\n"
-            
-            "<b>👥 СОЦИАЛЬНОЕ:</b>\n"
-            "• Знакомство с попутчиками\n"
-            "• Беседы в тамбуре\n"
-            "• Совместные игры\n\n"
-            
-            "<i>💡 Хорошего путешествия!</i>"
+        parts.append(
+            f"<b>🧾 Заказ принят!</b>\n\n{order.describe()}\n\n"
+            f"💰 Итого: <b>{order.total}₽</b>, оплата при получении\n"
+            "⏰ Проводник принесёт заказ в течение 10-15 минут"
         )
-        sent_message = await query.message.reply_text(
-            entertainment_text,
-            reply_markup=InlineKeyboardMarkup(back_button),
-            parse_mode=ParseMode.HTML
+    for options in order.ambiguous:
+        parts.append("❓ Уточните, пожалуйста: " + " или ".join(f"«{item.name}»" for item in options))
+    if order.missing:
+        parts.append(
+            f"😔 Этого нет в меню: {html.escape(', '.join(order.missing))}. "
+            "Всё, что есть, - в разделе «Меню у проводника» (/start)"
         )
-        asyncio.create_task(delete_message_later(sent_message))
+    sent_message = await update.message.reply_text("\n\n".join(parts), parse_mode=ParseMode.HTML)
+    schedule_deletion(context, sent_message)
+    logger.info(f"🧾 Заказ на {order.total}₽ без GigaChat")
+    return True
 
 
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Обработка текстовых сообщений через GigaChat AI"""
     user_message = update.message.text
     user_name = update.effective_user.first_name
+    user_id = update.effective_user.id
+    # Текст вопроса - в журнал из фонового потока, а не в синхронный лог
+    logger.debug("Получено сообщение от %s: %s", user_name, user_message)
+    started = time.perf_counter()
+    # Чем закончился вопрос: order, order_refused, knowledge, cache, throttled, gigachat, shared или fallback
+    outcome = None
+    details = {}
     
-    logger.info(f"Получено сообщение от {user_name}: {user_message}")
+    answer_header = "<b>🤖 AI Provodnik:</b>\n\n"
+    sent_message = None
     
     try:
-        with GigaChat(
-            credentials=GIGACHAT_API_KEY,
-            scope=GIGACHAT_SCOPE,
-            verify_ssl_certs=False
-        ) as giga:
-            
-            system_message = (
-                "Вы - AI Provodnik, умный помощник пассажиров в поезде №042А «Россия» Москва-Владивосток. "
-                "Отвечайте вежливо, кратко и по существу. Используйте эмодзи для дружелюбности."
-            )
-            full_prompt = f"{system_message}\n\nПассажир {user_name}: {user_message}\n\nПроводник:"
-            
-            response = giga.chat(full_prompt)
-            bot_response = response.choices[0].message.content
+        # Заказ по меню распознаётся локально и сразу попадает в очередь вагона
+        order = context.bot_data["food_menu"].parse_order(user_message)
+        if order is not None:
+            details["total"] = order.total
+            outcome = "order" if await take_order(update, context, order) else "order_refused"
+            return
+
+        # Ответ из справочных разделов бота - без обращения к GigaChat
+        knowledge = context.bot_data["knowledge"]
+        passage = knowledge.answer(user_message)
+        cache = context.bot_data["answer_cache"]
+        conversations = context.bot_data["conversations"]
+        # Запрос к GigaChat у каждого поезда свой: кэш и объединение вопросов - в пределах поезда
+        train = context.bot_data["timetable"].train(context.user_data.get("train"))
+        # Уточняющий вопрос («а сколько стоит?») понятен только в контексте диалога,
+        # поэтому общий кэш и чужие ответы для него не подходят. Вопрос без отсылок
+        # к сказанному идёт через кэш, даже если диалог уже начат
+        follow_up = refers_back(user_message) and bool(conversations.history(user_id))
+        if passage is not None:
+            outcome = "knowledge"
+            details["section"] = passage.section
+            bot_response = f"{passage.html}\n\n<i>📖 Из раздела «{passage.title}»</i>"
+            logger.info(f"📖 Локальный ответ из раздела {passage.section}")
+        elif not follow_up and (bot_response := cache.get(user_message, train.number)) is not None:
+            outcome = "cache"
+            logger.info(f"⚡ Ответ из кэша (попаданий: {cache.hits}, промахов: {cache.misses})")
+        elif context.bot_data["gigachat"].breaker.is_open:
+            # GigaChat недавно не отвечал - не ждать таймаута, а сразу ответить из справки
+            raise CircuitOpenError("GigaChat временно недоступен")
+        else:
+            # Одинаковый вопрос уже задан и ждёт ответа - присоединиться к нему бесплатно
+            question_key = None if follow_up else (train.number, normalize_question(user_message))
+            flights = context.bot_data["llm_flights"]
+            rate_limiter = context.bot_data["rate_limiter"]
+
+            async def reply_throttled(retry_after):
+                nonlocal sent_message
+                sent_message = await update.message.reply_text(
+                    "<b>🙏 Проводник не успевает за вашими вопросами.</b>\n\n"
+                    f"Задайте следующий через {math.ceil(retry_after)} с, "
+                    "а пока загляните в меню /start - там ответы на частые вопросы.",
+                    parse_mode=ParseMode.HTML
+                )
+                schedule_deletion(context, sent_message)
+                logger.info(f"🚦 Вопрос от {user_name} отклонён ограничителем")
+
+            if question_key not in flights:
+                retry_after = rate_limiter.acquire(user_id)
+                if retry_after:
+                    outcome = "throttled"
+                    await reply_throttled(retry_after)
+                    return
+            
+            async def ask_gigachat():
+                nonlocal sent_message
+                # Подходящие фрагменты справки помогают ответить точнее и короче
+                system_message, question = build_prompt(
+                    train, knowledge.context(user_message), user_name, user_message
+                )
+                # Роли system/user/assistant и недавняя история в пределах бюджета токенов;
+                # в истории остаются сами вопросы, без справки
+                payload = build_chat(conversations.messages(user_id, system_message, question))
+                
+                # Общий клиент создаётся в main(): соединение и токен переиспользуются,
+                # а асинхронный вызов не блокирует кнопки и /start других пассажиров
+                giga = context.bot_data["gigachat"]
+                if GIGACHAT_STREAMING:
+                    # Пассажир сразу видит, что вопрос принят, а ответ появляется по частям
+                    sent_message = await update.message.reply_text(
+                        f"{answer_header}<i>⏳ Проводник печатает...</i>",
+                        parse_mode=ParseMode.HTML
+                    )
+                    schedule_deletion(context, sent_message)
+                    answer = await stream_to_message(
+                        sent_message,
+                        giga.stream(payload, session_id=user_id),
+                        answer_header,
+                        min_interval=STREAM_EDIT_INTERVAL,
+                        stats=context.bot_data["stream_stats"]
+                    )
+                else:
+                    response = await giga.chat(payload, session_id=user_id)
+                    answer = html.escape(response.choices[0].message.content, quote=False)
+                return answer, user_name
+            
+            if question_key is not None:
+                (bot_response, asked_by), asked_here = await flights.run(question_key, ask_gigachat)
+            else:
+                (bot_response, asked_by), asked_here = await ask_gigachat(), True
+            outcome = "gigachat" if asked_here else "shared"
+            if not asked_here:
+                logger.info("🔗 Ответ на одинаковый вопрос другого пассажира")
+                # Ответ с обращением к другому пассажиру не годится - спросить отдельно,
+                # но это уже свой запрос к GigaChat и он проходит через ограничитель
+                if addresses(bot_response, asked_by):
+                    retry_after = rate_limiter.acquire(user_id)
+                    if retry_after:
+                        outcome = "throttled"
+                        await reply_throttled(retry_after)
+                        return
+                    bot_response, asked_by = await ask_gigachat()
+                    outcome = "gigachat"
+            # Ответ с обращением по имени другим пассажирам не подходит
+            if not follow_up and not addresses(bot_response, asked_by):
+                cache.put(user_message, bot_response, train.number)
         
-        sent_message = await update.message.reply_text(
-            f"<b>🤖 AI Provodnik:</b>\n\n{bot_response}",
-            parse_mode=ParseMode.HTML
-        )
-        logger.info(f"✅ Ответ отправлен")
+        answer_text = html.unescape(strip_html(bot_response))
+        conversations.remember(user_id, user_message, answer_text)
+        details["answer"] = answer_text
         
-        # Удалить через 60 секунд
-        asyncio.create_task(delete_message_later(sent_message))
+        if sent_message is None:
+            sent_message = await update.message.reply_text(
+                f"{answer_header}{bot_response}",
+                parse_mode=ParseMode.HTML
+            )
+            # Удалить через 60 секунд
+            schedule_deletion(context, sent_message)
+        logger.info("✅ Ответ отправлен")
         
     except Exception as e:
-        error_message = (
-            "<b>😔 Извините, AI временно недоступен.</b>\n\n"
-            "Вы можете:\n"
-            "• Выбрать раздел из меню /start\n"
-            "• Позвать проводника\n"
-            "• Посмотреть FAQ\n\n"
-            "<i>⏱️ Это сообщение удалится через 60 секунд</i>"
-        )
-        sent_message = await update.message.reply_text(error_message, parse_mode=ParseMode.HTML)
+        ERRORS.labels("handle_message", type(e).__name__).inc()
         logger.error(f"❌ ОШИБКА AI: {str(e)}")
-        asyncio.create_task(delete_message_later(sent_message))
+        outcome = "fallback"
+        details["error"] = type(e).__name__
+        # Лучший подходящий раздел справки вместо ожидания и пустого извинения
+        passage = context.bot_data["knowledge"].fallback(user_message)
+        if passage is not None:
+            details["section"] = passage.section
+            error_message = (
+                "<b>😔 AI временно недоступен, но вот что может помочь:</b>\n\n"
+                f"{passage.html}\n\n"
+                f"<i>📖 Из раздела «{passage.title}». Другие ответы - в меню /start</i>"
+            )
+        else:
+            error_message = (
+                "<b>😔 Извините, AI временно недоступен.</b>\n\n"
+                "Вы можете:\n"
+                "• Выбрать раздел из меню /start\n"
+                "• Позвать проводника\n"
+                "• Посмотреть FAQ\n\n"
+                "<i>⏱️ Это сообщение удалится через 60 секунд</i>"
+            )
+        if sent_message is not None:
+            # Заменить «Проводник печатает...» или оборванный потоковый ответ
+            await sent_message.edit_text(error_message, parse_mode=ParseMode.HTML)
+        else:
+            sent_message = await update.message.reply_text(error_message, parse_mode=ParseMode.HTML)
+            schedule_deletion(context, sent_message)
+    finally:
+        context.bot_data["journal"].record(
+            "question", user=user_id, question=user_message, outcome=outcome,
+            ms=round((time.perf_counter() - started) * 1000, 1), **details
+        )
+
+
+async def on_startup(application: Application):
+    """Прогрев общих ресурсов до начала обработки обновлений; GigaChat прогревается в фоне"""
+    STARTUP.mark("initialize")
+    await application.bot_data["profiles"].start()
+    await application.bot_data["gigachat"].start()
+    await application.bot_data["deletion_scheduler"].start()
+    await application.bot_data["order_desk"].start()
+    await application.bot_data["journal"].start()
+    await application.bot_data["broadcaster"].start()
+    if METRICS_PORT and BOT_MODE != "webhook":
+        server = HTTPServer()
+        server.route("GET", "/metrics", metrics_handler())
+        application.bot_data["webapp"].route(server)
+        await server.start(HOST, METRICS_PORT)
+        application.bot_data["metrics_server"] = server
+        logger.info(f"📈 Метрики: http://{HOST}:{METRICS_PORT}/metrics, Web App: {WEBAPP_PATH}/")
+    if MENU_URL:
+        # Справка открывается страницей из кэша браузера, а не большими сообщениями в чате
+        try:
+            await application.bot.set_chat_menu_button(
+                menu_button=MenuButtonWebApp(text="📋 Справка", web_app=WebAppInfo(url=MENU_URL))
+            )
+        except Exception as e:
+            logger.error(f"Не удалось установить кнопку Web App: {e}")
+    STARTUP.mark("post_init")
+
+
+async def on_shutdown(application: Application):
+    """Освобождение общих ресурсов при остановке"""
+    await application.bot_data["gigachat"].close()
+    # Рассылка останавливается раньше планировщика удаления: он сохранит её последние сообщения
+    await application.bot_data["broadcaster"].stop()
+    await application.bot_data["deletion_scheduler"].stop()
+    await application.bot_data["order_desk"].stop()
+    await application.bot_data["journal"].stop()
+    await application.bot_data["profiles"].stop()
+    if "metrics_server" in application.bot_data:
+        await application.bot_data.pop("metrics_server").stop()
+    logger.info(f"Статистика кэша ответов: {application.bot_data['answer_cache'].stats()}")
+    logger.info(f"Потоковые ответы: {application.bot_data['stream_stats'].summary()}")
+    logger.info(f"Запросы к GigaChat: {application.bot_data['gigachat'].stats()}")
+    logger.info(f"Автомат защиты GigaChat: {application.bot_data['gigachat'].breaker.stats()}")
+    logger.info(f"Ограничитель вопросов: {application.bot_data['rate_limiter'].stats()}")
+    logger.info(f"Память диалогов: {application.bot_data['conversations'].stats()}")
+    logger.info(f"Объединение одинаковых вопросов: {application.bot_data['llm_flights'].stats()}")
+    logger.info(f"Заказы еды: {application.bot_data['food_menu'].stats()}, {application.bot_data['order_desk'].stats()}")
+    logger.info(f"Журнал вопросов: {application.bot_data['journal'].stats()}")
+    logger.info(f"Web App: {application.bot_data['webapp'].stats()}")
+    logger.info(f"Профили пассажиров: {application.bot_data['profiles'].stats()}")
+    logger.info(f"Рассылки объявлений: {application.bot_data['broadcaster'].stats()}")
+    if isinstance(application.update_processor, ChatUpdateProcessor):
+        logger.info(f"Обработка обновлений по чатам: {application.update_processor.stats()}")
+    if application.bot.rate_limiter:
+        logger.info(f"Очередь исходящих вызовов: {application.bot.rate_limiter.stats()}")
+
+
+def build_application(builder, **gigachat_options):
+    """Application с общими ресурсами в bot_data и всеми обработчиками"""
+    if TELEGRAM_GLOBAL_RATE > 0:
+        # Все вызовы Bot API проходят через очередь: ответы пассажирам раньше удалений
+        builder = builder.rate_limiter(OutboundQueue(
+            global_rate=TELEGRAM_GLOBAL_RATE,
+            global_burst=max(1, int(TELEGRAM_GLOBAL_RATE)),
+            private_rate=TELEGRAM_CHAT_RATE,
+            private_burst=TELEGRAM_CHAT_BURST,
+            group_rate=TELEGRAM_GROUP_RATE
+        ))
+    if UPDATE_CONCURRENCY > 1:
+        # Медленный ответ GigaChat одному пассажиру не задерживает остальных,
+        # а нажатие кнопки не обгоняет сообщение того же чата
+        builder = builder.concurrent_updates(ChatUpdateProcessor(
+            max_concurrent_updates=UPDATE_CONCURRENCY,
+            max_pending=UPDATE_MAX_PENDING
+        ))
+    application = (
+        builder
+        # Вызовы Bot API замеряются по методам (sendMessage, editMessageText, deleteMessages...)
+        .request(InstrumentedRequest(connection_pool_size=256))
+        .post_init(on_startup)
+        .post_shutdown(on_shutdown)
+        .build()
+    )
+    application.bot_data["gigachat"] = GigaChatService(
+        credentials=GIGACHAT_API_KEY,
+        scope=GIGACHAT_SCOPE,
+        verify_ssl_certs=GIGACHAT_VERIFY_SSL,
+        max_concurrency=GIGACHAT_MAX_CONCURRENCY,
+        timeout=GIGACHAT_TIMEOUT,
+        breaker=CircuitBreaker(
+            failure_threshold=GIGACHAT_BREAKER_FAILURES,
+            recovery_timeout=GIGACHAT_BREAKER_RECOVERY
+        ),
+        **gigachat_options
+    )
+    application.bot_data["answer_cache"] = ResponseCache(
+        max_size=ANSWER_CACHE_SIZE,
+        ttl=ANSWER_CACHE_TTL,
+        short_ttl=ANSWER_CACHE_SHORT_TTL
+    )
+    application.bot_data["rate_limiter"] = RateLimiter(
+        user_rate=USER_RATE_LIMIT / 60,
+        user_burst=USER_RATE_BURST,
+        global_rate=GLOBAL_RATE_LIMIT / 60,
+        global_burst=GLOBAL_RATE_BURST
+    )
+    application.bot_data["llm_flights"] = SingleFlight()
+    application.bot_data["conversations"] = ConversationStore(
+        max_turns=CONVERSATION_TURNS,
+        token_budget=CONVERSATION_TOKEN_BUDGET,
+        idle_ttl=CONVERSATION_IDLE_TTL
+    )
+    application.bot_data["knowledge"] = KnowledgeIndex.from_sections(KNOWLEDGE_SECTIONS)
+    application.bot_data["timetable"] = Timetable.load(TRAINS_PATH, TRAIN_NUMBER)
+    application.bot_data["screens"] = compile_screens(SCREENS)
+    application.bot_data["stream_stats"] = StreamStats()
+    application.bot_data["brand_image"] = BrandImage(BRAND_IMAGE_PATH, BRAND_FILE_ID_PATH)
+    scheduler = application.bot_data["deletion_scheduler"] = DeletionScheduler(application.bot, DELETION_QUEUE_PATH)
+    PENDING_DELETIONS.set_function(lambda: len(scheduler))
+    application.bot_data["food_menu"] = FoodMenu.from_text(MENU_TEXT)
+    application.bot_data["order_desk"] = OrderDesk(
+        application.bot,
+        conductor_chats={
+            int(car): int(chat_id)
+            for car, chat_id in (pair.split(":") for pair in CONDUCTOR_CHATS.split(",") if pair.strip())
+        },
+        default_chat=int(CONDUCTOR_CHAT_ID) if CONDUCTOR_CHAT_ID else None,
+        interval=ORDER_DIGEST_INTERVAL,
+        max_batch=ORDER_DIGEST_MAX,
+        call_cooldown=CONDUCTOR_CALL_COOLDOWN
+    )
+    if not CONDUCTOR_CHAT_ID and not CONDUCTOR_CHATS:
+        logger.warning("⚠️ CONDUCTOR_CHAT_ID и CONDUCTOR_CHATS не заданы: заказы еды не принимаются")
+    application.bot_data["webapp"] = WebApp.build(
+        TEMPLATES_DIR, SCREENS, prefix=WEBAPP_PATH, max_age=WEBAPP_MAX_AGE
+    )
+    application.bot_data["journal"] = Journal(
+        JOURNAL_PATH,
+        fsync_interval=JOURNAL_FSYNC_INTERVAL,
+        max_bytes=int(JOURNAL_MAX_MB * 1024 * 1024),
+        backups=JOURNAL_BACKUPS
+    )
+    application.bot_data["profiles"] = ProfileStore(PROFILES_PATH, flush_interval=PROFILES_FLUSH_INTERVAL)
+    application.bot_data["broadcaster"] = Broadcaster(
+        application.bot,
+        scheduler,
+        BROADCAST_STATE_PATH,
+        concurrency=BROADCAST_CONCURRENCY,
+        delete_after=BROADCAST_TTL
+    )
+    
+    # Группа -1 - раньше остальных обработчиков, для каждого обновления
+    application.add_handler(TypeHandler(Update, load_profile), group=-1)
+    application.add_handler(CommandHandler("start", timed(start)))
+    application.add_handler(CommandHandler("help", timed(help_command)))
+    application.add_handler(CommandHandler("seat", timed(seat_command)))
+    application.add_handler(CommandHandler("announce", timed(announce_command)))
+    application.add_handler(CallbackQueryHandler(timed(button_handler)))
+    application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, timed(handle_message)))
+    application.add_error_handler(count_error)
+    return application
+
+
+def startup_finished(phase):
+    """Последняя отметка запуска и отчёт по фазам в лог"""
+    def finish():
+        STARTUP.mark(phase)
+        logger.info(STARTUP.report())
+
+    return finish
 
 
 def main():
@@ -575,21 +830,51 @@ def main():
         logger.error("TELEGRAM_BOT_TOKEN не найден в .env файле!")
         return
     
-    application = Application.builder().token(TELEGRAM_BOT_TOKEN).build()
+    if BOT_MODE == "webhook" and not WEBHOOK_URL:
+        logger.error("Для BOT_MODE=webhook нужен WEBHOOK_URL - публичный адрес сервиса!")
+        return
     
-    application.add_handler(CommandHandler("start", start))
-    application.add_handler(CommandHandler("help", help_command))
-    application.add_handler(CallbackQueryHandler(button_handler))
-    application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message))
+    builder = Application.builder().token(TELEGRAM_BOT_TOKEN)
+    if TELEGRAM_API_URL:
+        builder = builder.base_url(TELEGRAM_API_URL)
+    if BOT_MODE == "webhook":
+        # Обновления приходят на встроенный сервер, Updater с getUpdates не нужен
+        builder = builder.updater(None)
+    else:
+        # Первый getUpdates - бот начал принимать обновления, запуск закончен
+        builder = builder.get_updates_request(
+            InstrumentedRequest(on_first_request=startup_finished("first_get_updates"))
+        )
+    application = build_application(builder)
+    STARTUP.mark("build")
     
     logger.info("🚂 AI Provodnik запущен и готов помогать пассажирам!")
     print("✅ Бот успешно запущен!")
     print("🚂 AI Provodnik для пассажиров железной дороги")
     print("🎨 HTML-форматирование включено")
     print("⏱️ Автоудаление сообщений: 60 секунд")
+    print(f"🤖 Одновременных запросов к GigaChat: {GIGACHAT_MAX_CONCURRENCY}")
     print("⏸️  Для остановки нажмите Ctrl+C")
     
-    application.run_polling(allowed_updates=Update.ALL_TYPES)
+    if BOT_MODE == "webhook":
+        server = HTTPServer()
+        server.route("POST", WEBHOOK_PATH, webhook_handler(application, WEBHOOK_SECRET))
+        server.route("GET", "/healthz", health_handler(application))
+        server.route("GET", "/metrics", metrics_handler())
+        application.bot_data["webapp"].route(server)
+        print(f"🌐 Режим вебхука: {WEBHOOK_URL.rstrip('/')}{WEBHOOK_PATH}, порт {PORT}")
+        asyncio.run(serve_webhook(
+            application,
+            server,
+            webhook_url=f"{WEBHOOK_URL.rstrip('/')}{WEBHOOK_PATH}",
+            secret=WEBHOOK_SECRET,
+            host=HOST,
+            port=PORT,
+            allowed_updates=ALLOWED_UPDATES,
+            on_ready=startup_finished("webhook")
+        ))
+    else:
+        application.run_polling(allowed_updates=ALLOWED_UPDATES)
 
 
 if __name__ == '__main__':
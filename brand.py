@@ -0,0 +1,104 @@
+"""Логотип для /start: загружается один раз, дальше отправляется по file_id"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+
+from telegram.error import BadRequest
+
+logger = logging.getLogger(__name__)
+
+
+def optimized_variant(path):
+    """Путь к сжатому варианту картинки (tools/optimize_brand.py), если он собран"""
+    root, _ = os.path.splitext(path)
+    variant = f"{root}.opt.jpg"
+    return variant if os.path.exists(variant) else path
+
+
+class BrandImage:
+    """Картинка, file_id которой запоминается после первой загрузки в Telegram"""
+
+    def __init__(self, path, cache_path):
+        self.path = optimized_variant(path)
+        self.cache_path = cache_path
+        self.file_id = None
+        self.uploads = 0
+        self.reuses = 0
+        self.bytes_sent = 0
+        self._lock = asyncio.Lock()
+        try:
+            self._digest = self._file_digest()
+        except OSError as e:
+            logger.error(f"Не удалось прочитать логотип {self.path}: {e}")
+            self._digest = None
+        else:
+            self._load()
+
+    def _file_digest(self):
+        with open(self.path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    def _load(self):
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.error(f"Не удалось прочитать {self.cache_path}: {e}")
+            return
+        # file_id действителен, только пока не поменялась сама картинка
+        if saved.get("sha256") == self._digest:
+            self.file_id = saved.get("file_id")
+
+    def _save(self):
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"path": self.path, "sha256": self._digest, "file_id": self.file_id}, f)
+        os.replace(tmp_path, self.cache_path)
+
+    async def _reuse(self, message, started):
+        """Отправка по file_id; None, если file_id нет или он больше не действует"""
+        if not self.file_id:
+            return None
+        try:
+            sent = await message.reply_photo(self.file_id)
+        except BadRequest as e:
+            logger.warning(f"file_id логотипа больше не действует, загружаем заново: {e}")
+            self.file_id = None
+            return None
+        self.reuses += 1
+        logger.info(f"🖼️ Логотип по file_id: 0 байт, {time.perf_counter() - started:.2f} с")
+        return sent
+
+    async def send(self, message):
+        """Отправляет логотип в ответ на message"""
+        started = time.perf_counter()
+        sent = await self._reuse(message, started)
+        if sent:
+            return sent
+
+        async with self._lock:
+            # Пока ждали блокировку, логотип мог загрузить другой обработчик.
+            # Без повторного входа в send: блокировка не реентерабельна
+            sent = await self._reuse(message, started)
+            if sent:
+                return sent
+            with open(self.path, "rb") as photo:
+                data = photo.read()
+            sent = await message.reply_photo(data)
+            self.uploads += 1
+            self.bytes_sent += len(data)
+            self.file_id = sent.photo[-1].file_id
+            try:
+                self._save()
+            except OSError as e:
+                logger.error(f"Не удалось сохранить file_id логотипа: {e}")
+        logger.info(f"🖼️ Логотип загружен: {len(data)} байт, {time.perf_counter() - started:.2f} с")
+        return sent
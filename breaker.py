@@ -0,0 +1,73 @@
+"""Автомат защиты для внешнего сервиса: после серии сбоев запросы сразу отклоняются"""
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Сервис считается недоступным, запрос не отправлялся"""
+
+
+class CircuitBreaker:
+    """closed -> open после failure_threshold сбоев подряд; через recovery_timeout
+    пропускаются до half_open_probes пробных запросов: успех закрывает автомат, сбой снова открывает"""
+
+    def __init__(self, failure_threshold=5, recovery_timeout=30.0, half_open_probes=1, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_probes = half_open_probes
+        self.clock = clock
+        self.failures = 0
+        self.opened = 0
+        self.rejected = 0
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+
+    @property
+    def state(self):
+        if self._state == OPEN and self.clock() - self._opened_at >= self.recovery_timeout:
+            return HALF_OPEN
+        return self._state
+
+    @property
+    def is_open(self):
+        """Запрос будет отклонён без обращения к сервису"""
+        state = self.state
+        return state == OPEN or (state == HALF_OPEN and self._probes >= self.half_open_probes)
+
+    def allow(self):
+        """Можно ли отправить запрос; в half_open занимает место пробного запроса"""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and self._probes < self.half_open_probes:
+            self._state = HALF_OPEN
+            self._probes += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def release(self):
+        """Пробный запрос прерван без ответа сервиса - место пробы освобождается"""
+        if self._state == HALF_OPEN and self._probes:
+            self._probes -= 1
+
+    def record_success(self):
+        self.failures = 0
+        self._probes = 0
+        self._state = CLOSED
+
+    def record_failure(self):
+        self.failures += 1
+        if self._state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self._state != OPEN:
+                self.opened += 1
+            self._state = OPEN
+            self._opened_at = self.clock()
+            self._probes = 0
+
+    def stats(self):
+        return {"state": self.state, "failures": self.failures, "opened": self.opened, "rejected": self.rejected}
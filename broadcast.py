@@ -0,0 +1,233 @@
+"""Объявления проводников пассажирам поезда или вагона: рассылка через очередь Bot API с сохранением на диск"""
+import asyncio
+import itertools
+import json
+import logging
+import os
+import time
+from collections import deque
+
+from telegram.constants import ParseMode
+from telegram.error import Forbidden, RetryAfter, TelegramError
+
+from metrics import Counter
+from outbound import PRIORITY_BACKGROUND
+
+logger = logging.getLogger(__name__)
+
+BROADCAST_MESSAGES = Counter("broadcast_messages_total", "Сообщения рассылок по результату", ["result"])
+
+
+class Broadcast:
+    """Одна рассылка: текст, получатели и сколько из них уже обработано"""
+
+    __slots__ = ("id", "text", "target", "origin", "recipients", "next", "in_flight",
+                 "delivered", "blocked", "failed", "total", "created", "started", "finished")
+
+    def __init__(self, id, text, target, recipients, origin=None, created=None):
+        self.id = id
+        self.text = text
+        self.target = target
+        self.origin = origin
+        self.recipients = recipients
+        # Получатели до next уже отправлены или отправляются (in_flight)
+        self.next = 0
+        self.in_flight = set()
+        self.delivered = 0
+        self.blocked = 0
+        self.failed = 0
+        self.total = len(recipients)
+        self.created = created
+        self.started = None
+        self.finished = None
+
+    def __len__(self):
+        """Сколько получателей ещё не обработано"""
+        return len(self.in_flight) + len(self.recipients) - self.next
+
+    def to_dict(self):
+        # Отправляемые в момент сохранения сохраняются как неотправленные: после сбоя
+        # пассажир скорее получит объявление дважды, чем не получит его вовсе
+        return {
+            "id": self.id, "text": self.text, "target": self.target, "origin": self.origin,
+            "recipients": [*self.in_flight, *self.recipients[self.next:]],
+            "delivered": self.delivered, "blocked": self.blocked, "failed": self.failed,
+            "total": self.total, "created": self.created,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        broadcast = cls(data["id"], data["text"], data["target"], data["recipients"],
+                        origin=data["origin"], created=data["created"])
+        broadcast.delivered = data["delivered"]
+        broadcast.blocked = data["blocked"]
+        broadcast.failed = data["failed"]
+        broadcast.total = data["total"]
+        return broadcast
+
+
+class Broadcaster:
+    """Рассылки по очереди, одна за другой; каждую отправляют concurrency задач.
+
+    Сообщения идут с фоновым приоритетом через OutboundQueue бота: она держит
+    общий лимит Telegram, и ответы пассажирам обгоняют рассылку. Очередь рассылок
+    сохраняется на диск раз в save_interval секунд и при остановке, а после
+    перезапуска недоставленная часть досылается. Каждое доставленное сообщение
+    ставится в DeletionScheduler на удаление через delete_after секунд.
+    """
+
+    def __init__(self, bot, scheduler, state_path, concurrency=16, delete_after=1800, save_interval=5.0,
+                 clock=time.time):
+        self.bot = bot
+        self.scheduler = scheduler
+        self.state_path = state_path
+        self.concurrency = concurrency
+        self.delete_after = delete_after
+        self.save_interval = save_interval
+        self.clock = clock
+        self.finished = 0
+        self.delivered = 0
+        self.blocked = 0
+        self.failed = 0
+        self._queue = deque()
+        self._ids = itertools.count(1)
+        self._last_save = 0.0
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    def __len__(self):
+        return len(self._queue)
+
+    def announce(self, text, recipients, target, origin=None):
+        """Ставит рассылку в очередь; origin - чат проводника, куда придёт отчёт о доставке"""
+        created = self.clock()
+        broadcast = Broadcast(f"{int(created)}-{next(self._ids)}", text, target, list(recipients),
+                              origin=origin, created=created)
+        self._queue.append(broadcast)
+        self._wakeup.set()
+        logger.info(f"📣 Рассылка {broadcast.id} ({target}): получателей {broadcast.total}")
+        return broadcast
+
+    async def start(self):
+        """Восстанавливает незаконченные рассылки с диска и запускает фоновую задачу"""
+        self._load()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Останавливает рассылку и сохраняет недоставленное; отправляемые сейчас сообщения будут досланы"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._save()
+
+    def _load(self):
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                pending = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.error(f"Не удалось прочитать очередь рассылок {self.state_path}: {e}")
+            return
+        for data in pending:
+            self._queue.append(Broadcast.from_dict(data))
+        if self._queue:
+            logger.info(
+                f"📣 Восстановлено рассылок: {len(self._queue)}, "
+                f"недоставленных сообщений: {sum(len(broadcast) for broadcast in self._queue)}"
+            )
+
+    def _save(self):
+        pending = [broadcast.to_dict() for broadcast in self._queue]
+        directory = os.path.dirname(self.state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(pending, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, self.state_path)
+            self._last_save = self.clock()
+        except OSError as e:
+            logger.error(f"Не удалось сохранить очередь рассылок: {e}")
+
+    async def _run(self):
+        while True:
+            if not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            broadcast = self._queue[0]
+            broadcast.started = self.clock()
+            await asyncio.gather(*(self._worker(broadcast) for _ in range(self.concurrency)))
+            broadcast.finished = self.clock()
+            # Из очереди - только после отчёта: при сбое до него отчёт придёт после перезапуска
+            await self._report(broadcast)
+            self._queue.popleft()
+            self.finished += 1
+            self._save()
+
+    async def _worker(self, broadcast):
+        # rate_limit_args принимает только бот с очередью исходящих вызовов
+        limited = {"rate_limit_args": {"priority": PRIORITY_BACKGROUND}} if self.bot.rate_limiter else {}
+        while broadcast.next < len(broadcast.recipients):
+            chat_id = broadcast.recipients[broadcast.next]
+            broadcast.next += 1
+            broadcast.in_flight.add(chat_id)
+            result = await self._send(broadcast, chat_id, limited)
+            # Не в finally: при отмене сообщение остаётся в in_flight и будет дослано после перезапуска
+            broadcast.in_flight.discard(chat_id)
+            setattr(broadcast, result, getattr(broadcast, result) + 1)
+            setattr(self, result, getattr(self, result) + 1)
+            BROADCAST_MESSAGES.labels(result).inc()
+            if self.clock() - self._last_save >= self.save_interval:
+                self._save()
+
+    async def _send(self, broadcast, chat_id, limited):
+        """delivered, blocked или failed"""
+        while True:
+            try:
+                message = await self.bot.send_message(chat_id, broadcast.text, parse_mode=ParseMode.HTML, **limited)
+            except RetryAfter as e:
+                # Без очереди исходящих вызовов (или когда она исчерпала повторы) ждём сами
+                await asyncio.sleep(float(e.retry_after))
+                continue
+            except Forbidden:
+                # Пассажир заблокировал бота или удалил чат
+                return "blocked"
+            except TelegramError as e:
+                logger.debug(f"Рассылка {broadcast.id}: не доставлено в чат {chat_id}: {e}")
+                return "failed"
+            self.scheduler.schedule(chat_id, message.message_id, self.delete_after)
+            return "delivered"
+
+    async def _report(self, broadcast):
+        elapsed = max(broadcast.finished - broadcast.started, 1e-9)
+        processed = broadcast.delivered + broadcast.blocked + broadcast.failed
+        summary = (
+            f"📣 Рассылка {broadcast.id} ({broadcast.target}): доставлено {broadcast.delivered} из {broadcast.total}, "
+            f"заблокировали бота {broadcast.blocked}, ошибок {broadcast.failed}"
+        )
+        logger.info(f"{summary}, {processed / elapsed:.1f} сообщений/с")
+        if broadcast.origin is None:
+            return
+        text = (
+            f"<b>📣 Объявление доставлено ({broadcast.target})</b>\n\n"
+            f"✅ Доставлено: <b>{broadcast.delivered}</b> из {broadcast.total}\n"
+            f"🚫 Заблокировали бота: {broadcast.blocked}\n"
+            f"⚠️ Ошибок: {broadcast.failed}\n"
+            f"⏱️ Рассылка заняла {elapsed:.0f} с ({processed / elapsed:.1f} сообщений/с)"
+        )
+        try:
+            await self.bot.send_message(broadcast.origin, text, parse_mode=ParseMode.HTML)
+        except TelegramError as e:
+            logger.error(f"Не удалось отправить отчёт о рассылке {broadcast.id}: {e}")
+
+    def stats(self):
+        """Законченных рассылок и рассылок в очереди, сообщений по результату"""
+        return {"finished": self.finished, "queued": len(self._queue), "delivered": self.delivered,
+                "blocked": self.blocked, "failed": self.failed}
@@ -0,0 +1,78 @@
+"""Кэш ответов GigaChat на повторяющиеся вопросы пассажиров"""
+import re
+import time
+from collections import OrderedDict
+
+from textnorm import normalize_question
+
+# Вопросы, ответ на которые зависит от положения поезда и времени
+TIME_DEPENDENT_RE = re.compile(
+    r"сейчас|где мы|когда|скоро|через сколько|сколько (ещё |еще )?ехать|следующ|станци|"
+    r"остановк|стоянк|прибы|приед|опазд|задерж|врем|который час|погод"
+)
+
+
+def is_time_dependent(question):
+    """Зависит ли ответ на вопрос от текущего положения поезда"""
+    return TIME_DEPENDENT_RE.search(question.lower()) is not None
+
+
+class ResponseCache:
+    """LRU-кэш с TTL по нормализованной форме вопроса.
+
+    scope отделяет ответы, которые зависят не только от вопроса: бот передаёт
+    номер поезда, ведь запрос к GigaChat у каждого поезда свой"""
+
+    def __init__(self, max_size=1000, ttl=1800, short_ttl=60, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.short_ttl = short_ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, question, scope=""):
+        """Ответ из кэша или None"""
+        key = (scope, normalize_question(question))
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        answer, expires_at = entry
+        if expires_at <= self.clock():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return answer
+
+    def put(self, question, answer, scope=""):
+        """Сохраняет ответ; для вопросов о положении поезда - на короткий срок"""
+        key = (scope, normalize_question(question))
+        if not key[1]:
+            return
+        ttl = self.short_ttl if is_time_dependent(question) else self.ttl
+        if ttl <= 0:
+            return
+        self._entries[key] = (answer, self.clock() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        """Счётчики попаданий и промахов"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
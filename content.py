@@ -0,0 +1,407 @@
+"""Тексты и экраны AI Provodnik: меню, услуги, полезная информация, FAQ, развлечения"""
+
+WELCOME_TEXT = (
+    "<b>🚂 Здравствуйте! Я AI Provodnik</b> - ваш цифровой помощник в пути!\n\n"
+    "Я помогу вам с:\n"
+    "✅ Информацией о поезде и маршруте\n"
+    "✅ Заказом еды и напитков\n"
+    "✅ Услугами в вагоне\n"
+    "✅ Ответами на любые вопросы\n\n"
+    "<i>Выберите нужный раздел или просто задайте вопрос:</i>"
+)
+
+HELP_TEXT = (
+    "<b>ℹ️ Помощь по использованию бота:</b>\n\n"
+    "🚂 /start - Главное меню\n"
+    "🎫 /seat 7 24 - Указать вагон и место (можно с поездом и датой отправления: /seat 042А 15.10 7 24)\n"
+    "❓ /help - Эта справка\n\n"
+    "<b>💬 Вы можете:</b>\n"
+    "• Выбрать нужный раздел из меню\n"
+    "• Задать любой вопрос текстом\n"
+    "• Попросить помощь в любое время\n\n"
+    "Я работаю 24/7 и всегда рад помочь! 🤖\n\n"
+    "<i>⏱️ Сообщения автоматически удаляются через 60 секунд</i>"
+)
+
+# Поля в фигурных скобках заполняются из расписания и профиля пассажира (screens.RENDERERS)
+MY_TRAIN_TEXT = (
+    "<b>🚂 ИНФОРМАЦИЯ О ВАШЕМ ПОЕЗДЕ</b>\n\n"
+    "🎫 Поезд: <b>№{number} «{name}»</b>\n"
+    "📍 Маршрут: <b>{route}</b>\n"
+    "🚉 Отправление: {origin} - <code>{departure}</code>\n"
+    "🏁 Прибытие: {destination} - на {arrival_day}-й день пути, <code>{arrival}</code> ({arrival_zone})\n\n"
+    
+    "<b>📊 ТЕКУЩИЙ СТАТУС:</b>\n"
+    "{status}\n\n"
+    
+    "<b>🗺️ ОСНОВНЫЕ ОСТАНОВКИ:</b>\n"
+    "{stops}\n\n"
+    
+    "{seat}\n\n"
+    
+    "<i>💡 Для уточнения информации задайте вопрос в чат</i>"
+)
+
+LOCATION_TEXT = (
+    "<b>📍 ГДЕ МЫ СЕЙЧАС</b>\n\n"
+    "🕐 Текущее время: <code>{current_time}</code> ({zone})\n"
+    "{movement}\n\n"
+    
+    "<b>📊 ПОСЛЕДНЯЯ СТАНЦИЯ:</b>\n"
+    "{last_stop}\n\n"
+    
+    "<b>➡️ СЛЕДУЮЩАЯ ОСТАНОВКА:</b>\n"
+    "{next_stop}\n\n"
+    
+    "<b>🗺️ ПРОГРЕСС МАРШРУТА:</b>\n"
+    "Пройдено: {progress_bar} {progress}%\n"
+    "Осталось: ~{remaining_km} км, конечная - {destination}\n\n"
+    
+    "<b>🌡️ ПОГОДА ЗА БОРТОМ:</b>\n"
+    "🌤️ Малооблачно, <code>-12°C</code>\n"
+    "💨 Ветер: северо-западный, 5 м/с\n\n"
+    
+    "<i>💡 Следите за объявлениями проводника о приближении к станциям</i>"
+)
+
+CONDUCTOR_TEXT = (
+    "<b>📞 СВЯЗЬ С ПРОВОДНИКОМ</b>\n\n"
+    "Выберите, чем вам помочь:\n\n"
+    "• Позвать проводника к купе\n"
+    "• Заказать доставку еды\n"
+    "• Попросить постельное бельё\n"
+    "• Сообщить о проблеме\n\n"
+    "⏰ Проводники работают посменно 24/7\n"
+    "⚡ Среднее время отклика: 5-10 минут\n\n"
+    "🚨 <b>В экстренных случаях нажмите тревожную кнопку в купе!</b>"
+)
+
+CALL_CONDUCTOR_TEXT = (
+    "<b>✅ Проводник вызван!</b>\n\n"
+    "{place}\n"
+    "⏰ Проводник подойдёт в течение 5-10 минут\n\n"
+    "<i>Пожалуйста, оставайтесь в купе и ожидайте.</i>"
+)
+
+ORDER_FOOD_TEXT = (
+    "<b>🍜 Меню доступно по кнопке 'Меню у проводника' в главном меню.</b>\n\n"
+    "📝 <b>Для заказа:</b>\n"
+    "1. Посмотрите меню\n"
+    "2. Напишите в чат что хотите заказать\n"
+    "<i>Например: 'Хочу лапшу Доширак и кофе 3 в 1'</i>\n\n"
+    "3. Проводник принесёт заказ в купе\n\n"
+    "💰 Оплата при получении (наличные или карта)\n"
+    "⏰ Время доставки: 5-10 минут"
+)
+
+REQUEST_LINEN_TEXT = (
+    "<b>✅ Запрос принят!</b>\n\n"
+    "{place}\n"
+    "🛏️ Проводник принесёт:\n"
+    "• Чистое постельное бельё\n"
+    "• Или дополнительное полотенце\n\n"
+    "⏰ В течение 10 минут"
+)
+
+CONDUCTOR_UNAVAILABLE_TEXT = (
+    "<b>😔 Не удалось передать просьбу проводнику</b>\n\n"
+    "Обратитесь к проводнику вагона: его служебное купе - в начале вагона"
+)
+
+SEAT_REQUIRED_TEXT = (
+    "<b>🎫 Сначала укажите вагон и место</b>\n\n"
+    "Проводник должен знать, куда подойти: отправьте <code>/seat 7 24</code> "
+    "и нажмите кнопку ещё раз"
+)
+
+REPORT_ISSUE_TEXT = (
+    "<b>🔧 Опишите проблему в чат:</b>\n\n"
+    "Например:\n"
+    "• Не работает розетка\n"
+    "• Холодно в купе\n"
+    "• Не закрывается дверь\n"
+    "• Шумные соседи\n\n"
+    "<i>Проводник будет уведомлён и решит проблему.</i>"
+)
+
+MENU_TEXT = (
+    "<b>🍜 МЕНЮ У ПРОВОДНИКА</b>\n\n"
+    
+    "<b>☕ ГОРЯЧИЕ НАПИТКИ:</b>\n"
+    "• Чай чёрный - <code>50₽</code>\n"
+    "• Чай зелёный - <code>50₽</code>\n"
+    "• Кофе растворимый - <code>80₽</code>\n"
+    "• Кофе 3 в 1 - <code>60₽</code>\n"
+    "• Какао - <code>70₽</code>\n"
+    "• Горячий шоколад - <code>90₽</code>\n\n"
+    
+    "<b>🍜 БЫСТРОЕ ПИТАНИЕ:</b>\n"
+    "• Лапша Доширак (говядина) - <code>120₽</code>\n"
+    "• Лапша Роллтон (курица) - <code>100₽</code>\n"
+    "• Пюре быстрого приготовления - <code>80₽</code>\n"
+    "• Каша овсяная моментальная - <code>70₽</code>\n"
+    "• Супчик в стакане - <code>110₽</code>\n\n"
+    
+    "<b>🍪 СНЕКИ И СЛАДОСТИ:</b>\n"
+    "• Печенье (упаковка) - <code>80₽</code>\n"
+    "• Шоколад Алёнка - <code>90₽</code>\n"
+    "• Чипсы Lay's - <code>120₽</code>\n"
+    "• Сухарики - <code>70₽</code>\n"
+    "• Орешки солёные - <code>100₽</code>\n"
+    "• Конфеты (ассорти) - <code>150₽</code>\n\n"
+    
+    "<b>🥤 ХОЛОДНЫЕ НАПИТКИ:</b>\n"
+    "• Вода минеральная 0.5л - <code>60₽</code>\n"
+    "• Сок в ассортименте 0.2л - <code>80₽</code>\n"
+    "• Coca-Cola 0.33л - <code>100₽</code>\n"
+    "• Энергетик Red Bull - <code>150₽</code>\n\n"
+    
+    "<b>🍞 ГОТОВАЯ ЕДА:</b>\n"
+    "• Бутерброды (сыр/колбаса) - <code>150₽</code>\n"
+    "• Пирожки (в ассортименте) - <code>80₽</code>\n"
+    "• Сосиски в тесте - <code>100₽</code>\n\n"
+    
+    "<b>💰 ОПЛАТА:</b>\n"
+    "Наличные или карта (Мир, Visa, MasterCard)\n\n"
+    
+    "<b>📞 ДЛЯ ЗАКАЗА:</b>\n"
+    "Нажмите 'Связаться с проводником' → 'Заказать еду в купе'\n"
+    "Или напишите в чат что хотите заказать\n\n"
+    "♨️ <i>Кипяток для лапши/чая - БЕСПЛАТНО (в конце вагона)</i>"
+)
+
+SERVICES_TEXT = (
+    "<b>🎯 УСЛУГИ В ВАШЕМ ПОЕЗДЕ</b>\n\n"
+    
+    "<b>☕ ПИТАНИЕ:</b>\n"
+    "• Напитки и снеки у проводника\n"
+    "• Доставка еды в купе\n"
+    "• Горячая вода (бесплатно)\n\n"
+    
+    "<b>🛏️ ПОСТЕЛЬНОЕ БЕЛЬЁ:</b>\n"
+    "• Комплект включён в стоимость\n"
+    "• Смена белья по запросу\n"
+    "• Дополнительные подушки/одеяла\n\n"
+    
+    "<b>🚿 ГИГИЕНА:</b>\n"
+    "• Туалеты в начале и конце вагона\n"
+    "• Умывальники с горячей водой\n"
+    "• Мыло и полотенца у проводника\n\n"
+    
+    "<b>📱 СВЯЗЬ И ИНТЕРНЕТ:</b>\n"
+    "• Wi-Fi в вагоне (бесплатно)\n"
+    "• Розетки в каждом купе (220В)\n"
+    "• Зарядные устройства у проводника\n\n"
+    
+    "<b>🎮 РАЗВЛЕЧЕНИЯ:</b>\n"
+    "• Библиотека книг/журналов\n"
+    "• Настольные игры\n"
+    "• Фильмы и музыка (бесплатно)\n\n"
+    
+    "<b>🏥 МЕДИЦИНА:</b>\n"
+    "• Аптечка первой помощи\n"
+    "• Вызов врача на станциях\n\n"
+    
+    "<b>🔐 БЕЗОПАСНОСТЬ:</b>\n"
+    "• Охрана поезда\n"
+    "• Камеры видеонаблюдения\n"
+    "• Тревожная кнопка в купе\n\n"
+    
+    "<i>📞 Для заказа услуг нажмите 'Связаться с проводником'</i>"
+)
+
+INFO_TEXT = (
+    "<b>ℹ️ ПОЛЕЗНАЯ ИНФОРМАЦИЯ</b>\n\n"
+    
+    "<b>🕐 РЕЖИМ РАБОТЫ:</b>\n"
+    "• Проводники: круглосуточно\n"
+    "• Туалеты закрываются за 15 мин до/после станций\n\n"
+    
+    "<b>💰 ОПЛАТА:</b>\n"
+    "• Наличные (рубли)\n"
+    "• Банковские карты (Мир, Visa, MasterCard)\n"
+    "• СБП (переводы по номеру телефона)\n\n"
+    
+    "<b>📱 WI-FI:</b>\n"
+    "• Сеть: «RZD_Free_WiFi»\n"
+    "• Пароль: указан в купе на стикере\n"
+    "• Скорость: до 5 Мбит/с\n"
+    "• Без ограничения трафика\n\n"
+    
+    "<b>🔌 РОЗЕТКИ:</b>\n"
+    "• В каждом купе: 2 розетки 220В\n"
+    "• В коридоре: дополнительные розетки\n"
+    "• Можно заряжать ноутбуки и телефоны\n\n"
+    
+    "<b>🌡️ КЛИМАТ:</b>\n"
+    "• Кондиционер работает автоматически\n"
+    "• Температура: +22-24°C\n"
+    "• Регулировка в купе невозможна\n\n"
+    
+    "<b>📦 БАГАЖ:</b>\n"
+    "• Ручная кладь: под столиком и на полках\n"
+    "• Крупные вещи: под нижними полками\n"
+    "• Ценности: храните при себе\n\n"
+    
+    "<b>🚭 КУРЕНИЕ:</b>\n"
+    "• В поезде курение запрещено!\n"
+    "• Курить можно на станциях (в отведённых местах)\n"
+    "• Штраф за курение в поезде: от 1000₽\n\n"
+    
+    "<b>📞 ЭКСТРЕННЫЕ ТЕЛЕФОНЫ:</b>\n"
+    "• Горячая линия РЖД: <code>8-800-775-00-00</code>\n"
+    "• Полиция: <code>102</code>\n"
+    "• Скорая помощь: <code>103</code>\n\n"
+    
+    "<i>💡 При возникновении проблем - нажмите 'Связаться с проводником'</i>"
+)
+
+FAQ_TEXT = (
+    "<b>❓ ЧАСТЫЕ ВОПРОСЫ</b>\n\n"
+    
+    "❔ <b>Где взять кипяток?</b>\n"
+    "✅ В конце каждого вагона есть титан с кипятком (бесплатно)\n\n"
+    
+    "❔ <b>Можно ли провозить алкоголь?</b>\n"
+    "✅ Да, но распивать можно только в купе и в меру\n"
+    "⛔ Пьяных дебоширов высаживают на ближайшей станции\n\n"
+    
+    "❔ <b>Что делать при краже вещей?</b>\n"
+    "✅ Немедленно сообщить проводнику\n"
+    "✅ На крупных станциях вызовут полицию\n\n"
+    
+    "❔ <b>Можно ли перейти в другой вагон?</b>\n"
+    "✅ Да, все вагоны соединены\n"
+    "⚠️ Будьте осторожны при переходе между вагонами\n\n"
+    
+    "❔ <b>Где купить еду, если нет денег?</b>\n"
+    "✅ На крупных станциях есть магазины и кафе\n"
+    "✅ У проводника можно купить чай/кофе\n\n"
+    
+    "❔ <b>Что делать, если плохо себя чувствую?</b>\n"
+    "✅ Сообщить проводнику\n"
+    "✅ В поезде есть аптечка\n"
+    "✅ На станциях можно вызвать врача\n\n"
+    
+    "❔ <b>Можно ли выйти на станции?</b>\n"
+    "✅ Да, но следите за временем стоянки!\n"
+    "⚠️ Поезд не будет ждать опоздавших\n\n"
+    
+    "❔ <b>Где сушить мокрые вещи?</b>\n"
+    "✅ В купе есть батареи отопления\n"
+    "✅ В туалете есть крючки для одежды\n\n"
+    
+    "❔ <b>Работает ли мобильная связь?</b>\n"
+    "✅ Да, но на некоторых участках может пропадать\n"
+    "✅ В вагоне есть бесплатный Wi-Fi\n\n"
+    
+    "❔ <b>Могу ли я поменять место?</b>\n"
+    "✅ По согласованию с другими пассажирами - да\n"
+    "✅ Официально - только через кассу на станции\n\n"
+    
+    "<i>💬 Не нашли ответ? Задайте вопрос в чат или проводнику!</i>"
+)
+
+ENTERTAINMENT_TEXT = (
+    "<b>🎮 РАЗВЛЕЧЕНИЯ В ПУТИ</b>\n\n"
+    
+    "<b>📚 БИБЛИОТЕКА:</b>\n"
+    "• Художественная литература\n"
+    "• Журналы и газеты\n"
+    "• Детские книги\n"
+    "📍 У проводника в начале вагона\n\n"
+    
+    "<b>🎬 КИНО И СЕРИАЛЫ:</b>\n"
+    "• Wi-Fi с доступом к онлайн-кинотеатрам\n"
+    "• Рекомендуем: ivi, Okko, КиноПоиск\n"
+    "• Не забудьте наушники!\n\n"
+    
+    "<b>🎲 НАСТОЛЬНЫЕ ИГРЫ:</b>\n"
+    "• Шахматы, шашки\n"
+    "• Карты (дурак, покер)\n"
+    "• Монополия\n"
+    "• Игры для детей\n"
+    "📍 Взять у проводника\n\n"
+    
+    "<b>🎵 МУЗЫКА:</b>\n"
+    "• Spotify, Яндекс.Музыка, VK Музыка\n"
+    "• Работает через Wi-Fi\n"
+    "• Не мешайте соседям - используйте наушники\n\n"
+    
+    "<b>📱 МОБИЛЬНЫЕ ИГРЫ:</b>\n"
+    "Топ игр для долгой дороги:\n"
+    "• Subway Surfers\n"
+    "• Candy Crush\n"
+    "• Chess.com\n"
+    "• Words of Wonders\n\n"
+
+    
+    "<b>🎨 ТВОРЧЕСТВО:</b>\n"
+    "• Раскраски (для детей)\n"
+    "• Блокноты для рисования\n"
+    "• Пазлы\n\n"
+    
+    "<b>👥 СОЦИАЛЬНОЕ:</b>\n"
+    "• Знакомство с попутчиками\n"
+    "• Беседы в тамбуре\n"
+    "• Совместные игры\n\n"
+    
+    "<i>💡 Хорошего путешествия!</i>"
+)
+
+# Разделы, по которым строится локальный поиск ответов
+KNOWLEDGE_SECTIONS = {
+    "faq": FAQ_TEXT,
+    "info": INFO_TEXT,
+    "services": SERVICES_TEXT,
+    "menu": MENU_TEXT,
+    "entertainment": ENTERTAINMENT_TEXT,
+}
+
+BACK_TO_MENU = [("◀️ Назад в меню", "back_to_menu")]
+
+MAIN_MENU_BUTTONS = [
+    ("🚂 Мой поезд", "my_train"),
+    ("🍜 Меню у проводника", "menu"),
+    ("🎯 Услуги в поезде", "services"),
+    ("📍 Где мы сейчас?", "location"),
+    ("ℹ️ Полезная информация", "info"),
+    ("❓ Частые вопросы", "faq"),
+    ("📞 Связаться с проводником", "conductor"),
+    ("🎮 Развлечения", "entertainment"),
+]
+
+CONDUCTOR_BUTTONS = [
+    ("📞 Позвать проводника", "call_conductor"),
+    ("🍽️ Заказать еду в купе", "order_food"),
+    ("🛏️ Попросить бельё/полотенце", "request_linen"),
+    ("🔧 Сообщить о проблеме", "report_issue"),
+] + BACK_TO_MENU
+
+# Кнопки, по которым бот сразу пишет проводнику вагона (orders.OrderDesk.call)
+CONDUCTOR_REQUESTS = {
+    "call_conductor": "📞 Пассажир просит подойти",
+    "request_linen": "🛏️ Пассажир просит бельё или полотенце",
+}
+
+# Экраны бота по callback_data. Кнопки - по одной в ряд (по умолчанию «Назад в меню»),
+# "dynamic" - имя функции из screens.RENDERERS, которая заполняет поля текста.
+# Чтобы добавить экран, достаточно описать его здесь и сослаться на него кнопкой.
+SCREENS = {
+    "main_menu": {"text": WELCOME_TEXT, "buttons": MAIN_MENU_BUTTONS},
+    "help": {"text": HELP_TEXT, "buttons": []},
+    "my_train": {"text": MY_TRAIN_TEXT, "dynamic": "my_train"},
+    "menu": {"text": MENU_TEXT},
+    "services": {"text": SERVICES_TEXT},
+    "location": {"text": LOCATION_TEXT, "dynamic": "location"},
+    "info": {"text": INFO_TEXT},
+    "faq": {"text": FAQ_TEXT},
+    "conductor": {"text": CONDUCTOR_TEXT, "buttons": CONDUCTOR_BUTTONS},
+    "call_conductor": {"text": CALL_CONDUCTOR_TEXT, "dynamic": "place"},
+    "order_food": {"text": ORDER_FOOD_TEXT},
+    "request_linen": {"text": REQUEST_LINEN_TEXT, "dynamic": "place"},
+    "conductor_unavailable": {"text": CONDUCTOR_UNAVAILABLE_TEXT},
+    "seat_required": {"text": SEAT_REQUIRED_TEXT},
+    "report_issue": {"text": REPORT_ISSUE_TEXT},
+    "entertainment": {"text": ENTERTAINMENT_TEXT},
+}
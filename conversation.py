@@ -0,0 +1,120 @@
+"""Короткая память диалога с каждым пассажиром для уточняющих вопросов"""
+import time
+from collections import OrderedDict, deque
+
+from textnorm import STOP_WORDS, tokenize
+
+# Грубая оценка для русского текста: около трёх символов на токен GigaChat
+CHARS_PER_TOKEN = 3
+
+# Местоимения и наречия, отсылающие к сказанному раньше: «а он работает ночью?», «сколько это стоит?».
+# Без «то»: оно же - частица в «что-то», «когда-то»
+ANAPHORA = frozenset((
+    "он", "она", "оно", "они", "его", "ее", "их", "ему", "ей", "им", "него", "нее", "ней", "нему",
+    "ним", "них", "нем", "это", "этот", "эта", "эти", "этого", "этой", "этому", "этим", "этом",
+    "этих", "эту", "тот", "та", "те", "того", "той", "тому", "тем", "том", "тех", "ту", "там",
+    "туда", "оттуда", "тогда", "такой", "такая", "такое", "такие", "тоже", "подробнее",
+))
+
+# Вопрос только из этих слов - без предмета, понятен лишь из диалога: «а сколько стоит?», «а когда?»
+ELLIPTICAL = frozenset((
+    "сколько", "стоит", "стоят", "почем", "когда", "где", "как", "почему", "зачем", "куда", "откуда",
+    "кто", "что", "какой", "какая", "какое", "какие", "можно", "нельзя", "надолго", "долго", "если",
+    "еще", "уже", "точно", "правда", "разве", "да", "нет", "ок", "ладно", "понятно", "спасибо",
+    "в", "во", "на", "с", "со", "у", "к", "по", "о", "об", "за", "до", "из", "от", "для", "при",
+))
+
+
+def estimate_tokens(text):
+    """Приблизительное число токенов в тексте"""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def refers_back(question):
+    """Понятен ли вопрос только из предыдущих реплик: есть отсылка к сказанному или предмет опущен.
+
+    Вопрос без отсылок («где кипяток?») не зависит от истории диалога: ответ на него
+    можно брать из общего кэша и делить с другими пассажирами"""
+    tokens = tokenize(question)
+    if any(token in ANAPHORA for token in tokens):
+        return True
+    return all(token in ELLIPTICAL or token.isdigit() for token in tokens if token not in STOP_WORDS)
+
+
+class Conversation:
+    """Последние реплики одного пассажира в кольцевом буфере фиксированного размера"""
+
+    __slots__ = ("messages", "last_seen")
+
+    def __init__(self, max_messages, now):
+        self.messages = deque(maxlen=max_messages)
+        self.last_seen = now
+
+
+class ConversationStore:
+    """История диалогов: max_turns пар вопрос-ответ на пассажира, забывается после idle_ttl секунд тишины"""
+
+    def __init__(self, max_turns=4, token_budget=1000, idle_ttl=900, max_message_chars=1000,
+                 clock=time.monotonic):
+        self.max_turns = max_turns
+        self.token_budget = token_budget
+        self.idle_ttl = idle_ttl
+        self.max_message_chars = max_message_chars
+        self.clock = clock
+        self.evictions = 0
+        self.trimmed = 0
+        # Порядок - по последней активности, поэтому устаревшие диалоги всегда в начале
+        self._conversations = OrderedDict()
+
+    def __len__(self):
+        return len(self._conversations)
+
+    def history(self, user_id):
+        """Сохранённые реплики пассажира [(role, content, tokens), ...] от старых к новым"""
+        self._evict_idle()
+        conversation = self._conversations.get(user_id)
+        return list(conversation.messages) if conversation else []
+
+    def messages(self, user_id, system, question):
+        """Список сообщений для GigaChat: system, недавняя история в пределах token_budget и вопрос"""
+        kept = []
+        budget = self.token_budget
+        for role, content, tokens in reversed(self.history(user_id)):
+            if tokens > budget:
+                self.trimmed += 1
+                break
+            budget -= tokens
+            kept.append({"role": role, "content": content})
+        kept.reverse()
+        return [{"role": "system", "content": system}, *kept, {"role": "user", "content": question}]
+
+    def remember(self, user_id, question, answer):
+        """Добавляет пару вопрос-ответ; самая старая пара вытесняется из буфера"""
+        now = self.clock()
+        conversation = self._conversations.get(user_id)
+        if conversation is None:
+            conversation = self._conversations[user_id] = Conversation(self.max_turns * 2, now)
+        else:
+            conversation.last_seen = now
+            self._conversations.move_to_end(user_id)
+        for role, content in (("user", question), ("assistant", answer)):
+            content = content[:self.max_message_chars]
+            conversation.messages.append((role, content, estimate_tokens(content)))
+        self._evict_idle()
+
+    def forget(self, user_id):
+        """Начать диалог с пассажиром заново"""
+        self._conversations.pop(user_id, None)
+
+    def _evict_idle(self):
+        deadline = self.clock() - self.idle_ttl
+        while self._conversations:
+            user_id, conversation = next(iter(self._conversations.items()))
+            if conversation.last_seen > deadline:
+                break
+            del self._conversations[user_id]
+            self.evictions += 1
+
+    def stats(self):
+        """Число диалогов и сколько раз история не поместилась в бюджет"""
+        return {"conversations": len(self._conversations), "evictions": self.evictions, "trimmed": self.trimmed}
@@ -0,0 +1,144 @@
+"""Встроенный асинхронный HTTP/1.1-сервер для вебхука и служебных страниц"""
+import asyncio
+import json
+import logging
+from urllib.parse import parse_qs, urlsplit
+
+logger = logging.getLogger(__name__)
+
+MAX_HEADER_LINES = 100
+MAX_BODY_SIZE = 1024 * 1024
+
+REASONS = {
+    200: "OK", 204: "No Content", 301: "Moved Permanently", 304: "Not Modified", 400: "Bad Request", 403: "Forbidden",
+    404: "Not Found", 405: "Method Not Allowed", 411: "Length Required", 413: "Payload Too Large",
+    429: "Too Many Requests", 500: "Internal Server Error", 503: "Service Unavailable",
+}
+
+
+class Request:
+    """Разобранный HTTP-запрос"""
+
+    __slots__ = ("method", "path", "query", "headers", "body")
+
+    def __init__(self, method, target, headers, body):
+        parts = urlsplit(target)
+        self.method = method
+        self.path = parts.path
+        self.query = parse_qs(parts.query)
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body)
+
+
+class Response:
+    """HTTP-ответ"""
+
+    __slots__ = ("status", "body", "headers")
+
+    def __init__(self, status=200, body=b"", headers=None, content_type="text/plain; charset=utf-8"):
+        self.status = status
+        self.body = body.encode("utf-8") if isinstance(body, str) else body
+        self.headers = {"Content-Type": content_type}
+        if headers:
+            self.headers.update(headers)
+
+    @classmethod
+    def json(cls, data, status=200):
+        return cls(status, json.dumps(data, ensure_ascii=False), content_type="application/json")
+
+
+class HTTPServer:
+    """Маршрутизация по (метод, путь) поверх asyncio.start_server"""
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = 0
+        self._server = None
+
+    def route(self, method, path, handler):
+        """Регистрирует async handler(request) -> Response"""
+        self.routes[(method, path)] = handler
+
+    async def start(self, host, port):
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _read_request(self, reader):
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        try:
+            method, target, version = request_line.decode("latin-1").split()
+        except ValueError:
+            return Response(400, "bad request line")
+        headers = {}
+        for _ in range(MAX_HEADER_LINES):
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        else:
+            return Response(400, "too many headers")
+        if "chunked" in headers.get("transfer-encoding", ""):
+            return Response(411, "content-length required")
+        length = int(headers.get("content-length") or 0)
+        if length > MAX_BODY_SIZE:
+            return Response(413, "payload too large")
+        body = await reader.readexactly(length) if length else b""
+        return Request(method, target, headers, body), version
+
+    async def _dispatch(self, request):
+        handler = self.routes.get((request.method, request.path))
+        if handler is None:
+            if any(path == request.path for _, path in self.routes):
+                return Response(405, "method not allowed")
+            return Response(404, "not found")
+        try:
+            return await handler(request)
+        except Exception as e:
+            logger.error(f"Ошибка обработки {request.method} {request.path}: {e}")
+            return Response(500, "internal error")
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                parsed = await self._read_request(reader)
+                if parsed is None:
+                    break
+                if isinstance(parsed, Response):
+                    await self._write(writer, parsed, keep_alive=False)
+                    break
+                request, version = parsed
+                self.requests += 1
+                response = await self._dispatch(request)
+                connection = request.headers.get("connection", "").lower()
+                keep_alive = connection != "close" and (version == "HTTP/1.1" or connection == "keep-alive")
+                await self._write(writer, response, keep_alive, head=request.method == "HEAD")
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _write(self, writer, response, keep_alive, head=False):
+        reason = REASONS.get(response.status, "")
+        lines = [f"HTTP/1.1 {response.status} {reason}"]
+        headers = dict(response.headers)
+        headers["Content-Length"] = str(len(response.body))
+        headers["Connection"] = "keep-alive" if keep_alive else "close"
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        if not head and response.status != 304:
+            writer.write(response.body)
+        await writer.drain()
@@ -0,0 +1,80 @@
+"""Метрики бота: задержки вызовов Bot API, длительность обработчиков и ошибки"""
+import functools
+import logging
+import time
+
+from telegram.request import HTTPXRequest
+
+from httpserver import Response
+from metrics import REGISTRY, Counter, Gauge, Histogram
+from screens import ACTIONS
+
+logger = logging.getLogger(__name__)
+
+TELEGRAM_SECONDS = Histogram("telegram_request_seconds", "Длительность вызова Bot API", ["method"])
+HANDLER_SECONDS = Histogram(
+    "handler_seconds", "Длительность обработки обновления", ["handler", "callback_data"]
+)
+ERRORS = Counter("errors_total", "Ошибки по месту возникновения и типу", ["source", "type"])
+PENDING_DELETIONS = Gauge("pending_deletions", "Сообщения в очереди автоудаления")
+
+# getUpdates по замыслу ждёт новых обновлений до таймаута long polling:
+# в telegram_request_seconds он заслонил бы задержки настоящих вызовов
+UNTIMED_METHODS = frozenset({"getUpdates"})
+
+
+class InstrumentedRequest(HTTPXRequest):
+    """HTTPXRequest, замеряющий вызовы Bot API по имени метода (кроме UNTIMED_METHODS);
+    on_first_request вызывается один раз, перед первым вызовом"""
+
+    def __init__(self, *args, on_first_request=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.on_first_request = on_first_request
+
+    async def post(self, url, *args, **kwargs):
+        method = url.rsplit("/", 1)[-1]
+        if self.on_first_request is not None:
+            on_first_request, self.on_first_request = self.on_first_request, None
+            on_first_request()
+        started = time.perf_counter()
+        try:
+            return await super().post(url, *args, **kwargs)
+        except Exception as e:
+            ERRORS.labels("telegram", type(e).__name__).inc()
+            raise
+        finally:
+            if method not in UNTIMED_METHODS:
+                TELEGRAM_SECONDS.labels(method).observe(time.perf_counter() - started)
+
+
+def timed(handler):
+    """Обработчик, длительность которого попадает в handler_seconds (для кнопок - по callback_data)"""
+    name = handler.__name__
+
+    @functools.wraps(handler)
+    async def wrapper(update, context):
+        label = ""
+        if update.callback_query:
+            label = update.callback_query.data
+            # Произвольные callback_data не должны плодить ряды метрики
+            if label not in context.bot_data["screens"] and label not in ACTIONS:
+                label = "unknown"
+        with HANDLER_SECONDS.labels(name, label).time():
+            return await handler(update, context)
+
+    return wrapper
+
+
+async def count_error(update, context):
+    """Обработчик ошибок Application: счётчик и запись в лог с трассировкой"""
+    ERRORS.labels("handler", type(context.error).__name__).inc()
+    logger.error("Необработанная ошибка при обработке обновления", exc_info=context.error)
+
+
+def metrics_handler(registry=REGISTRY):
+    """GET /metrics в текстовом формате Prometheus"""
+
+    async def handle(request):
+        return Response(200, registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+    return handle
@@ -0,0 +1,155 @@
+"""Журнал вопросов пассажиров в JSONL: запись в фоновом потоке, сброс на диск по интервалу, ротация с gzip"""
+import asyncio
+import glob
+import gzip
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+class Journal:
+    """Только дописываемый журнал: record() кладёт запись в очередь в памяти,
+    а сериализует и пишет её поток журнала пачками раз в flush_interval секунд"""
+
+    def __init__(self, path, flush_interval=1.0, fsync_interval=5.0, max_bytes=50 * 1024 * 1024,
+                 backups=10, max_pending=100000, clock=time.time):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.max_pending = max_pending
+        self.clock = clock
+        self.written = 0
+        self.dropped = 0
+        self.rotations = 0
+        self.failures = 0
+        self._pending = deque()
+        self._stop = threading.Event()
+        self._thread = None
+        self._file = None
+        self._last_fsync = 0.0
+
+    def __len__(self):
+        return len(self._pending)
+
+    def record(self, event, **fields):
+        """Добавляет запись; без пути журнал выключен. Не блокирует цикл событий"""
+        if self.path is None:
+            return
+        if len(self._pending) >= self.max_pending:
+            # Диск не успевает - лучше потерять запись журнала, чем память бота
+            self.dropped += 1
+            return
+        fields["t"] = self.clock()
+        fields["event"] = event
+        self._pending.append(fields)
+
+    async def start(self):
+        if self.path is None:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="journal", daemon=True)
+        self._thread.start()
+
+    async def stop(self):
+        """Дописывает очередь, сбрасывает файл на диск и останавливает поток"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        # join в отдельном потоке: последняя пачка может писаться долго
+        await asyncio.to_thread(self._thread.join)
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self._write_pending()
+        self._write_pending()
+        self._close()
+
+    def _write_pending(self):
+        if not self._pending:
+            return
+        lines = []
+        # popleft из другого потока безопасен: deque атомарна для append/popleft
+        for _ in range(len(self._pending)):
+            lines.append(json.dumps(self._pending.popleft(), ensure_ascii=False, separators=(",", ":")))
+        data = ("\n".join(lines) + "\n").encode("utf-8")
+        try:
+            if self._file is None:
+                self._file = open(self.path, "ab")
+            self._file.write(data)
+            self._file.flush()
+            self.written += len(lines)
+            now = time.monotonic()
+            if now - self._last_fsync >= self.fsync_interval:
+                os.fsync(self._file.fileno())
+                self._last_fsync = now
+            if self._file.tell() >= self.max_bytes:
+                self._rotate()
+        except OSError as e:
+            self.failures += 1
+            self.dropped += len(lines)
+            logger.error(f"Не удалось записать журнал {self.path}: {e}")
+            self._close()
+
+    def _close(self):
+        if self._file is None:
+            return
+        try:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+        except OSError as e:
+            logger.error(f"Не удалось закрыть журнал {self.path}: {e}")
+        self._file = None
+
+    def _rotate(self):
+        """Текущий файл сжимается в path.<время>.gz, архивы сверх backups удаляются"""
+        self._close()
+        rotated = f"{self.path}.{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}"
+        os.replace(self.path, rotated)
+        with open(rotated, "rb") as source, gzip.open(f"{rotated}.gz", "wb") as target:
+            shutil.copyfileobj(source, target)
+        os.remove(rotated)
+        self.rotations += 1
+        archives = rotated_files(self.path)
+        for old in archives[:max(0, len(archives) - self.backups)]:
+            os.remove(old)
+
+    def stats(self):
+        return {
+            "written": self.written,
+            "pending": len(self._pending),
+            "dropped": self.dropped,
+            "rotations": self.rotations,
+            "failures": self.failures,
+        }
+
+
+def rotated_files(path):
+    """Сжатые части журнала от старых к новым: время ротации в имени сортируется как строка"""
+    return sorted(glob.glob(f"{glob.escape(path)}.*.gz"))
+
+
+def read_journal(path):
+    """Записи журнала по порядку: сначала сжатые части, затем текущий файл"""
+    for name in rotated_files(path) + ([path] if os.path.exists(path) else []):
+        opener = gzip.open if name.endswith(".gz") else open
+        with opener(name, "rt", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # Последняя строка могла оборваться при аварийной остановке
+                    continue
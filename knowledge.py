@@ -0,0 +1,158 @@
+"""Локальный поиск ответов по справочным разделам бота (BM25)"""
+import math
+import re
+from collections import Counter, defaultdict
+
+from textnorm import stem, stems
+
+# Вопросительные и служебные слова: в текстах разделов их нет, и на поиск они не влияют
+QUERY_STOP_WORDS = frozenset(stem(word) for word in (
+    "где", "как", "что", "какой", "какая", "какие", "когда", "куда", "откуда", "почему",
+    "зачем", "сколько", "можно", "есть", "ли", "я", "мне", "меня", "мы", "нам", "вы", "вас",
+    "у", "в", "во", "на", "с", "со", "по", "от", "до", "из", "за", "о", "об", "не", "это",
+    "ещё", "тут", "здесь", "там", "нужно", "надо", "хочу", "будет",
+))
+
+# Разные написания одного понятия приводятся к словам из справочных текстов
+SYNONYMS = {
+    "wifi": "wi fi",
+    "вайфай": "wi fi",
+    "вай": "wi",
+    "фай": "fi",
+    "интернет": "wi fi интернет",
+    "кипятильник": "кипяток",
+    "кипятка": "кипяток",
+    "кипятку": "кипяток",
+    "кипятком": "кипяток",
+    "сигарет": "курение",
+    "покурить": "курение",
+    "курить": "курение",
+}
+
+_TAG_RE = re.compile(r"<[^>]+>")
+
+
+def strip_html(text):
+    """Текст без HTML-тегов"""
+    return _TAG_RE.sub("", text)
+
+
+def query_terms(question):
+    """Основы значимых слов вопроса"""
+    words = []
+    for token in question.lower().replace("ё", "е").split():
+        words.append(SYNONYMS.get(token.strip("?!.,;:()«»\"'"), token))
+    return [term for term in stems(" ".join(words)) if term not in QUERY_STOP_WORDS]
+
+
+class Passage:
+    """Фрагмент раздела: заголовок блока и его пункты"""
+
+    __slots__ = ("section", "title", "html", "text")
+
+    def __init__(self, section, title, html):
+        self.section = section
+        self.title = title
+        self.html = html
+        self.text = strip_html(html).strip()
+
+
+class SearchResult:
+    """Найденный фрагмент с оценкой BM25 и долей покрытых слов вопроса"""
+
+    __slots__ = ("passage", "score", "coverage")
+
+    def __init__(self, passage, score, coverage):
+        self.passage = passage
+        self.score = score
+        self.coverage = coverage
+
+
+class KnowledgeIndex:
+    """Инвертированный индекс BM25 по фрагментам справочных разделов"""
+
+    def __init__(self, passages, k1=1.5, b=0.75, min_score=3.0, min_coverage=0.75, min_margin=1.05):
+        self.passages = passages
+        self.k1 = k1
+        self.b = b
+        self.min_score = min_score
+        self.min_coverage = min_coverage
+        self.min_margin = min_margin
+        self._postings = defaultdict(list)
+        self._idf = {}
+        self._build()
+
+    @classmethod
+    def from_sections(cls, sections, **options):
+        """Разбивает разделы на блоки по пустым строкам и строит индекс"""
+        passages = []
+        for section, html in sections.items():
+            blocks = [block.strip() for block in html.split("\n\n") if block.strip()]
+            title = strip_html(blocks[0]).strip()
+            passages.extend(Passage(section, title, block) for block in blocks[1:])
+        return cls(passages, **options)
+
+    def _build(self):
+        lengths = []
+        for doc_id, passage in enumerate(self.passages):
+            terms = stems(passage.title + " " + passage.text)
+            lengths.append(len(terms))
+            for term, tf in Counter(terms).items():
+                self._postings[term].append((doc_id, tf))
+        self._lengths = lengths
+        average = sum(lengths) / len(lengths) if lengths else 1.0
+        self._norms = [self.k1 * (1 - self.b + self.b * length / average) for length in lengths]
+        total = len(self.passages)
+        for term, postings in self._postings.items():
+            df = len(postings)
+            self._idf[term] = math.log(1 + (total - df + 0.5) / (df + 0.5))
+        self._unknown_idf = math.log(1 + (total + 0.5) / 0.5)
+
+    def search(self, question, limit=3):
+        """Лучшие фрагменты по убыванию оценки"""
+        terms = set(query_terms(question))
+        if not terms:
+            return []
+        scores = defaultdict(float)
+        matched = defaultdict(float)
+        query_weight = 0.0
+        for term in terms:
+            idf = self._idf.get(term)
+            if idf is None:
+                query_weight += self._unknown_idf
+                continue
+            query_weight += idf
+            for doc_id, tf in self._postings[term]:
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + self._norms[doc_id])
+                matched[doc_id] += idf
+        best = sorted(scores, key=scores.get, reverse=True)[:limit]
+        return [
+            SearchResult(self.passages[doc_id], scores[doc_id], matched[doc_id] / query_weight)
+            for doc_id in best
+        ]
+
+    def answer(self, question):
+        """Фрагмент, которым можно ответить без GigaChat, или None"""
+        results = self.search(question, limit=2)
+        if not results:
+            return None
+        top = results[0]
+        if top.score < self.min_score or top.coverage < self.min_coverage:
+            return None
+        if len(results) > 1 and top.score < results[1].score * self.min_margin:
+            return None
+        return top.passage
+
+    def fallback(self, question, sections=("faq", "info")):
+        """Лучший фрагмент из разделов sections без порогов уверенности - запасной ответ, когда GigaChat недоступен"""
+        for result in self.search(question, limit=len(self.passages)):
+            if result.passage.section in sections:
+                return result.passage
+        return None
+
+    def context(self, question, limit=3):
+        """Текст лучших фрагментов для подсказки GigaChat"""
+        return "\n\n".join(
+            f"[{result.passage.title}]\n{result.passage.text}"
+            for result in self.search(question, limit=limit)
+        )
@@ -0,0 +1,264 @@
+"""Долгоживущий клиент GigaChat, общий для всех обработчиков.
+
+Пакет gigachat (с pydantic) импортируется не при запуске бота, а в фоне после
+него или при первом вопросе: /start и кнопки меню обходятся без GigaChat.
+"""
+import asyncio
+import importlib
+import logging
+import time
+
+from breaker import CircuitBreaker, CircuitOpenError, OPEN, HALF_OPEN
+from conversation import estimate_tokens
+from metrics import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+GIGACHAT_SECONDS = Histogram("gigachat_request_seconds", "Длительность запроса к GigaChat", ["method"])
+GIGACHAT_IN_FLIGHT = Gauge("gigachat_in_flight", "Запросы к GigaChat в работе, включая ожидающие в очереди")
+GIGACHAT_CIRCUIT = Gauge("gigachat_circuit_state", "Автомат защиты GigaChat: 0 - закрыт, 1 - пробные запросы, 2 - открыт")
+GIGACHAT_TOKENS = Counter(
+    "gigachat_tokens_total",
+    "Токены GigaChat: входящие (prompt), из них из кэша сессии (precached) и ответа (completion)",
+    ["kind", "source"]
+)
+GIGACHAT_PROMPT_TOKENS = Histogram(
+    "gigachat_prompt_tokens", "Входящих токенов на запрос к GigaChat",
+    buckets=(100, 250, 500, 750, 1000, 1500, 2000, 3000, 4000, 6000, 8000)
+)
+CIRCUIT_STATE_CODES = {OPEN: 2, HALF_OPEN: 1}
+
+# За сколько секунд до истечения токена запрашивать новый
+TOKEN_REFRESH_MARGIN = 120
+# Пауза перед повторной попыткой, если обновить токен не удалось
+TOKEN_RETRY_DELAY = 10
+
+
+def build_chat(messages, **options):
+    """Chat из списка {"role", "content"}: системная роль отдельно от реплик пассажира"""
+    from gigachat.models import Chat, Messages, MessagesRole
+
+    return Chat(
+        messages=[Messages(role=MessagesRole(message["role"]), content=message["content"]) for message in messages],
+        **options
+    )
+
+
+def _prompt_texts(payload):
+    if isinstance(payload, str):
+        return [payload]
+    if isinstance(payload, dict):
+        return [message["content"] for message in payload["messages"]]
+    return [message.content for message in payload.messages]
+
+
+class _Session:
+    """Заголовок X-Session-ID для запросов внутри блока: GigaChat кэширует
+    совпадающее начало запросов одной сессии и не считает его заново"""
+
+    __slots__ = ("session_id", "token")
+
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.token = None
+
+    def __enter__(self):
+        if self.session_id is not None:
+            from gigachat.context import session_id_cvar
+
+            self.token = session_id_cvar.set(str(self.session_id))
+
+    def __exit__(self, *exc_info):
+        if self.token is not None:
+            from gigachat.context import session_id_cvar
+
+            session_id_cvar.reset(self.token)
+
+
+class GigaChatService:
+    """Один клиент GigaChat с пулом соединений и заранее обновляемым токеном"""
+
+    def __init__(self, credentials, scope, verify_ssl_certs=False, max_concurrency=4, timeout=20.0,
+                 breaker=None, **client_options):
+        self.client_options = dict(
+            credentials=credentials,
+            scope=scope,
+            verify_ssl_certs=verify_ssl_certs,
+            **client_options
+        )
+        self._client = None
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.max_concurrency = max_concurrency
+        # Срок ответа на запрос, а для потока - на каждый очередной фрагмент
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker()
+        GIGACHAT_CIRCUIT.set_function(lambda: CIRCUIT_STATE_CODES.get(self.breaker.state, 0))
+        self.last_latency = None
+        self.last_usage = None
+        self.requests = 0
+        self.latency_total = 0.0
+        self.tokens = {"prompt": 0, "precached": 0, "completion": 0}
+        self.warmup_seconds = None
+        self._refresh_task = None
+
+    @property
+    def client(self):
+        """Клиент GigaChat; создаётся (и импортирует пакет gigachat) при первом обращении"""
+        if self._client is None:
+            from gigachat import GigaChat
+
+            self._client = GigaChat(**self.client_options)
+        return self._client
+
+    async def start(self):
+        """Запускает прогрев в фоне: запуск бота не ждёт ни импорта gigachat, ни токена"""
+        self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def close(self):
+        """Останавливает обновление токена и закрывает соединения"""
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+        if self._client is not None:
+            await self._client.aclose()
+
+    async def warm_up(self):
+        """Импортирует gigachat в отдельном потоке, чтобы цикл событий тем временем
+        отвечал на /start и кнопки, и получает токен до первого вопроса"""
+        started = time.perf_counter()
+        await asyncio.to_thread(importlib.import_module, "gigachat")
+        try:
+            await self.refresh_token()
+        except Exception as e:
+            logger.error(f"Не удалось получить токен GigaChat при запуске: {e}")
+        self.warmup_seconds = time.perf_counter() - started
+        logger.info(f"🤖 GigaChat прогрет в фоне за {self.warmup_seconds:.2f} с")
+
+    async def refresh_token(self):
+        """Запрашивает новый токен доступа"""
+        started = time.perf_counter()
+        await self.client.aget_token()
+        logger.info(
+            f"🔑 Токен GigaChat обновлён за {time.perf_counter() - started:.2f} с, "
+            f"действует ещё {self.token_expires_in():.0f} с"
+        )
+
+    def token_expires_in(self):
+        """Сколько секунд осталось до истечения текущего токена"""
+        token = getattr(self._client, "_access_token", None)
+        if token is None:
+            return 0
+        return token.expires_at / 1000 - time.time()
+
+    async def _refresh_loop(self):
+        if self.warmup_seconds is None:
+            await self.warm_up()
+        while True:
+            delay = self.token_expires_in() - TOKEN_REFRESH_MARGIN
+            await asyncio.sleep(max(delay, TOKEN_RETRY_DELAY))
+            if self.token_expires_in() > TOKEN_REFRESH_MARGIN:
+                continue
+            try:
+                await self.refresh_token()
+            except Exception as e:
+                logger.error(f"Не удалось обновить токен GigaChat: {e}")
+
+    def _acquire_breaker(self):
+        if not self.breaker.allow():
+            raise CircuitOpenError("GigaChat временно недоступен")
+
+    def _record_usage(self, prompt, completion, precached, source):
+        """Расход токенов запроса: в метрики, статистику и last_usage"""
+        self.last_usage = {"prompt": prompt, "precached": precached, "completion": completion}
+        self.requests += 1
+        self.latency_total += self.last_latency
+        for kind, value in self.last_usage.items():
+            self.tokens[kind] += value
+            GIGACHAT_TOKENS.labels(kind, source).inc(value)
+        GIGACHAT_PROMPT_TOKENS.observe(prompt)
+
+    def _record_response_usage(self, usage, payload, answer):
+        if usage is not None:
+            # precached_prompt_tokens есть в ответах API, но не во всех версиях SDK
+            self._record_usage(usage.prompt_tokens, usage.completion_tokens,
+                               getattr(usage, "precached_prompt_tokens", None) or 0, "api")
+        else:
+            self._record_usage(sum(estimate_tokens(text) for text in _prompt_texts(payload)),
+                               estimate_tokens(answer), 0, "estimate")
+
+    async def chat(self, payload, session_id=None):
+        """Отправляет запрос в GigaChat, не превышая лимит одновременных вызовов;
+        запросы с одним session_id делят кэш начала запроса"""
+        self._acquire_breaker()
+        GIGACHAT_IN_FLIGHT.inc()
+        try:
+            async with self.semaphore:
+                started = time.perf_counter()
+                with _Session(session_id):
+                    response = await asyncio.wait_for(self.client.achat(payload), self.timeout)
+                self.last_latency = time.perf_counter() - started
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        else:
+            self.breaker.record_success()
+        finally:
+            GIGACHAT_IN_FLIGHT.dec()
+        GIGACHAT_SECONDS.labels("chat").observe(self.last_latency)
+        self._record_response_usage(response.usage, payload, response.choices[0].message.content)
+        logger.info(f"GigaChat ответил за {self.last_latency:.2f} с, токены: {self.last_usage}")
+        return response
+
+    async def stream(self, payload, session_id=None):
+        """Фрагменты ответа GigaChat по мере генерации"""
+        self._acquire_breaker()
+        GIGACHAT_IN_FLIGHT.inc()
+        usage = None
+        answer = []
+        try:
+            async with self.semaphore:
+                started = time.perf_counter()
+                chunks = self.client.astream(payload).__aiter__()
+                try:
+                    while True:
+                        # Поток, замолчавший дольше timeout, считается сбоем
+                        try:
+                            # Запрос уходит при первом __anext__, заголовок сессии - из контекста
+                            with _Session(session_id):
+                                chunk = await asyncio.wait_for(chunks.__anext__(), self.timeout)
+                        except StopAsyncIteration:
+                            break
+                        # Расход приходит в последнем фрагменте, если версия SDK его разбирает
+                        usage = getattr(chunk, "usage", None) or usage
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            answer.append(chunk.choices[0].delta.content)
+                            yield chunk.choices[0].delta.content
+                finally:
+                    await chunks.aclose()
+                self.last_latency = time.perf_counter() - started
+        except (asyncio.CancelledError, GeneratorExit):
+            self.breaker.release()
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        else:
+            self.breaker.record_success()
+        finally:
+            GIGACHAT_IN_FLIGHT.dec()
+        GIGACHAT_SECONDS.labels("stream").observe(self.last_latency)
+        self._record_response_usage(usage, payload, "".join(answer))
+        logger.info(f"GigaChat завершил потоковый ответ за {self.last_latency:.2f} с, токены: {self.last_usage}")
+
+    def stats(self):
+        """Запросов, средняя задержка и токены; cached_share - доля входящих токенов из кэша сессий"""
+        return {
+            "requests": self.requests,
+            "mean_latency": round(self.latency_total / self.requests, 3) if self.requests else None,
+            **self.tokens,
+            "cached_share": round(self.tokens["precached"] / self.tokens["prompt"], 3) if self.tokens["prompt"] else 0.0,
+            "warmup_seconds": round(self.warmup_seconds, 3) if self.warmup_seconds is not None else None,
+        }
@@ -0,0 +1,368 @@
+"""Заказ еды без GigaChat: разбор сообщения по меню и сводки заказов проводникам по вагонам"""
+import asyncio
+import logging
+import math
+import re
+import time
+from collections import Counter, OrderedDict, defaultdict
+
+from textnorm import stem, tokenize
+
+logger = logging.getLogger(__name__)
+
+# Строка меню: «• Лапша Доширак (говядина) - <code>120₽</code>»
+_ITEM_RE = re.compile(r"•\s*(?P<name>.+?)\s*-\s*<code>(?P<price>\d+)₽</code>")
+_CATEGORY_RE = re.compile(r"<b>[^\w<]*(?P<title>[^<:]+):</b>")
+# «3 в 1» - одно слово названия, а не количество
+_COMBO_RE = re.compile(r"(\d)\s*в\s*(\d)")
+# Объём «0.5л», «0,33 л»: в названиях не отличает товары, в сообщениях - не количество
+_VOLUME_RE = re.compile(r"\d+[.,]\d+\s*л?")
+_QUANTITY_RE = re.compile(r"^[xх×]?(\d{1,2})(?:шт|x|х)?$")
+# Границы позиций заказа: «доширак и два кофе, сок»
+_SEPARATOR_RE = re.compile(r"[,;+\n]|\bи\b|\bещ[её]\b|\bплюс\b|\bа также\b")
+
+NUMBER_WORDS = {stem(word): number for word, number in (
+    ("один", 1), ("одна", 1), ("одну", 1), ("одно", 1), ("два", 2), ("две", 2), ("пару", 2), ("пара", 2),
+    ("три", 3), ("четыре", 4), ("пять", 5), ("шесть", 6), ("семь", 7), ("восемь", 8), ("девять", 9),
+    ("десять", 10),
+)}
+MAX_QUANTITY = 20
+# Опечатки ищутся только в словах не короче этого: у коротких основ («мест», «тест»)
+# соседей на одну букву слишком много
+FUZZY_MIN_LENGTH = 5
+
+# Слова, по которым сообщение - заказ, а не вопрос о меню
+ORDER_WORDS = frozenset(stem(word) for word in (
+    "хочу", "хотел", "хотела", "закажу", "заказать", "заказ", "принесите", "принеси",
+    "дайте", "возьму", "буду", "нужен", "нужна", "нужно", "можно", "мне",
+))
+QUESTION_WORDS = frozenset(stem(word) for word in (
+    "сколько", "почём", "почем", "где", "какой", "какие", "какая", "есть", "когда", "ли",
+))
+# Слова, не относящиеся к товарам
+FILLER_WORDS = frozenset(stem(word) for word in (
+    "нам", "пожалуйста", "в", "во", "с", "со", "на", "и", "купе", "шт", "штук", "штуки",
+    "порцию", "порции", "упаковку", "стакан", "бутылку", "банку", "ещё", "плюс", "также", "а",
+    "здравствуйте", "привет", "спасибо", "добрый", "день", "вечер",
+))
+# Разговорные и русские написания названий из меню
+ALIASES = {stem(word): target for word, target in (
+    ("кола", "cola"), ("колы", "cola"), ("кока", "coca"), ("лейс", "lay"), ("лейз", "lay"),
+    ("редбул", "red bull"), ("ред", "red"), ("булл", "bull"), ("дошик", "доширак"),
+    ("ролтон", "роллтон"), ("кофеек", "кофе"), ("кофейку", "кофе"), ("чаек", "чай"), ("чайку", "чай"),
+    ("минералка", "минеральн"), ("минералку", "минеральн"), ("шоколадка", "шоколад"),
+    ("шоколадку", "шоколад"), ("энергос", "энергетик"),
+)}
+
+
+def _terms(text):
+    """Основы слов названия или сообщения; «3 в 1» склеивается, объёмы отбрасываются"""
+    text = _COMBO_RE.sub(r"\1в\2", _VOLUME_RE.sub(" ", text.lower()))
+    return [stem(token) for token in tokenize(text)]
+
+
+def _deletes(term):
+    return {term[:i] + term[i + 1:] for i in range(len(term))}
+
+
+class MenuItem:
+    """Позиция меню"""
+
+    __slots__ = ("id", "name", "price", "category", "terms")
+
+    def __init__(self, id, name, price, category):
+        self.id = id
+        self.name = name
+        self.price = price
+        self.category = category
+        self.terms = frozenset(term for term in _terms(name) if term not in FILLER_WORDS)
+
+
+class Order:
+    """Распознанный заказ: позиции с количеством, неоднозначные позиции с вариантами
+    и слова, которых нет в меню"""
+
+    __slots__ = ("lines", "ambiguous", "missing")
+
+    def __init__(self, lines, ambiguous, missing):
+        self.lines = lines
+        self.ambiguous = ambiguous
+        self.missing = missing
+
+    @property
+    def total(self):
+        return sum(item.price * quantity for item, quantity in self.lines)
+
+    def describe(self):
+        """Строки «• Название × 2 - 240₽»"""
+        return "\n".join(
+            f"• {item.name} × {quantity} - {item.price * quantity}₽" for item, quantity in self.lines
+        )
+
+
+class FoodMenu:
+    """Инвертированный индекс по словам названий меню с поиском опечаток на одну букву"""
+
+    def __init__(self, items):
+        self.items = items
+        self.parsed = 0
+        self.orders = 0
+        self._postings = defaultdict(set)
+        for item in items:
+            for term in item.terms:
+                self._postings[term].add(item.id)
+        total = len(items)
+        self._idf = {term: math.log(1 + total / len(ids)) for term, ids in self._postings.items()}
+        # Словарь удалений одной буквы: «дширак» и «доширак» находят друг друга
+        self._fuzzy = defaultdict(set)
+        for term in self._postings:
+            if len(term) >= FUZZY_MIN_LENGTH - 1:
+                for variant in _deletes(term):
+                    self._fuzzy[variant].add(term)
+
+    @classmethod
+    def from_text(cls, html):
+        """Позиции и цены из текста экрана «Меню у проводника»"""
+        items, category = [], ""
+        for line in html.split("\n"):
+            header = _CATEGORY_RE.search(line)
+            if header:
+                category = header.group("title").strip()
+                continue
+            match = _ITEM_RE.search(line)
+            if match:
+                items.append(MenuItem(len(items), match.group("name"), int(match.group("price")), category))
+        return cls(items)
+
+    def _lookup(self, term, fuzzy=True):
+        """Слова меню для основы term: точное совпадение, синоним или (если fuzzy) опечатка"""
+        term = ALIASES.get(term, term)
+        if " " in term:
+            return [word for part in term.split() for word in self._lookup(part, fuzzy)]
+        if term in self._postings:
+            return [term]
+        if not fuzzy or len(term) < FUZZY_MIN_LENGTH:
+            return []
+        candidates = set(self._fuzzy.get(term, ()))
+        for variant in _deletes(term):
+            if variant in self._postings:
+                candidates.add(variant)
+            candidates.update(self._fuzzy.get(variant, ()))
+        return sorted(candidates)
+
+    def _match(self, terms, fuzzy=True):
+        """Позиции в куске сообщения: жадно берётся лучшая, её слова вычёркиваются"""
+        words = {}
+        for term in terms:
+            for word in self._lookup(term, fuzzy):
+                words.setdefault(word, term)
+        found, ambiguous = [], []
+        while words:
+            scores = Counter()
+            for word in words:
+                for item_id in self._postings[word]:
+                    scores[item_id] += self._idf[word]
+            if not scores:
+                break
+            ranked = scores.most_common()
+            best_id, best = ranked[0]
+            ties = [self.items[item_id] for item_id, score in ranked if score >= best - 1e-9]
+            if len(ties) > 1:
+                # «кофе» без уточнения: вариантов несколько - переспросить
+                ambiguous.append(ties)
+                break
+            item = self.items[best_id]
+            found.append(item)
+            words = {word: term for word, term in words.items() if word not in item.terms}
+        return found, ambiguous
+
+    def parse_order(self, text):
+        """Order, если сообщение похоже на заказ по меню, иначе None (вопрос уходит дальше)"""
+        self.parsed += 1
+        if "?" in text:
+            return None
+        lines, ambiguous, missing = Counter(), [], []
+        # Без «хочу/принесите» или количества перечисление («горячая вода») - скорее вопрос
+        explicit = False
+        chunks = []
+        for chunk in _SEPARATOR_RE.split(text.lower()):
+            quantity, content = None, []
+            for term in _terms(chunk):
+                match = _QUANTITY_RE.match(term)
+                if match or term in NUMBER_WORDS:
+                    quantity = int(match.group(1)) if match else NUMBER_WORDS[term]
+                    explicit = True
+                elif term in QUESTION_WORDS:
+                    return None
+                elif term in ORDER_WORDS:
+                    explicit = True
+                elif term not in FILLER_WORDS:
+                    content.append(term)
+            if content:
+                chunks.append((chunk, quantity, content))
+        for chunk, quantity, content in chunks:
+            # Опечатки ищутся, только когда в сообщении есть количество или «хочу/принесите»,
+            # и лишь в длинных словах: иначе просьба («хочу поменять место») становится заказом
+            found, unclear = self._match(content, fuzzy=explicit)
+            if not found and not unclear:
+                # «2 сникерса» - товара нет в меню; кусок без количества («и побыстрее») пропускается
+                if quantity:
+                    missing.append(chunk.strip())
+                continue
+            for item in found:
+                lines[item] += quantity if quantity and len(found) == 1 else 1
+            ambiguous.extend(unclear)
+        if not explicit or (not lines and not ambiguous):
+            return None
+        self.orders += 1
+        return Order(
+            [(item, min(quantity, MAX_QUANTITY)) for item, quantity in lines.items() if quantity > 0],
+            ambiguous,
+            missing
+        )
+
+    def stats(self):
+        return {"items": len(self.items), "parsed": self.parsed, "orders": self.orders}
+
+
+class OrderDesk:
+    """Заказы копятся по вагонам, и проводник получает одну сводку вместо сообщения на каждый заказ"""
+
+    def __init__(self, bot, conductor_chats=None, default_chat=None, interval=120.0, max_batch=10,
+                 call_cooldown=120.0, clock=time.monotonic):
+        self.bot = bot
+        self.conductor_chats = conductor_chats or {}
+        self.default_chat = default_chat
+        self.interval = interval
+        self.max_batch = max_batch
+        self.call_cooldown = call_cooldown
+        self.clock = clock
+        self.orders = 0
+        self.digests = 0
+        self.calls = 0
+        self.repeated_calls = 0
+        self._pending = defaultdict(list)
+        # (пассажир, просьба) -> время передачи, от давних к недавним
+        self._recent_calls = OrderedDict()
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    def __len__(self):
+        return sum(len(orders) for orders in self._pending.values())
+
+    def is_conductor(self, chat_id):
+        """Чат проводника вагона или общий чат проводников"""
+        return chat_id == self.default_chat or chat_id in self.conductor_chats.values()
+
+    def accepts(self, car):
+        """Есть ли чат проводника, куда уйдёт заказ из вагона car"""
+        return self.conductor_chats.get(car, self.default_chat) is not None
+
+    def add(self, order, car=None, seat=None, passenger=""):
+        """Ставит заказ в очередь вагона; полная очередь отправляется сразу"""
+        self._pending[car].append((order, seat, passenger))
+        self.orders += 1
+        if len(self._pending[car]) >= self.max_batch:
+            self._wakeup.set()
+
+    async def call(self, request, car, seat, passenger="", user_id=None):
+        """Сразу, без сводки, передаёт проводнику вагона просьбу пассажира; False, если не удалось.
+
+        Та же просьба того же пассажира в течение call_cooldown секунд считается
+        переданной и не отправляется снова: повторные нажатия не засыпают чат проводника"""
+        chat_id = self.conductor_chats.get(car, self.default_chat)
+        if chat_id is None:
+            return False
+        now = self.clock()
+        recent = self._recent_calls
+        while recent and next(iter(recent.values())) <= now - self.call_cooldown:
+            recent.popitem(last=False)
+        key = (user_id, request)
+        if user_id is not None:
+            if key in recent:
+                self.repeated_calls += 1
+                return True
+            # Отмечается до отправки: второе нажатие во время отправки первого тоже повторное
+            recent[key] = now
+        try:
+            await self.bot.send_message(
+                chat_id, f"<b>{request}</b>\nвагон №{car}, место {seat}, {passenger}", parse_mode="HTML"
+            )
+        except Exception as e:
+            recent.pop(key, None)
+            logger.error(f"Не удалось передать проводнику вагона {car} просьбу «{request}»: {e}")
+            return False
+        self.calls += 1
+        return True
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Останавливает фоновую задачу и отправляет накопленные сводки"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def flush(self, full_only=False):
+        """Отправляет сводки всех вагонов (или только вагонов с полной очередью)"""
+        cars = [car for car, orders in self._pending.items() if orders and (
+            not full_only or len(orders) >= self.max_batch)]
+        for car in cars:
+            orders = self._pending.pop(car)
+            await self._send_digest(car, orders)
+
+    async def _send_digest(self, car, orders):
+        text = digest(car, orders)
+        chat_id = self.conductor_chats.get(car, self.default_chat)
+        self.digests += 1
+        if chat_id is None:
+            logger.info(f"🧾 Чат проводника не настроен, сводка только в журнале:\n{text}")
+            return
+        try:
+            await self.bot.send_message(chat_id, text, parse_mode="HTML")
+        except Exception as e:
+            # Заказы не теряются: вернутся в очередь и уйдут со следующей сводкой
+            self._pending[car][:0] = orders
+            logger.error(f"Не удалось отправить сводку заказов вагона {car}: {e}")
+
+    async def _run(self):
+        last_flush = self.clock()
+        while True:
+            timeout = max(0.0, last_flush + self.interval - self.clock())
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+                await self.flush(full_only=True)
+            except asyncio.TimeoutError:
+                await self.flush()
+                last_flush = self.clock()
+
+    def stats(self):
+        """Заказов, отправленных сводок, ожидающих заказов, переданных и повторных просьб"""
+        return {"orders": self.orders, "digests": self.digests, "pending": len(self), "calls": self.calls,
+                "repeated_calls": self.repeated_calls}
+
+
+def digest(car, orders):
+    """Сводка для проводника: что собрать на весь вагон и что кому отнести"""
+    totals = Counter()
+    lines = []
+    for order, seat, passenger in orders:
+        for item, quantity in order.lines:
+            totals[item] += quantity
+        where = f"место {seat}" if seat is not None else "место не указано"
+        items = ", ".join(f"{item.name} × {quantity}" for item, quantity in order.lines)
+        lines.append(f"• {where}, {passenger}: {items} - <b>{order.total}₽</b>")
+    title = f"вагон №{car}" if car is not None else "вагон не указан"
+    collect = "\n".join(f"• {item.name} × {quantity}" for item, quantity in totals.most_common())
+    return (
+        f"<b>🧾 Заказы, {title}: {len(orders)}</b>\n\n"
+        f"<b>Собрать:</b>\n{collect}\n\n"
+        f"<b>Разнести:</b>\n" + "\n".join(lines)
+    )
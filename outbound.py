@@ -0,0 +1,211 @@
+"""Очередь исходящих вызовов Bot API с учётом лимитов Telegram и приоритетов"""
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import OrderedDict
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+from metrics import Counter, Gauge, Histogram
+from ratelimit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Меньшее значение - выше приоритет
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_BACKGROUND: "background"}
+
+# Методы, которые Telegram ограничивает по частоте; остальные (answerCallbackQuery,
+# getMe, setWebhook...) отправляются сразу
+_MESSAGE_PREFIXES = ("send", "edit", "copy", "forward")
+_BACKGROUND_ENDPOINTS = {"deleteMessage", "deleteMessages"}
+
+QUEUE_DEPTH = Gauge("outbound_queue_depth", "Вызовы Bot API в очереди на отправку", ["priority"])
+QUEUE_WAIT = Histogram("outbound_wait_seconds", "Ожидание вызова Bot API в очереди", ["priority"])
+RETRIES = Counter("outbound_retries_total", "Повторы вызовов Bot API после ответа 429")
+
+
+class OutboundQueue(BaseRateLimiter):
+    """Общий лимит global_rate вызовов в секунду с приоритетами и лимиты на чат:
+    private_rate в секунду для личных чатов и group_rate в минуту для групп.
+
+    Вызов ждёт в куче по (priority, порядок поступления); диспетчер выпускает
+    его, когда есть общий токен и токен его чата. Вызов, чей чат исчерпал лимит,
+    откладывается до пополнения корзины чата и не задерживает остальные чаты.
+    """
+
+    def __init__(self, global_rate=30, global_burst=1, private_rate=1.0, private_burst=3,
+                 group_rate=20, group_burst=5, max_retries=5, max_chats=10000, clock=time.monotonic):
+        self.private_rate = private_rate
+        self.private_burst = private_burst
+        self.group_rate = group_rate / 60
+        self.group_burst = group_burst
+        self.max_retries = max_retries
+        self.max_chats = max_chats
+        self.clock = clock
+        self.sent = 0
+        self.retries = 0
+        self.failed = 0
+        self._global = TokenBucket(global_rate, global_burst, clock())
+        self._pause_until = 0.0
+        # Порядок - от давно не получавших сообщений к недавним
+        self._chats = OrderedDict()
+        # Готовые к отправке: (priority, seq, future, chat_id)
+        self._waiting = []
+        # Ждущие пополнения корзины своего чата: (ready_at, priority, seq, future, chat_id)
+        self._delayed = []
+        self._sequence = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    async def initialize(self):
+        self._task = asyncio.create_task(self._dispatch())
+
+    async def shutdown(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def process_request(self, callback, args, kwargs, endpoint, data, rate_limit_args):
+        limited = endpoint in _BACKGROUND_ENDPOINTS or endpoint.startswith(_MESSAGE_PREFIXES)
+        if not limited:
+            return await callback(*args, **kwargs)
+        if rate_limit_args and "priority" in rate_limit_args:
+            priority = rate_limit_args["priority"]
+        elif endpoint in _BACKGROUND_ENDPOINTS:
+            priority = PRIORITY_BACKGROUND
+        else:
+            priority = PRIORITY_INTERACTIVE
+        chat_id = data.get("chat_id") if endpoint.startswith(_MESSAGE_PREFIXES) else None
+
+        for attempt in range(self.max_retries + 1):
+            started = self.clock()
+            await self._acquire(priority, chat_id)
+            QUEUE_WAIT.labels(PRIORITY_NAMES.get(priority, str(priority))).observe(self.clock() - started)
+            try:
+                result = await callback(*args, **kwargs)
+            except RetryAfter as e:
+                if attempt == self.max_retries:
+                    self.failed += 1
+                    raise
+                # Флуд-контроль Telegram касается всего бота: пауза для всей очереди
+                delay = float(e.retry_after) * (1 + 0.1 * attempt)
+                self._pause_until = max(self._pause_until, self.clock() + delay)
+                self._wakeup.set()
+                self.retries += 1
+                RETRIES.inc()
+                logger.warning(f"429 на {endpoint}, повтор через {delay:.1f} с (попытка {attempt + 1})")
+                continue
+            self.sent += 1
+            return result
+
+    def _chat_bucket(self, chat_id, now):
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) >= self.max_chats:
+                self._evict_idle(now)
+            # Группы и каналы: отрицательный id или @username
+            if isinstance(chat_id, str) or chat_id < 0:
+                bucket = TokenBucket(self.group_rate, self.group_burst, now)
+            else:
+                bucket = TokenBucket(self.private_rate, self.private_burst, now)
+            self._chats[chat_id] = bucket
+        else:
+            self._chats.move_to_end(chat_id)
+        bucket.refill(now)
+        return bucket
+
+    def _evict_idle(self, now):
+        """Как RateLimiter._evict_idle: заполнившиеся корзины с давних чатов, а если их нет - самая давняя"""
+        while self._chats:
+            chat_id, bucket = next(iter(self._chats.items()))
+            bucket.refill(now)
+            if bucket.tokens < bucket.capacity and len(self._chats) < self.max_chats:
+                return
+            del self._chats[chat_id]
+
+    def _take_global(self, now):
+        self._global.refill(now)
+        if now >= self._pause_until and self._global.tokens >= 1:
+            self._global.tokens -= 1
+            return True
+        return False
+
+    async def _acquire(self, priority, chat_id):
+        """Ждёт общего слота и слота чата; при очереди первыми проходят вызовы с меньшим priority"""
+        now = self.clock()
+        if not self._waiting and not self._delayed:
+            chat = self._chat_bucket(chat_id, now) if chat_id is not None else None
+            if (chat is None or chat.tokens >= 1) and self._take_global(now):
+                if chat is not None:
+                    chat.tokens -= 1
+                return
+        name = PRIORITY_NAMES.get(priority, str(priority))
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiting, (priority, next(self._sequence), future, chat_id))
+        QUEUE_DEPTH.labels(name).inc()
+        self._wakeup.set()
+        try:
+            await future
+        finally:
+            QUEUE_DEPTH.labels(name).dec()
+
+    async def _dispatch(self):
+        while True:
+            now = self.clock()
+            while self._delayed and self._delayed[0][0] <= now:
+                _, priority, sequence, future, chat_id = heapq.heappop(self._delayed)
+                heapq.heappush(self._waiting, (priority, sequence, future, chat_id))
+
+            if self._waiting and self._take_global(now):
+                self._release(now)
+                continue
+
+            if self._waiting:
+                delay = max(self._pause_until - now, self._global.wait_time())
+            elif self._delayed:
+                delay = self._delayed[0][0] - now
+            else:
+                delay = None
+            if self._delayed:
+                delay = min(delay, self._delayed[0][0] - now)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), None if delay is None else max(delay, 0.001))
+            except asyncio.TimeoutError:
+                pass
+
+    def _release(self, now):
+        """Выпускает первый вызов, чей чат не исчерпал лимит; общий токен уже списан"""
+        while self._waiting:
+            priority, sequence, future, chat_id = heapq.heappop(self._waiting)
+            if future.done():
+                # Ожидающий отменён
+                continue
+            if chat_id is not None:
+                chat = self._chat_bucket(chat_id, now)
+                if chat.tokens < 1:
+                    heapq.heappush(self._delayed, (now + chat.wait_time(), priority, sequence, future, chat_id))
+                    continue
+                chat.tokens -= 1
+            future.set_result(None)
+            return
+        # Все ожидающие упёрлись в лимиты своих чатов - токен возвращается
+        self._global.tokens += 1
+
+    def stats(self):
+        """Отправлено, повторов после 429, сдались после max_retries и сейчас в очереди"""
+        return {
+            "sent": self.sent,
+            "retries": self.retries,
+            "failed": self.failed,
+            "queued": len(self._waiting) + len(self._delayed),
+        }
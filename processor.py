@@ -0,0 +1,126 @@
+"""Параллельная обработка обновлений разных чатов с сохранением порядка внутри чата"""
+import asyncio
+import logging
+import time
+
+from telegram.ext import BaseUpdateProcessor
+
+from metrics import Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_CHATS = Gauge("update_active_chats", "Чаты, у которых есть обновления в обработке или в очереди")
+CHAT_WAIT = Histogram("update_chat_wait_seconds", "Ожидание обновления в очереди своего чата")
+
+
+class _ChatQueue:
+    """Очередь одного чата: будущий результат последнего обновления и число обновлений в очереди"""
+
+    __slots__ = ("tail", "depth")
+
+    def __init__(self, tail):
+        self.tail = tail
+        self.depth = 1
+
+
+class ChatUpdateProcessor(BaseUpdateProcessor):
+    """Обновления разных чатов обрабатываются параллельно, не больше max_concurrent_updates
+    сразу, а обновления одного чата - строго по очереди.
+
+    Очередь чата - цепочка future: обновление ждёт, пока закончится предыдущее
+    обновление того же чата, и только потом занимает место обработчика, поэтому
+    ожидающие в очереди чата не мешают другим чатам. Очередь удаляется, как только
+    обработано её последнее обновление: память занимают только активные чаты.
+    Ожидающих обновлений всего не больше max_pending, дальше Application ждёт.
+    """
+
+    __slots__ = ("_workers", "_queues", "processed", "waited", "max_depth", "max_chats")
+
+    def __init__(self, max_concurrent_updates=64, max_pending=4096):
+        # Семафор базового класса ограничивает все принятые обновления, включая ждущих своего чата
+        super().__init__(max(max_pending, max_concurrent_updates))
+        self._workers = asyncio.BoundedSemaphore(max_concurrent_updates)
+        self._queues = {}
+        self.processed = 0
+        self.waited = 0
+        self.max_depth = 0
+        self.max_chats = 0
+        ACTIVE_CHATS.set_function(lambda: len(self._queues))
+
+    def __len__(self):
+        return len(self._queues)
+
+    @staticmethod
+    def chat_key(update):
+        """Чат обновления; для нажатий в инлайн-сообщениях - пассажир, иначе None (без порядка)"""
+        chat = getattr(update, "effective_chat", None)
+        if chat is not None:
+            return chat.id
+        user = getattr(update, "effective_user", None)
+        return ("user", user.id) if user is not None else None
+
+    async def do_process_update(self, update, coroutine):
+        key = self.chat_key(update)
+        if key is None:
+            async with self._workers:
+                await coroutine
+            return
+
+        # До постановки в очередь нет await: обновления встают в очередь чата в порядке поступления
+        done = asyncio.get_running_loop().create_future()
+        queue = self._queues.get(key)
+        previous = None
+        if queue is None:
+            queue = self._queues[key] = _ChatQueue(done)
+            self.max_chats = max(self.max_chats, len(self._queues))
+        else:
+            previous = queue.tail
+            queue.tail = done
+            queue.depth += 1
+            self.max_depth = max(self.max_depth, queue.depth)
+
+        running = False
+        try:
+            if previous is not None:
+                self.waited += 1
+                started = time.perf_counter()
+                # shield: отмена ждущего обновления не должна отменять предыдущее
+                await asyncio.shield(previous)
+                CHAT_WAIT.observe(time.perf_counter() - started)
+            async with self._workers:
+                running = True
+                await coroutine
+        finally:
+            if not running:
+                # Отменено в очереди чата: обработчик так и не запускался
+                coroutine.close()
+            self.processed += 1
+            if previous is not None and not previous.done():
+                # Следующее обновление чата всё равно ждёт, пока закончится предыдущее
+                previous.add_done_callback(lambda _: self._finish(key, queue, done))
+            else:
+                self._finish(key, queue, done)
+
+    def _finish(self, key, queue, done):
+        """Пропускает следующее обновление чата; очередь без ожидающих удаляется"""
+        queue.depth -= 1
+        done.set_result(None)
+        if queue.tail is done:
+            del self._queues[key]
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        if self._queues:
+            logger.warning(f"Остановка при {len(self._queues)} чатах с необработанными обновлениями")
+
+    def stats(self):
+        """Обработано, сколько обновлений ждали свой чат, сейчас и максимум активных чатов, самая длинная очередь"""
+        return {
+            "processed": self.processed,
+            "waited": self.waited,
+            "chats": len(self._queues),
+            "max_chats": self.max_chats,
+            "max_depth": self.max_depth,
+        }
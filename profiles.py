@@ -0,0 +1,209 @@
+"""Профили пассажиров (поезд, рейс, вагон, место): в памяти для чтения, в SQLite для перезапусков"""
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS profiles ("
+    "user_id INTEGER PRIMARY KEY, train TEXT, car INTEGER, seat INTEGER, updated REAL, trip TEXT)"
+)
+# Базы, созданные до появления рейса в профиле
+_ADD_TRIP = "ALTER TABLE profiles ADD COLUMN trip TEXT"
+_UPSERT = (
+    "INSERT INTO profiles (user_id, train, trip, car, seat, updated) VALUES (?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(user_id) DO UPDATE SET "
+    "train = excluded.train, trip = excluded.trip, car = excluded.car, seat = excluded.seat, "
+    "updated = excluded.updated"
+)
+
+# Самый длинный состав и самый вместительный (сидячий) вагон
+MAX_CAR = 40
+MAX_SEAT = 120
+
+
+def parse_place(args):
+    """Аргументы /seat: [поезд] [дата отправления] вагон место -> (поезд, дата, вагон, место),
+    где поезд и дата - как их написал пассажир или None; None, если не разобрать"""
+    if not 2 <= len(args) <= 4:
+        return None
+    train = day = None
+    for word in args[:-2]:
+        # Дата пишется через точку («15.10»), номер поезда - без неё
+        if "." in word and day is None:
+            day = word
+        elif "." not in word and train is None:
+            train = word
+        else:
+            return None
+    try:
+        car, seat = int(args[-2]), int(args[-1])
+    except ValueError:
+        return None
+    if not (1 <= car <= MAX_CAR and 1 <= seat <= MAX_SEAT):
+        return None
+    return train, day, car, seat
+
+
+class Profile:
+    """Поезд, рейс, вагон и место пассажира; без __dict__ - 64 байта на профиль против 184 у словаря.
+
+    Рейс - дата отправления («2026-10-15», timetable.Timetable): поезд с одним
+    номером одновременно идёт несколькими рейсами"""
+
+    __slots__ = ("train", "trip", "car", "seat")
+
+    def __init__(self, train=None, car=None, seat=None, trip=None):
+        self.train = train
+        self.trip = trip
+        self.car = car
+        self.seat = seat
+
+    def __repr__(self):
+        return f"Profile(train={self.train!r}, trip={self.trip!r}, car={self.car!r}, seat={self.seat!r})"
+
+
+class ProfileStore:
+    """Профили всех пассажиров в словаре user_id -> Profile.
+
+    get() читает только память. set() меняет профиль в памяти и помечает его
+    изменённым, а фоновая задача раз в flush_interval секунд (или как только
+    изменённых набралось batch_size) записывает их одной транзакцией в SQLite
+    в режиме WAL. База читается целиком один раз при запуске.
+    """
+
+    def __init__(self, path, flush_interval=2.0, batch_size=1000, clock=time.time):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.clock = clock
+        self.writes = 0
+        self.flushes = 0
+        self.failures = 0
+        self._profiles = {}
+        self._dirty = {}
+        self._db = None
+        self._task = None
+        self._closing = False
+        self._wakeup = asyncio.Event()
+
+    def __len__(self):
+        return len(self._profiles)
+
+    def get(self, user_id):
+        """Профиль пассажира или None, если он ещё не указал место"""
+        return self._profiles.get(user_id)
+
+    def passengers(self, train, trip, car=None, default_train=None):
+        """user_id пассажиров рейса trip поезда (и вагона); профиль без поезда - пассажир default_train.
+
+        Профили прошлых рейсов и профили без рейса не подходят: пассажир, ехавший
+        этим поездом неделю назад, не должен получать объявления сегодняшнего"""
+        return [
+            user_id for user_id, profile in self._profiles.items()
+            if profile.trip == trip and (profile.train or default_train) == train
+            and (car is None or profile.car == car)
+        ]
+
+    def set(self, user_id, train=None, car=None, seat=None, trip=None):
+        """Сохраняет профиль в памяти; на диск он попадёт со следующей пачкой"""
+        profile = self._profiles.get(user_id)
+        if profile is None:
+            profile = self._profiles[user_id] = Profile(train, car, seat, trip)
+        else:
+            profile.train, profile.trip, profile.car, profile.seat = train, trip, car, seat
+        self._dirty[user_id] = self.clock()
+        if len(self._dirty) >= self.batch_size:
+            self._wakeup.set()
+        return profile
+
+    def _open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Соединение используется из потоков asyncio.to_thread, но всегда одним потоком за раз
+        db = sqlite3.connect(self.path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        # В WAL synchronous=NORMAL не портит базу при сбое, теряется лишь последняя транзакция
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute(_SCHEMA)
+        if "trip" not in {row[1] for row in db.execute("PRAGMA table_info(profiles)")}:
+            db.execute(_ADD_TRIP)
+        return db
+
+    def load(self):
+        """Открывает базу и читает все профили в память"""
+        if self.path is None:
+            return
+        started = time.perf_counter()
+        self._db = self._open()
+        profiles = self._profiles
+        # Номер поезда и дата рейса - одна строка на всех, а не копия в каждом профиле
+        shared = {}
+        for user_id, train, trip, car, seat in self._db.execute(
+            "SELECT user_id, train, trip, car, seat FROM profiles"
+        ):
+            profiles[user_id] = Profile(shared.setdefault(train, train), car, seat, shared.setdefault(trip, trip))
+        logger.info(f"🎫 Профилей пассажиров: {len(profiles)}, загружены за {time.perf_counter() - started:.2f} с")
+
+    def _write(self, rows):
+        with self._db:
+            self._db.executemany(_UPSERT, rows)
+
+    async def flush(self):
+        """Записывает изменённые профили одной транзакцией"""
+        if not self._dirty or self._db is None:
+            return
+        dirty, self._dirty = self._dirty, {}
+        rows = []
+        for user_id, updated in dirty.items():
+            profile = self._profiles[user_id]
+            rows.append((user_id, profile.train, profile.trip, profile.car, profile.seat, updated))
+        try:
+            await asyncio.to_thread(self._write, rows)
+        except sqlite3.Error as e:
+            self.failures += 1
+            logger.error(f"Не удалось сохранить {len(rows)} профилей: {e}")
+            # Вернуть в очередь, не затирая профили, изменённые во время записи
+            for user_id, updated in dirty.items():
+                self._dirty.setdefault(user_id, updated)
+            return
+        self.writes += len(rows)
+        self.flushes += 1
+
+    async def start(self):
+        if self.path is None:
+            return
+        await asyncio.to_thread(self.load)
+        self._closing = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Останавливает фоновую задачу, записывает оставшиеся профили и закрывает базу"""
+        if self._task:
+            # Не отмена, а сигнал: прерванная запись пачки осталась бы работать в потоке
+            self._closing = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        if self._db is not None:
+            await self.flush()
+            self._db.close()
+            self._db = None
+
+    async def _run(self):
+        while not self._closing:
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+    def stats(self):
+        """Профилей в памяти, ожидающих записи, записано строк и транзакций, ошибок записи"""
+        return {"profiles": len(self._profiles), "pending": len(self._dirty), "writes": self.writes,
+                "flushes": self.flushes, "failures": self.failures}
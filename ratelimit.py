@@ -0,0 +1,89 @@
+"""Ограничение частоты вопросов к GigaChat: корзины токенов на пассажира и на весь бот"""
+import time
+from collections import OrderedDict
+
+
+class TokenBucket:
+    """Корзина на capacity токенов, пополняемая со скоростью rate токенов в секунду"""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate, capacity, now):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self):
+        """Через сколько секунд появится целый токен (0 - уже есть)"""
+        if self.tokens >= 1:
+            return 0.0
+        if self.rate <= 0:
+            return float("inf")
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Вопрос проходит, только если есть токен и в корзине пассажира, и в общей корзине"""
+
+    def __init__(self, user_rate, user_burst, global_rate, global_burst, max_users=10000, clock=time.monotonic):
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.max_users = max_users
+        self.clock = clock
+        self.allowed = 0
+        self.throttled_user = 0
+        self.throttled_global = 0
+        self._global = TokenBucket(global_rate, global_burst, clock())
+        # Порядок - от давно не спрашивавших к недавним
+        self._users = OrderedDict()
+
+    def acquire(self, user_id):
+        """Списывает по токену и возвращает 0, либо сколько секунд подождать пассажиру"""
+        now = self.clock()
+        bucket = self._users.get(user_id)
+        if bucket is None:
+            if len(self._users) >= self.max_users:
+                self._evict_idle(now)
+            bucket = self._users[user_id] = TokenBucket(self.user_rate, self.user_burst, now)
+        else:
+            self._users.move_to_end(user_id)
+            bucket.refill(now)
+        self._global.refill(now)
+
+        # Токен списывается только если проходят обе проверки
+        wait = bucket.wait_time()
+        if wait:
+            self.throttled_user += 1
+            return wait
+        wait = self._global.wait_time()
+        if wait:
+            self.throttled_global += 1
+            return wait
+        bucket.tokens -= 1
+        self._global.tokens -= 1
+        self.allowed += 1
+        return 0.0
+
+    def _evict_idle(self, now):
+        """Освобождает место, начиная с давно не спрашивавших: заполнившиеся корзины ничем
+        не отличаются от новых, а если таких нет, уходит самая давняя - словарь не растёт за max_users"""
+        while self._users:
+            user_id, bucket = next(iter(self._users.items()))
+            bucket.refill(now)
+            if bucket.tokens < bucket.capacity and len(self._users) < self.max_users:
+                return
+            del self._users[user_id]
+
+    def stats(self):
+        """Счётчики пропущенных и отклонённых вопросов"""
+        return {
+            "users": len(self._users),
+            "allowed": self.allowed,
+            "throttled_user": self.throttled_user,
+            "throttled_global": self.throttled_global,
+        }
@@ -0,0 +1,145 @@
+"""Единый планировщик автоудаления сообщений с сохранением на диск"""
+import asyncio
+import heapq
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+# deleteMessages принимает не больше 100 идентификаторов за раз
+MAX_BATCH = 100
+
+
+class DeletionScheduler:
+    """Куча (срок, chat_id, message_id) и одна фоновая задача вместо задачи на каждое сообщение"""
+
+    def __init__(self, bot, state_path, batch_window=1.0, save_interval=5.0, clock=time.time):
+        self.bot = bot
+        self.state_path = state_path
+        self.batch_window = batch_window
+        self.save_interval = save_interval
+        self.clock = clock
+        self.deleted = 0
+        self.failed = 0
+        self.api_calls = 0
+        self._heap = []
+        self._due = {}
+        self._dirty = False
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    def __len__(self):
+        return len(self._due)
+
+    def schedule(self, chat_id, message_id, delay):
+        """Удалить сообщение через delay секунд (повторный вызов переносит срок)"""
+        due = self.clock() + delay
+        key = (chat_id, message_id)
+        self._due[key] = due
+        heapq.heappush(self._heap, (due, chat_id, message_id))
+        self._dirty = True
+        if self._heap[0][0] == due:
+            self._wakeup.set()
+
+    def cancel(self, chat_id, message_id):
+        """Больше не удалять сообщение"""
+        if self._due.pop((chat_id, message_id), None) is not None:
+            self._dirty = True
+
+    async def start(self):
+        """Восстанавливает очередь с диска и запускает фоновую задачу"""
+        self._load()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Останавливает фоновую задачу и сохраняет оставшуюся очередь"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._save()
+
+    def _load(self):
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                pending = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.error(f"Не удалось прочитать очередь удаления {self.state_path}: {e}")
+            return
+        for chat_id, message_id, due in pending:
+            self._due[(chat_id, message_id)] = due
+            self._heap.append((due, chat_id, message_id))
+        heapq.heapify(self._heap)
+        logger.info(f"🗑️ Восстановлено сообщений к удалению: {len(self._due)}")
+
+    def _save(self):
+        pending = [[chat_id, message_id, due] for (chat_id, message_id), due in self._due.items()]
+        directory = os.path.dirname(self.state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(pending, f, separators=(",", ":"))
+            os.replace(tmp_path, self.state_path)
+            self._dirty = False
+        except OSError as e:
+            logger.error(f"Не удалось сохранить очередь удаления: {e}")
+
+    def _pop_due(self):
+        """Сообщения со сроком не позже now + batch_window, сгруппированные по чатам"""
+        limit = self.clock() + self.batch_window
+        batches = defaultdict(list)
+        while self._heap and self._heap[0][0] <= limit:
+            due, chat_id, message_id = heapq.heappop(self._heap)
+            # Устаревшая запись: срок перенесён или удаление отменено
+            if self._due.get((chat_id, message_id)) != due:
+                continue
+            del self._due[(chat_id, message_id)]
+            batches[chat_id].append(message_id)
+        if batches:
+            self._dirty = True
+        return batches
+
+    async def _delete_batch(self, chat_id, message_ids):
+        for i in range(0, len(message_ids), MAX_BATCH):
+            chunk = message_ids[i:i + MAX_BATCH]
+            self.api_calls += 1
+            try:
+                await self.bot.delete_messages(chat_id, chunk)
+                self.deleted += len(chunk)
+            except Exception as e:
+                self.failed += len(chunk)
+                logger.error(f"Не удалось удалить сообщения в чате {chat_id}: {e}")
+
+    async def _run(self):
+        last_save = self.clock()
+        while True:
+            now = self.clock()
+            timeout = self.save_interval
+            if self._heap:
+                timeout = min(timeout, max(0.0, self._heap[0][0] - now))
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+            batches = self._pop_due()
+            if batches:
+                await asyncio.gather(*(
+                    self._delete_batch(chat_id, message_ids)
+                    for chat_id, message_ids in batches.items()
+                ))
+
+            if self._dirty and self.clock() - last_save >= self.save_interval:
+                self._save()
+                last_save = self.clock()
@@ -0,0 +1,231 @@
+"""Экраны бота, собранные один раз при запуске: текст и готовая клавиатура"""
+import logging
+from datetime import timedelta
+from functools import lru_cache
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+from content import BACK_TO_MENU
+
+logger = logging.getLogger(__name__)
+
+# callback_data, которые обрабатываются не экранами, а действиями
+ACTIONS = {"back_to_menu"}
+
+# Ширина полосы прогресса маршрута в символах
+PROGRESS_WIDTH = 16
+
+# Пассажир ещё не указал место (profiles.py): проводнику неизвестно, куда идти
+NO_PLACE = "🎫 Место не указано - отправьте <code>/seat 7 24</code> (вагон и место)"
+
+
+def _duration(seconds):
+    """Длительность вида «2 дн. 14 ч», «8 ч 05 мин» или «45 мин»"""
+    minutes = max(0, int(seconds) // 60)
+    days, minutes = divmod(minutes, 1440)
+    hours, minutes = divmod(minutes, 60)
+    if days:
+        return f"{days} дн. {hours} ч"
+    if hours:
+        return f"{hours} ч {minutes:02d} мин"
+    return f"{minutes} мин"
+
+
+def _zone(stop):
+    return f"МСК{stop.tz:+d}" if stop.tz else "МСК"
+
+
+def _clock(position, offset, stop):
+    """Местное время станции stop в момент offset рейса"""
+    return (position.at(offset) + timedelta(hours=stop.tz)).strftime("%H:%M")
+
+
+def _until(position, offset):
+    return (position.at(offset) - position.now).total_seconds()
+
+
+def train_position(context):
+    """Положение поезда пассажира на его рейсе (пока место не указано - последний ушедший рейс поезда по умолчанию)"""
+    return context.bot_data["timetable"].position(context.user_data.get("train"), context.user_data.get("trip"))
+
+
+# Поля считаются один раз на рейс в минуту: Timetable.position возвращает
+# один и тот же объект Position, пока не сменилась минута
+@lru_cache(maxsize=64)
+def _location_fields(position):
+    last, following = position.last, position.next
+
+    if not position.departed:
+        movement = "🚉 Поезд ещё не отправился"
+        last_stop = (
+            f"🚉 <b>{last.station}</b>\n"
+            f"⏰ Отправление в {_clock(position, last.depart, last)}, "
+            f"через {_duration(_until(position, last.depart))}"
+        )
+    elif position.arrived:
+        movement = "🏁 Поезд прибыл на конечную станцию"
+        last_stop = f"🚉 <b>{last.station}</b>\n⏰ Прибытие в {_clock(position, last.arrive, last)}"
+    elif position.standing:
+        movement = f"🚉 Поезд стоит на станции {last.short}"
+        last_stop = (
+            f"🚉 <b>{last.station}</b> - стоянка {_duration(last.stay)}\n"
+            f"⏰ Отправление в {_clock(position, last.depart, last)}, "
+            f"через {_duration(_until(position, last.depart))}"
+        )
+    else:
+        movement = "🚂 Поезд находится в движении"
+        last_stop = (
+            f"🚉 <b>{last.station}</b>\n"
+            f"⏰ Отправление: {_duration(-_until(position, last.depart))} назад"
+        )
+
+    if following is None:
+        next_stop = "🏁 Это конечная станция маршрута"
+    else:
+        lines = [
+            f"🚉 <b>{following.station}</b>",
+            f"⏱️ Прибытие через: ~{_duration(_until(position, following.arrive))} "
+            f"(около {_clock(position, following.arrive, following)})",
+        ]
+        if following.stay:
+            lines.append(f"⏳ Стоянка: {_duration(following.stay)}")
+        if following.amenities:
+            lines.append(f"🛒 На вокзале: {following.amenities}")
+        next_stop = "\n".join(lines)
+
+    filled = round(position.progress * PROGRESS_WIDTH)
+    return {
+        "current_time": position.local_time().strftime("%H:%M"),
+        "zone": _zone(last),
+        "movement": movement,
+        "last_stop": last_stop,
+        "next_stop": next_stop,
+        "progress_bar": "█" * filled + "░" * (PROGRESS_WIDTH - filled),
+        "progress": round(position.progress * 100),
+        "remaining_km": round(position.remaining_km),
+        "destination": position.train.stops[-1].short,
+    }
+
+
+@lru_cache(maxsize=64)
+def _my_train_fields(position):
+    train, last, following = position.train, position.last, position.next
+    origin, destination = train.stops[0], train.stops[-1]
+
+    if not position.departed:
+        status = f"🚉 Поезд ещё не отправился: отправление через {_duration(_until(position, origin.depart))}"
+    elif position.arrived:
+        status = f"🏁 Поезд прибыл: {destination.station}"
+    else:
+        lines = [f"⏱️ В пути: <i>{_duration(-_until(position, origin.depart))}</i>"]
+        if position.standing:
+            lines.append(
+                f"🚉 Стоянка: <b>{last.short}</b>, отправление через {_duration(_until(position, last.depart))}"
+            )
+        else:
+            lines.append(f"📍 Последняя станция: <b>{last.short}</b>")
+            if last.stay:
+                lines.append(f"⏰ Время стоянки было: {_duration(last.stay)}")
+        lines.append(
+            f"➡️ Следующая остановка: <b>{following.short}</b> "
+            f"(через {_duration(_until(position, following.arrive))})"
+        )
+        status = "\n".join(lines)
+
+    main_stops = [stop for stop in train.stops if stop.main]
+    route = []
+    passed = [stop.short for stop in main_stops if stop.km <= position.km]
+    if passed:
+        route.append("✅ " + " → ".join(passed))
+    ahead = [stop.short for stop in main_stops if stop.km > position.km]
+    if ahead:
+        route.append("➡️ " + " → ".join(ahead))
+
+    return {
+        "number": train.number,
+        "name": train.name,
+        "route": train.route,
+        "origin": origin.station,
+        "departure": _clock(position, origin.depart, origin),
+        "destination": destination.short,
+        "arrival_day": (destination.arrive + destination.tz * 3600) // 86400 + 1,
+        "arrival": _clock(position, destination.arrive, destination),
+        "arrival_zone": _zone(destination),
+        "status": status,
+        "stops": "\n".join(route),
+    }
+
+
+def location_fields(context):
+    """Динамические поля экрана «Где мы сейчас»"""
+    return _location_fields(train_position(context))
+
+
+def _berth(seat):
+    """Полка по номеру места: в купе и плацкарте чётные места - верхние"""
+    if seat > 54:
+        return ""
+    return " (верхнее)" if seat % 2 == 0 else " (нижнее)"
+
+
+def my_train_fields(context):
+    """Динамические поля экрана «Мой поезд»: расписание общее на поезд, место - из профиля"""
+    car, seat = context.user_data.get("car"), context.user_data.get("seat")
+    if car is None:
+        place = NO_PLACE
+    else:
+        place = f"🚃 Ваш вагон: <b>№{car}</b>\n🔢 Место: <b>{seat}</b>{_berth(seat)}"
+    return {**_my_train_fields(train_position(context)), "seat": place}
+
+
+def place_fields(context):
+    """Место пассажира для экранов вызова проводника"""
+    car, seat = context.user_data.get("car"), context.user_data.get("seat")
+    if car is None:
+        return {"place": NO_PLACE}
+    return {"place": f"📍 Ваше место: <b>№{seat}</b>, вагон <b>№{car}</b>"}
+
+
+# Функции, вычисляющие динамические поля экранов при каждом показе
+RENDERERS = {
+    "location": location_fields,
+    "my_train": my_train_fields,
+    "place": place_fields,
+}
+
+
+class Screen:
+    """Экран: текст, клавиатура и, для динамических экранов, функция полей"""
+
+    __slots__ = ("key", "text", "reply_markup", "fields")
+
+    def __init__(self, key, text, buttons, fields=None):
+        self.key = key
+        self.text = text
+        self.fields = fields
+        self.reply_markup = InlineKeyboardMarkup(
+            [[InlineKeyboardButton(label, callback_data=data)] for label, data in buttons]
+        ) if buttons else None
+
+    def render(self, context):
+        """Текст экрана; у статических экранов - готовая строка без форматирования"""
+        if self.fields is None:
+            return self.text
+        return self.text.format(**self.fields(context))
+
+
+def compile_screens(specs, renderers=RENDERERS):
+    """Словарь callback_data -> Screen из описаний content.SCREENS"""
+    screens = {}
+    for key, spec in specs.items():
+        fields = renderers[spec["dynamic"]] if "dynamic" in spec else None
+        screens[key] = Screen(key, spec["text"], spec.get("buttons", BACK_TO_MENU), fields)
+
+    for screen in screens.values():
+        if screen.reply_markup is None:
+            continue
+        for row in screen.reply_markup.inline_keyboard:
+            for button in row:
+                if button.callback_data not in screens and button.callback_data not in ACTIONS:
+                    logger.warning(f"Кнопка экрана {screen.key} ведёт на неизвестный экран {button.callback_data}")
+    return screens
@@ -0,0 +1,45 @@
+"""Объединение одинаковых одновременных вопросов в один запрос к GigaChat"""
+import asyncio
+
+
+class SingleFlight:
+    """Пока запрос по ключу выполняется, остальные вызовы с тем же ключом ждут его результата"""
+
+    def __init__(self):
+        self.leaders = 0
+        self.followers = 0
+        self._inflight = {}
+
+    def __contains__(self, key):
+        return key in self._inflight
+
+    async def run(self, key, factory):
+        """Результат factory() и признак того, что запрос выполнял именно этот вызов"""
+        future = self._inflight.get(key)
+        if future is not None:
+            self.followers += 1
+            # shield: отмена ожидающего не отменяет общий запрос
+            return await asyncio.shield(future), False
+
+        self.leaders += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await factory()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Исключение получит сам вызывающий; без ожидающих asyncio не должен о нём предупреждать
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, True
+        finally:
+            del self._inflight[key]
+
+    def stats(self):
+        """Сколько запросов выполнено и сколько вызовов получили чужой результат"""
+        return {"in_flight": len(self._inflight), "leaders": self.leaders, "followers": self.followers}
@@ -0,0 +1,48 @@
+"""Время холодного запуска по фазам: импорты, .env, сборка Application, инициализация, приём обновлений"""
+import logging
+import time
+
+from metrics import Gauge
+
+logger = logging.getLogger(__name__)
+
+STARTUP_SECONDS = Gauge("startup_phase_seconds", "Длительность фаз запуска бота", ["phase"])
+
+# Подписи фаз в отчёте о запуске
+PHASE_NAMES = {
+    "imports": "импорты",
+    "dotenv": ".env",
+    "build": "сборка Application",
+    "initialize": "initialize (getMe)",
+    "post_init": "on_startup",
+    "first_get_updates": "до первого getUpdates",
+    "webhook": "setWebhook и сервер",
+}
+
+
+class StartupTimer:
+    """Отметки фаз запуска; started - time.perf_counter() в первой строке bot.py, до импортов"""
+
+    def __init__(self, started, clock=time.perf_counter):
+        self.started = started
+        self.clock = clock
+        self.phases = {}
+        self._last = started
+
+    def mark(self, phase):
+        """Завершает фазу: её длительность - от предыдущей отметки. Повторная отметка не учитывается"""
+        if phase in self.phases:
+            return
+        now = self.clock()
+        self.phases[phase] = now - self._last
+        self._last = now
+        STARTUP_SECONDS.labels(phase).set(self.phases[phase])
+
+    @property
+    def total(self):
+        return self._last - self.started
+
+    def report(self):
+        """Строка для лога: общее время и фазы"""
+        phases = ", ".join(f"{PHASE_NAMES.get(phase, phase)} {seconds:.2f} с" for phase, seconds in self.phases.items())
+        return f"⏱️ Запуск за {self.total:.2f} с: {phases}"
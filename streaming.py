@@ -0,0 +1,108 @@
+"""Потоковый вывод ответа GigaChat: сообщение дописывается редкими правками"""
+import asyncio
+import html
+import logging
+import time
+from collections import deque
+
+from telegram.constants import ParseMode
+from telegram.error import RetryAfter
+
+logger = logging.getLogger(__name__)
+
+MAX_MESSAGE_LENGTH = 4096
+TYPING_MARK = " ▌"
+
+
+class StreamStats:
+    """Время до первого видимого текста по последним ответам"""
+
+    def __init__(self, size=1000):
+        self.first_text = deque(maxlen=size)
+        self.answers = 0
+        self.edits = 0
+
+    def record_first_text(self, seconds):
+        self.first_text.append(seconds)
+
+    def percentile(self, q):
+        if not self.first_text:
+            return None
+        values = sorted(self.first_text)
+        return values[min(len(values) - 1, int(len(values) * q))]
+
+    def summary(self):
+        p50, p95 = self.percentile(0.5), self.percentile(0.95)
+        if p50 is None:
+            return "потоковых ответов не было"
+        return (
+            f"ответов: {self.answers}, правок: {self.edits}, "
+            f"до первого текста p50={p50:.2f} с, p95={p95:.2f} с"
+        )
+
+
+def render(header, text, typing=False):
+    """HTML сообщения: экранированный текст модели после заголовка.
+
+    Текст экранируется целиком, поэтому разметка корректна на любом
+    промежуточном шаге, даже если модель оборвалась посреди тега.
+    """
+    tail = TYPING_MARK if typing else ""
+    budget = MAX_MESSAGE_LENGTH - len(header) - len(tail)
+    raw = text[:budget]
+    escaped = html.escape(raw, quote=False)
+    while len(escaped) > budget:
+        raw = raw[:len(raw) - (len(escaped) - budget)]
+        escaped = html.escape(raw, quote=False)
+    return f"{header}{escaped}{tail}"
+
+
+async def stream_to_message(message, chunks, header, min_interval=1.0, stats=None, clock=time.monotonic):
+    """Дописывает message по мере поступления chunks, не чаще раза в min_interval.
+
+    Фрагменты, пришедшие между правками, объединяются в одну правку.
+    Возвращает полный ответ в виде готового HTML.
+    """
+    started = clock()
+    text = ""
+    shown = None
+    next_edit = started
+
+    async def edit(body):
+        nonlocal shown
+        await message.edit_text(body, parse_mode=ParseMode.HTML)
+        if stats is not None:
+            stats.edits += 1
+            if shown is None:
+                stats.record_first_text(clock() - started)
+        shown = body
+
+    async for chunk in chunks:
+        text += chunk
+        if clock() < next_edit or not text.strip():
+            continue
+        body = render(header, text, typing=True)
+        # Фрагмент без видимого текста или сверх лимита длины: правка ничего не изменит,
+        # а Telegram отвечает на неё ошибкой «Message is not modified»
+        if body == shown:
+            continue
+        try:
+            await edit(body)
+        except RetryAfter as e:
+            logger.warning(f"Telegram просит реже править сообщение: {e.retry_after} с")
+            next_edit = clock() + e.retry_after
+            continue
+        next_edit = clock() + min_interval
+
+    final = render(header, text)
+    if final != shown:
+        # Последняя правка тоже соблюдает интервал, чтобы не упереться в лимит Telegram
+        await asyncio.sleep(max(0.0, next_edit - clock()))
+        try:
+            await edit(final)
+        except RetryAfter as e:
+            await asyncio.sleep(e.retry_after)
+            await edit(final)
+    if stats is not None:
+        stats.answers += 1
+    return final[len(header):]
@@ -0,0 +1,87 @@
+"""Общие подставные объекты тестов: часы, которые двигает сам тест, и Telegram без сети"""
+from types import SimpleNamespace
+
+import pytest
+from telegram.error import BadRequest
+
+
+class Clock:
+    """Часы для параметра clock: время меняется только через advance()"""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class Bot:
+    """Bot API без сети: отправленные сообщения - в sent, удалённые пачки - в deleted.
+
+    Исключение из errors[chat_id] (или error для всех чатов) выбрасывается вместо отправки"""
+
+    # Без очереди исходящих вызовов, как у telegram.Bot по умолчанию
+    rate_limiter = None
+
+    def __init__(self):
+        self.sent = []
+        self.deleted = []
+        self.error = None
+        self.errors = {}
+
+    def _fail(self, chat_id):
+        error = self.errors.get(chat_id, self.error)
+        if error is not None:
+            raise error
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self._fail(chat_id)
+        self.sent.append((chat_id, text))
+        return SimpleNamespace(chat_id=chat_id, message_id=len(self.sent))
+
+    async def delete_messages(self, chat_id, message_ids):
+        self._fail(chat_id)
+        self.deleted.append((chat_id, list(message_ids)))
+
+
+class Message:
+    """Сообщение Telegram без сети: ответы на него - в replies, правки - в edits.
+    Правка тем же текстом, как и в Telegram, - ошибка «Message is not modified»"""
+
+    chat_id = 1
+    message_id = 1
+
+    def __init__(self, text=""):
+        self.text = text
+        self.replies = []
+        self.edits = []
+
+    async def reply_text(self, text, **kwargs):
+        self.replies.append(text)
+        return self
+
+    async def edit_text(self, text, **kwargs):
+        if text == self.text:
+            raise BadRequest("Message is not modified")
+        self.text = text
+        self.edits.append(text)
+        return self
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def bot_api():
+    return Bot()
+
+
+@pytest.fixture
+def new_message():
+    """Фабрика сообщений: new_message(text)"""
+    return Message
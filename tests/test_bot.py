@@ -0,0 +1,247 @@
+import asyncio
+import os
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+import bot
+from breaker import CircuitBreaker
+from cache import ResponseCache
+from content import KNOWLEDGE_SECTIONS, MENU_TEXT, SCREENS
+from conversation import ConversationStore
+from journal import Journal
+from knowledge import KnowledgeIndex
+from orders import FoodMenu, OrderDesk
+from profiles import ProfileStore
+from ratelimit import RateLimiter
+from scheduler import DeletionScheduler
+from screens import compile_screens
+from singleflight import SingleFlight
+from timetable import MSK, Timetable, trip_label
+
+# 042А уходит раз в два дня и идёт почти шесть суток: в пути три рейса;
+# 025Н уходит каждый день и идёт почти трое: в пути два
+NOW = datetime(2026, 10, 17, 12, 0, tzinfo=MSK)
+
+
+class Broadcaster:
+    def __init__(self):
+        self.sent = []
+
+    def announce(self, text, recipients, target, origin=None):
+        self.sent.append((text, recipients, target))
+
+
+@pytest.fixture
+def context(bot_api):
+    timetable = Timetable.load(bot.TRAINS_PATH)
+    timetable.clock = lambda: NOW
+    return SimpleNamespace(user_data={}, args=[], bot_data={
+        "timetable": timetable,
+        "profiles": ProfileStore(None),
+        "deletion_scheduler": DeletionScheduler(bot_api, os.devnull),
+        "order_desk": OrderDesk(bot_api, default_chat=-100),
+        "screens": compile_screens(SCREENS),
+        "broadcaster": Broadcaster(),
+    })
+
+
+@pytest.fixture
+def seat(context, new_message):
+    """/seat от пассажира 1: ответ бота"""
+
+    def seat(*args):
+        context.args = list(args)
+        update = SimpleNamespace(message=new_message(), effective_user=SimpleNamespace(id=1, first_name="Анна"))
+        asyncio.run(bot.seat_command(update, context))
+        return update.message.replies[-1]
+
+    return seat
+
+
+@pytest.mark.parametrize("args, train", [(("7", "24"), "042А"), (("025Н", "7", "24"), "025Н")])
+def test_seat_without_date_takes_last_departed_trip(context, seat, args, train):
+    trips = context.bot_data["timetable"].trips(train)
+    assert len(trips) > 1
+    reply = seat(*args)
+    assert "✅" in reply and trip_label(trips[1]) in reply
+    profile = context.bot_data["profiles"].get(1)
+    assert (profile.train, profile.trip, profile.car, profile.seat) == (train, trips[0], 7, 24)
+    assert context.user_data["trip"] == trips[0]
+
+
+def test_seat_date_picks_older_trip(context, seat):
+    older = context.bot_data["timetable"].trips("042А")[-1]
+    assert "✅" in seat("042А", trip_label(older), "7", "24")
+    assert context.bot_data["profiles"].get(1).trip == older
+
+
+def test_seat_unknown_date_is_asked_again(context, seat):
+    assert "🗓️" in seat("042А", "01.01", "7", "24")
+    assert context.bot_data["profiles"].get(1) is None
+
+
+@pytest.fixture
+def announce(context, new_message):
+    """/announce из чата проводников: ответ бота"""
+
+    def announce(text):
+        update = SimpleNamespace(message=new_message(f"/announce {text}"), effective_chat=SimpleNamespace(id=-100))
+        asyncio.run(bot.announce_command(update, context))
+        return update.message.replies[-1]
+
+    return announce
+
+
+@pytest.fixture
+def passengers(context):
+    """Пассажир 1 - на последнем ушедшем рейсе 042А, пассажир 2 - на самом раннем в пути"""
+    trips = context.bot_data["timetable"].trips("042А")
+    context.bot_data["profiles"].set(1, train="042А", trip=trips[0], car=7, seat=24)
+    context.bot_data["profiles"].set(2, train="042А", trip=trips[-1], car=7, seat=25)
+    return trips
+
+
+def test_announce_without_date_goes_to_last_departed_trip(context, announce, passengers):
+    announce("Стоянка 15 минут")
+    text, recipients, target = context.bot_data["broadcaster"].sent[-1]
+    assert recipients == [1] and trip_label(passengers[0]) in target
+    assert "Стоянка 15 минут" in text
+
+
+def test_announce_with_date(context, announce, passengers):
+    announce(f"042А {trip_label(passengers[-1])} вагон 7 Стоянка 15 минут")
+    assert context.bot_data["broadcaster"].sent[-1][1] == [2]
+
+
+def test_announce_starting_with_time_is_not_a_date(context, announce, passengers):
+    announce("15.40 стоянка сокращена")
+    text, recipients, _ = context.bot_data["broadcaster"].sent[-1]
+    assert "15.40 стоянка сокращена" in text and recipients == [1]
+
+
+def test_announce_of_a_single_date_like_word_is_text(context, announce, passengers):
+    announce(trip_label(passengers[-1]))
+    text, recipients, _ = context.bot_data["broadcaster"].sent[-1]
+    assert trip_label(passengers[-1]) in text and recipients == [1]
+
+
+@pytest.fixture
+def press(context, new_message):
+    """Нажатие кнопки пассажиром 1: показанный экран"""
+
+    def press(data):
+        shown = []
+
+        async def edit_message_text(text, **kwargs):
+            shown.append(text)
+
+        async def answer():
+            pass
+
+        query = SimpleNamespace(
+            data=data, answer=answer, edit_message_text=edit_message_text, message=new_message(),
+            from_user=SimpleNamespace(id=1, first_name="Анна"),
+        )
+        asyncio.run(bot.button_handler(SimpleNamespace(message=None, callback_query=query), context))
+        return shown[-1]
+
+    return press
+
+
+def test_call_without_place_asks_for_seat(press, bot_api):
+    assert press("call_conductor") == SCREENS["seat_required"]["text"]
+    assert bot_api.sent == []
+
+
+def test_call_with_place_reaches_conductor(context, press, bot_api):
+    context.user_data.update(car=7, seat=24)
+    for _ in range(2):
+        shown = press("call_conductor")
+        assert shown.startswith("<b>✅") and "место: <b>№24</b>" in shown.lower()
+    assert bot_api.sent == [
+        (-100, "<b>📞 Пассажир просит подойти</b>\nвагон №7, место 24, Анна")
+    ]
+
+
+@pytest.fixture
+def order(context, new_message):
+    """Заказ еды от пассажира 1: (принят ли, ответ бота)"""
+
+    def order(text):
+        update = SimpleNamespace(message=new_message(text), effective_user=SimpleNamespace(id=1, first_name="Анна"))
+        accepted = asyncio.run(bot.take_order(update, context, FoodMenu.from_text(MENU_TEXT).parse_order(text)))
+        return accepted, update.message.replies[-1]
+
+    return order
+
+
+def test_order_without_place_asks_for_seat(context, order):
+    accepted, reply = order("Хочу доширак")
+    assert not accepted and "/seat" in reply
+    assert len(context.bot_data["order_desk"]) == 0
+
+
+def test_order_with_place(context, order):
+    context.user_data.update(car=7, seat=24)
+    accepted, reply = order("Хочу доширак")
+    assert accepted and "Заказ принят" in reply
+    assert len(context.bot_data["order_desk"]) == 1
+
+
+@pytest.mark.parametrize("answer, name, expected", [
+    ("Анна, кипяток в конце вагона", "Анна", True),
+    ("Том &amp; Джерри, кипяток в конце вагона", "Том & Джерри", True),
+    ("В январе поезд ходит чаще", "Ян", False),
+    ("Кипяток в конце вагона", "Анна", False),
+])
+def test_addresses(answer, name, expected):
+    assert bot.addresses(answer, name) is expected
+
+
+class GigaChat:
+    """Отвечает с обращением к тому, кто спросил"""
+
+    def __init__(self):
+        self.breaker = CircuitBreaker()
+        self.calls = 0
+
+    async def chat(self, payload, session_id=None):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        name = payload.messages[-1].content.split("Пассажир ", 1)[1].split(":", 1)[0]
+        message = SimpleNamespace(content=f"{name}, возьмите в дорогу «Двенадцать стульев» 📚")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def test_personal_shared_answer_is_asked_again_within_rate_limit(context, new_message, monkeypatch):
+    monkeypatch.setattr(bot, "GIGACHAT_STREAMING", False)
+    giga = GigaChat()
+    limiter = RateLimiter(user_rate=1e-9, user_burst=1, global_rate=1e9, global_burst=100)
+    context.bot_data.update(
+        gigachat=giga, rate_limiter=limiter, llm_flights=SingleFlight(), answer_cache=ResponseCache(),
+        knowledge=KnowledgeIndex.from_sections(KNOWLEDGE_SECTIONS), food_menu=FoodMenu.from_text(MENU_TEXT),
+        conversations=ConversationStore(), journal=Journal(None),
+    )
+    # Пассажир 3 уже потратил свой вопрос
+    limiter.acquire(3)
+
+    async def ask(user_id, name):
+        update = SimpleNamespace(
+            message=new_message("Посоветуйте книгу в дорогу"),
+            effective_user=SimpleNamespace(id=user_id, first_name=name),
+        )
+        await bot.handle_message(update, context)
+        return update.message.replies[-1]
+
+    async def run():
+        return await asyncio.gather(ask(1, "Том & Джерри"), ask(2, "Анна"), ask(3, "Олег"))
+
+    first, second, third = asyncio.run(run())
+    assert "Том &amp; Джерри" in first
+    assert "Анна," in second and "Том" not in second
+    assert "не успевает" in third
+    assert giga.calls == 2
+    # Ответ с именем не кэшируется
+    assert context.bot_data["answer_cache"].get("Посоветуйте книгу в дорогу", "042А") is None
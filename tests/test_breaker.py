@@ -0,0 +1,41 @@
+from breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, clock=clock)
+    breaker.record_failure()
+    breaker.record_failure()
+    # Успех обнуляет серию: сбои должны идти подряд
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN and breaker.is_open
+    assert not breaker.allow()
+    assert breaker.stats() == {"state": OPEN, "failures": 3, "opened": 1, "rejected": 1}
+
+
+def test_half_open_probe_closes_or_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=30, clock=clock)
+    breaker.record_failure()
+    clock.advance(30)
+    assert breaker.state == HALF_OPEN and not breaker.is_open
+    # Пропускается только одна проба
+    assert breaker.allow()
+    assert breaker.is_open and not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN and breaker.opened == 2
+    clock.advance(30)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.allow()
+
+
+def test_release_frees_the_probe(clock):
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=30, clock=clock)
+    breaker.record_failure()
+    clock.advance(30)
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
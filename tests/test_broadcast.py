@@ -0,0 +1,60 @@
+import asyncio
+import os
+
+from telegram.error import BadRequest, Forbidden
+
+from broadcast import Broadcaster
+from scheduler import DeletionScheduler
+
+
+def run(broadcaster, actions=lambda broadcaster: None):
+    """Запускает рассыльщика, выполняет actions и ждёт, пока очередь рассылок опустеет"""
+
+    async def main():
+        await broadcaster.start()
+        actions(broadcaster)
+        while len(broadcaster):
+            await asyncio.sleep(0.001)
+        await broadcaster.stop()
+
+    asyncio.run(main())
+
+
+def test_results_counted_and_reported(bot_api, tmp_path):
+    bot_api.errors = {2: Forbidden("bot was blocked by the user"), 3: BadRequest("Chat not found")}
+    scheduler = DeletionScheduler(bot_api, os.devnull)
+    broadcaster = Broadcaster(bot_api, scheduler, str(tmp_path / "broadcasts.json"), concurrency=2, delete_after=60)
+    run(broadcaster, lambda broadcaster: broadcaster.announce("Стоянка 20 минут", [1, 2, 3, 4], "вагон 5", origin=-100))
+
+    assert [chat_id for chat_id, _ in bot_api.sent[:-1]] == [1, 4]
+    origin, report = bot_api.sent[-1]
+    assert origin == -100 and "Доставлено: <b>2</b> из 4" in report and "Заблокировали бота: 1" in report
+    # Доставленные объявления удалятся через delete_after
+    assert len(scheduler) == 2
+    assert broadcaster.stats() == {"finished": 1, "queued": 0, "delivered": 2, "blocked": 1, "failed": 1}
+
+
+def test_broadcasts_sent_one_after_another(bot_api, tmp_path):
+    broadcaster = Broadcaster(bot_api, DeletionScheduler(bot_api, os.devnull), str(tmp_path / "broadcasts.json"))
+
+    def actions(broadcaster):
+        broadcaster.announce("первое", [1, 2], "поезд")
+        broadcaster.announce("второе", [1, 2], "поезд")
+
+    run(broadcaster, actions)
+    assert [text for _, text in bot_api.sent] == ["первое", "первое", "второе", "второе"]
+
+
+def test_queue_survives_restart(bot_api, tmp_path):
+    path = str(tmp_path / "state" / "broadcasts.json")
+    scheduler = DeletionScheduler(bot_api, os.devnull)
+    # Остановлен до начала рассылки: очередь только сохраняется
+    stopped = Broadcaster(bot_api, scheduler, path)
+    stopped.announce("Стоянка 20 минут", [1, 2], "вагон 5", origin=-100)
+    asyncio.run(stopped.stop())
+    assert bot_api.sent == []
+
+    restored = Broadcaster(bot_api, scheduler, path)
+    run(restored)
+    assert [chat_id for chat_id, _ in bot_api.sent] == [1, 2, -100]
+    assert restored.delivered == 2
@@ -0,0 +1,17 @@
+from cache import ResponseCache
+
+
+def test_same_question_on_another_train_misses():
+    cache = ResponseCache()
+    cache.put("Где вагон-ресторан?", "В 9-м вагоне", "042А")
+    assert cache.get("где вагон ресторан", "042А") == "В 9-м вагоне"
+    assert cache.get("где вагон ресторан", "025Н") is None
+
+
+def test_time_dependent_answers_expire_sooner(clock):
+    cache = ResponseCache(ttl=1800, short_ttl=60, clock=clock)
+    cache.put("Когда следующая станция?", "Через час", "042А")
+    cache.put("Есть ли кипяток?", "Да, у проводника", "042А")
+    clock.advance(120)
+    assert cache.get("Когда следующая станция?", "042А") is None
+    assert cache.get("Есть ли кипяток?", "042А") == "Да, у проводника"
@@ -0,0 +1,37 @@
+import pytest
+
+from conversation import ConversationStore, refers_back
+
+
+@pytest.mark.parametrize("question", [
+    "А сколько стоит?",
+    "а когда?",
+    "Почему?",
+    "Сколько это стоит?",
+    "А он работает ночью?",
+    "а в 7?",
+])
+def test_follow_up_questions(question):
+    assert refers_back(question)
+
+
+@pytest.mark.parametrize("question", [
+    "Где кипяток?",
+    "Как зарядить телефон?",
+    "А есть ли в поезде вагон-ресторан?",
+    "Что-то дует из окна в купе",
+    "Сколько стоит чай?",
+])
+def test_context_free_questions(question):
+    assert not refers_back(question)
+
+
+def test_history_budget_and_idle_ttl(clock):
+    store = ConversationStore(max_turns=2, token_budget=30, idle_ttl=900, clock=clock)
+    store.remember(1, "Где кипяток?", "В конце вагона")
+    store.remember(1, "А чай?", "У проводника, " + "очень " * 20)
+    messages = store.messages(1, "system", "Сколько стоит?")
+    # Длинный ответ не помещается в бюджет: в запрос идут только system и вопрос
+    assert [m["role"] for m in messages] == ["system", "user"]
+    clock.advance(1000)
+    assert store.history(1) == []
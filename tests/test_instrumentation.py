@@ -0,0 +1,26 @@
+import asyncio
+
+from telegram.request import HTTPXRequest
+
+from instrumentation import InstrumentedRequest
+from metrics import REGISTRY
+
+
+def test_long_polling_is_not_timed(monkeypatch):
+    async def post(self, url, *args, **kwargs):
+        return {}
+
+    monkeypatch.setattr(HTTPXRequest, "post", post)
+    started = []
+    request = InstrumentedRequest(on_first_request=lambda: started.append(True))
+
+    async def calls():
+        await request.post("https://api.telegram.org/bot123:ABC/getUpdates")
+        await request.post("https://api.telegram.org/bot123:ABC/sendMessage")
+
+    asyncio.run(calls())
+    page = REGISTRY.render()
+    assert 'telegram_request_seconds_count{method="sendMessage"}' in page
+    assert 'method="getUpdates"' not in page
+    # Отметка запуска - по первому вызову, в том числе getUpdates
+    assert started == [True]
@@ -0,0 +1,56 @@
+import asyncio
+
+from journal import Journal, read_journal, rotated_files
+
+
+def write(journal, *questions):
+    """Записывает вопросы за один запуск журнала"""
+
+    async def main():
+        await journal.start()
+        for question in questions:
+            journal.record("question", user=1, text=question)
+        await journal.stop()
+
+    asyncio.run(main())
+
+
+def test_records_written_on_stop(tmp_path, clock):
+    path = str(tmp_path / "logs" / "journal.jsonl")
+    journal = Journal(path, flush_interval=60, clock=clock)
+    write(journal, "Где вагон-ресторан?", "Когда Москва?")
+    assert list(read_journal(path)) == [
+        {"user": 1, "text": "Где вагон-ресторан?", "t": 0.0, "event": "question"},
+        {"user": 1, "text": "Когда Москва?", "t": 0.0, "event": "question"},
+    ]
+    assert journal.stats() == {"written": 2, "pending": 0, "dropped": 0, "rotations": 0, "failures": 0}
+
+
+def test_disabled_without_path():
+    journal = Journal(None)
+    write(journal, "Где вагон-ресторан?")
+    assert len(journal) == 0 and journal.written == 0
+
+
+def test_overflow_dropped(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    journal = Journal(path, max_pending=1)
+    write(journal, "первый", "второй")
+    assert [record["text"] for record in read_journal(path)] == ["первый"]
+    assert journal.dropped == 1
+
+
+def test_rotation_keeps_backups(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    journal = Journal(path, max_bytes=1, backups=2)
+    for question in ("первый", "второй", "третий"):
+        write(journal, question)
+    assert journal.rotations == 3
+    assert len(rotated_files(path)) == 2
+    assert [record["text"] for record in read_journal(path)] == ["второй", "третий"]
+
+
+def test_broken_last_line_skipped(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    path.write_text('{"event":"question","text":"целая"}\n{"event":"quest', encoding="utf-8")
+    assert list(read_journal(str(path))) == [{"event": "question", "text": "целая"}]
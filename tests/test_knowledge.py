@@ -0,0 +1,48 @@
+import pytest
+
+from content import KNOWLEDGE_SECTIONS
+from knowledge import KnowledgeIndex, query_terms, strip_html
+
+
+@pytest.fixture(scope="module")
+def index():
+    return KnowledgeIndex.from_sections(KNOWLEDGE_SECTIONS)
+
+
+def test_query_terms():
+    # Вопросительные слова отброшены, синонимы приведены к словам справки
+    assert query_terms("Где взять кипятка?") == query_terms("взять кипяток")
+    assert query_terms("Есть ли вайфай?") == ["wi", "fi"]
+    assert query_terms("Где можно?") == []
+
+
+def test_strip_html():
+    assert strip_html("<b>🚭 КУРЕНИЕ:</b> <i>запрещено</i>") == "🚭 КУРЕНИЕ: запрещено"
+
+
+def test_confident_answer(index):
+    passage = index.answer("Где взять кипяток?")
+    assert passage.section == "faq" and "титан" in passage.text
+    # Синоним «покурить» находит блок о курении
+    passage = index.answer("Где можно покурить?")
+    assert passage.section == "info" and passage.text.startswith("🚭 КУРЕНИЕ")
+
+
+def test_no_answer_without_confidence(index):
+    # Два равноценных блока: отвечать должен GigaChat
+    assert index.answer("Есть ли вайфай?") is None
+    # Слова вопроса в справке не встречаются
+    assert index.answer("Сколько стоит билет до Луны?") is None
+    assert index.answer("Где можно?") is None
+
+
+def test_fallback_from_given_sections(index):
+    assert index.fallback("Есть ли вайфай?").section == "faq"
+    assert index.fallback("Где взять кипяток?", sections=("menu",)).section == "menu"
+    assert index.fallback("Как дела?") is None
+
+
+def test_context_lists_best_passages(index):
+    context = index.context("кипяток", limit=2)
+    assert context.count("\n\n") == 1
+    assert "[❓ ЧАСТЫЕ ВОПРОСЫ]" in context and "титан" in context
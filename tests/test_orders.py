@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from content import MENU_TEXT
+from orders import FoodMenu, OrderDesk
+
+
+@pytest.fixture(scope="module")
+def menu():
+    return FoodMenu.from_text(MENU_TEXT)
+
+
+def names(order):
+    return {item.name: quantity for item, quantity in order.lines}
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Хочу доширак и два кофе 3 в 1", {"Лапша Доширак (говядина)": 1, "Кофе 3 в 1": 2}),
+    ("Принесите, пожалуйста, x2 сухарики", {"Сухарики": 2}),
+    # Опечатка рядом с глаголом заказа
+    ("Хочу дширак", {"Лапша Доширак (говядина)": 1}),
+    ("пирожок и две колу", {"Пирожки (в ассортименте)": 1, "Coca-Cola 0.33л": 2}),
+])
+def test_orders(menu, text, expected):
+    assert names(menu.parse_order(text)) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "Хочу поменять место",
+    "хочу поменять место на нижнее",
+    "Мне нужно постельное бельё",
+    "Можно открыть окно",
+    "Дайте второе одеяло",
+    "Сколько стоит кофе?",
+    "Есть ли доширак",
+    # Без глагола и количества перечисление - вопрос о меню
+    "доширак",
+])
+def test_not_orders(menu, text):
+    assert menu.parse_order(text) is None
+
+
+def test_ambiguous_item_is_asked_back(menu):
+    order = menu.parse_order("Хочу кофе")
+    assert not order.lines
+    assert {item.name for item in order.ambiguous[0]} >= {"Кофе растворимый", "Кофе 3 в 1"}
+
+
+def test_desk_accepts_only_cars_with_a_conductor_chat():
+    desk = OrderDesk(bot=None, conductor_chats={7: -1007})
+    assert desk.accepts(7)
+    assert not desk.accepts(8)
+    assert not desk.accepts(None)
+    assert OrderDesk(bot=None, default_chat=-100).accepts(None)
+
+
+def test_call_goes_to_the_car_conductor_right_away(bot_api):
+    desk = OrderDesk(bot_api, conductor_chats={7: -1007}, default_chat=-100)
+    assert asyncio.run(desk.call("📞 Пассажир просит подойти", car=7, seat=24, passenger="Анна"))
+    assert bot_api.sent == [(-1007, "<b>📞 Пассажир просит подойти</b>\nвагон №7, место 24, Анна")]
+    assert desk.stats()["calls"] == 1
+
+
+def test_call_reports_failure(bot_api):
+    assert not asyncio.run(OrderDesk(bot_api).call("📞 Пассажир просит подойти", 7, 24))
+    bot_api.error = RuntimeError("Bot API недоступен")
+    assert not asyncio.run(OrderDesk(bot_api, default_chat=-100).call("📞 Пассажир просит подойти", 7, 24))
+
+
+def test_repeated_call_is_not_sent_again(bot_api, clock):
+    desk = OrderDesk(bot_api, default_chat=-100, call_cooldown=60, clock=clock)
+
+    async def press(request="📞 Пассажир просит подойти", user_id=1):
+        return await desk.call(request, 7, 24, passenger="Анна", user_id=user_id)
+
+    async def presses():
+        # Второе нажатие во время отправки первого
+        assert all(await asyncio.gather(press(), press()))
+        assert await press(user_id=2)
+        assert await press("🛏️ Пассажир просит бельё или полотенце")
+        clock.advance(60)
+        assert await press()
+
+    asyncio.run(presses())
+    assert len(bot_api.sent) == 4
+    assert desk.stats()["calls"] == 4 and desk.stats()["repeated_calls"] == 1
+
+
+def test_failed_call_can_be_repeated(bot_api):
+    bot_api.error = RuntimeError("Bot API недоступен")
+    desk = OrderDesk(bot_api, default_chat=-100)
+    assert not asyncio.run(desk.call("📞 Пассажир просит подойти", 7, 24, user_id=1))
+    bot_api.error = None
+    assert asyncio.run(desk.call("📞 Пассажир просит подойти", 7, 24, user_id=1))
@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+from telegram.error import RetryAfter
+
+from outbound import PRIORITY_BACKGROUND, OutboundQueue
+
+
+def run(queue, calls):
+    """Отправляет calls - список (endpoint, data, ключ) - через очередь и возвращает ключи в порядке отправки"""
+    order = []
+
+    async def callback(key):
+        order.append(key)
+
+    async def main():
+        await queue.initialize()
+        try:
+            tasks = []
+            for endpoint, data, key in calls:
+                tasks.append(asyncio.create_task(queue.process_request(callback, (key,), {}, endpoint, data, None)))
+                # Вызовы встают в очередь в заданном порядке
+                await asyncio.sleep(0)
+            await asyncio.wait_for(asyncio.gather(*tasks), 5)
+        finally:
+            await queue.shutdown()
+
+    asyncio.run(main())
+    return order
+
+
+def test_unlimited_endpoints_bypass_queue():
+    queue = OutboundQueue(global_rate=1e-3)
+    assert run(queue, [("sendMessage", {"chat_id": 1}, "первое"), ("answerCallbackQuery", {}, "кнопка")]) == [
+        "первое",
+        "кнопка",
+    ]
+    assert queue.stats() == {"sent": 1, "retries": 0, "failed": 0, "queued": 0}
+
+
+def test_interactive_calls_overtake_deletions():
+    queue = OutboundQueue(global_rate=50)
+    calls = [
+        ("sendMessage", {"chat_id": 1}, "первое"),
+        ("deleteMessages", {"chat_id": 2}, "удаление"),
+        ("sendMessage", {"chat_id": 3}, "ответ"),
+    ]
+    assert run(queue, calls) == ["первое", "ответ", "удаление"]
+
+
+def test_exhausted_chat_does_not_hold_others():
+    queue = OutboundQueue(global_rate=1000, global_burst=10, private_rate=5, private_burst=1)
+    calls = [
+        ("sendMessage", {"chat_id": 1}, "1а"),
+        ("sendMessage", {"chat_id": 1}, "1б"),
+        ("sendMessage", {"chat_id": 2}, "2а"),
+    ]
+    assert run(queue, calls) == ["1а", "2а", "1б"]
+
+
+def test_retry_after_pauses_and_repeats():
+    queue = OutboundQueue(global_rate=1000)
+    attempts = []
+
+    async def callback():
+        attempts.append(True)
+        if len(attempts) == 1:
+            raise RetryAfter(0.05)
+        return "отправлено"
+
+    async def main():
+        await queue.initialize()
+        try:
+            started = asyncio.get_running_loop().time()
+            result = await queue.process_request(callback, (), {}, "sendMessage", {"chat_id": 1}, None)
+            return result, asyncio.get_running_loop().time() - started
+        finally:
+            await queue.shutdown()
+
+    result, elapsed = asyncio.run(main())
+    assert result == "отправлено" and elapsed >= 0.05
+    assert queue.stats() == {"sent": 1, "retries": 1, "failed": 0, "queued": 0}
+
+
+def test_gives_up_after_max_retries():
+    queue = OutboundQueue(global_rate=1000, max_retries=1)
+
+    async def callback():
+        raise RetryAfter(0.01)
+
+    async def main():
+        await queue.initialize()
+        try:
+            await queue.process_request(
+                callback, (), {}, "deleteMessages", {"chat_id": 1}, {"priority": PRIORITY_BACKGROUND}
+            )
+        finally:
+            await queue.shutdown()
+
+    with pytest.raises(RetryAfter):
+        asyncio.run(main())
+    assert queue.stats() == {"sent": 0, "retries": 1, "failed": 1, "queued": 0}
@@ -0,0 +1,87 @@
+import asyncio
+from types import SimpleNamespace
+
+from processor import ChatUpdateProcessor
+
+
+def update(chat_id=None, user_id=None):
+    return SimpleNamespace(
+        effective_chat=SimpleNamespace(id=chat_id) if chat_id is not None else None,
+        effective_user=SimpleNamespace(id=user_id) if user_id is not None else None,
+    )
+
+
+def test_chat_updates_in_order_other_chats_in_parallel():
+    processor = ChatUpdateProcessor(max_concurrent_updates=8)
+    log = []
+
+    async def handle(name, delay):
+        log.append(f"{name} начало")
+        await asyncio.sleep(delay)
+        log.append(f"{name} конец")
+
+    async def main():
+        await asyncio.gather(
+            processor.process_update(update(1), handle("1а", 0.02)),
+            processor.process_update(update(1), handle("1б", 0)),
+            processor.process_update(update(2), handle("2а", 0)),
+        )
+
+    asyncio.run(main())
+    # Второе обновление чата 1 ждёт первое, чат 2 - нет
+    assert log.index("1а конец") < log.index("1б начало")
+    assert log.index("2а конец") < log.index("1а конец")
+    assert processor.stats() == {"processed": 3, "waited": 1, "chats": 0, "max_chats": 2, "max_depth": 2}
+    assert len(processor) == 0
+
+
+def test_chat_key():
+    assert ChatUpdateProcessor.chat_key(update(-100, 7)) == -100
+    # Нажатие в инлайн-сообщении: чата нет, порядок - по пассажиру
+    assert ChatUpdateProcessor.chat_key(update(user_id=7)) == ("user", 7)
+    assert ChatUpdateProcessor.chat_key(update()) is None
+
+
+def test_cancelled_update_does_not_break_queue():
+    processor = ChatUpdateProcessor()
+    log = []
+
+    async def handle(name, delay=0):
+        await asyncio.sleep(delay)
+        log.append(name)
+
+    async def main():
+        first = asyncio.create_task(processor.process_update(update(1), handle("первое", 0.02)))
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(processor.process_update(update(1), handle("отменённое")))
+        await asyncio.sleep(0)
+        third = asyncio.create_task(processor.process_update(update(1), handle("третье")))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        await asyncio.gather(first, waiting, third, return_exceptions=True)
+
+    asyncio.run(main())
+    assert log == ["первое", "третье"]
+    assert len(processor) == 0
+
+
+def test_update_after_cancelled_tail_still_waits():
+    processor = ChatUpdateProcessor()
+    log = []
+
+    async def handle(name, delay=0):
+        await asyncio.sleep(delay)
+        log.append(name)
+
+    async def main():
+        first = asyncio.create_task(processor.process_update(update(1), handle("первое", 0.02)))
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(processor.process_update(update(1), handle("отменённое")))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        await processor.process_update(update(1), handle("новое"))
+        await first
+
+    asyncio.run(main())
+    assert log == ["первое", "новое"]
@@ -0,0 +1,83 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from profiles import ProfileStore, parse_place
+
+
+@pytest.mark.parametrize("args, expected", [
+    (["7", "24"], (None, None, 7, 24)),
+    (["042А", "7", "24"], ("042А", None, 7, 24)),
+    (["15.10", "7", "24"], (None, "15.10", 7, 24)),
+    (["042А", "15.10", "7", "24"], ("042А", "15.10", 7, 24)),
+    (["15.10", "042А", "7", "24"], ("042А", "15.10", 7, 24)),
+])
+def test_parse_place(args, expected):
+    assert parse_place(args) == expected
+
+
+@pytest.mark.parametrize("args", [
+    ["7"], ["7", "место"], ["41", "1"], ["7", "121"], ["042А", "025Н", "7", "24"], ["1", "2", "3", "4", "5"],
+])
+def test_parse_place_rejects(args):
+    assert parse_place(args) is None
+
+
+def test_profiles_survive_restart(tmp_path):
+    path = str(tmp_path / "profiles.db")
+
+    async def save():
+        profiles = ProfileStore(path, clock=lambda: 1.0)
+        await profiles.start()
+        profiles.set(1, train="042А", trip="2026-10-15", car=7, seat=24)
+        profiles.set(2, train="042А", trip="2026-10-15", car=8, seat=1)
+        profiles.set(1, train="042А", trip="2026-10-15", car=7, seat=25)
+        await profiles.flush()
+        assert profiles.stats()["writes"] == 2 and profiles.stats()["pending"] == 0
+        profiles.set(3, train="025Н", trip="2026-10-16", car=1, seat=2)
+        # Несохранённые профили записываются при остановке
+        await profiles.stop()
+
+    asyncio.run(save())
+    profiles = ProfileStore(path)
+    profiles.load()
+    assert len(profiles) == 3
+    profile = profiles.get(1)
+    assert (profile.train, profile.trip, profile.car, profile.seat) == ("042А", "2026-10-15", 7, 25)
+    # Одна строка номера поезда и даты рейса на все профили
+    assert profiles.get(2).trip is profile.trip and profiles.get(2).train is profile.train
+    assert profiles.get(3).train == "025Н"
+
+
+def test_database_without_trip_column_is_migrated(tmp_path):
+    path = str(tmp_path / "profiles.db")
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE profiles (user_id INTEGER PRIMARY KEY, train TEXT, car INTEGER, seat INTEGER, updated REAL)")
+    db.execute("INSERT INTO profiles VALUES (1, '042А', 7, 24, 1.0)")
+    db.commit()
+    db.close()
+
+    profiles = ProfileStore(path)
+    profiles.load()
+    assert profiles.get(1).trip is None
+    profiles.set(1, train="042А", trip="2026-10-15", car=7, seat=24)
+    asyncio.run(profiles.stop())
+
+    reloaded = ProfileStore(path)
+    reloaded.load()
+    assert reloaded.get(1).trip == "2026-10-15"
+
+
+def test_passengers_of_current_trip_only():
+    profiles = ProfileStore(None)
+    profiles.set(1, train="042А", trip="2026-10-15", car=7, seat=24)
+    profiles.set(2, train="042А", trip="2026-10-13", car=7, seat=25)
+    profiles.set(3, train="042А", trip="2026-10-15", car=8, seat=1)
+    # Профиль без поезда - пассажир поезда по умолчанию
+    profiles.set(4, trip="2026-10-15", car=7, seat=26)
+    # Профиль без рейса (сохранён до появления рейсов) не получает объявлений
+    profiles.set(5, train="042А", car=7, seat=27)
+    assert profiles.passengers("042А", "2026-10-15", default_train="042А") == [1, 3, 4]
+    assert profiles.passengers("042А", "2026-10-15", car=7) == [1]
+    assert profiles.passengers("042А", "2026-10-13") == [2]
@@ -0,0 +1,33 @@
+import pytest
+
+from ratelimit import RateLimiter
+
+
+def test_passenger_burst_then_wait(clock):
+    limiter = RateLimiter(user_rate=0.5, user_burst=2, global_rate=100, global_burst=100, clock=clock)
+    assert limiter.acquire(1) == 0 and limiter.acquire(1) == 0
+    assert limiter.acquire(1) == pytest.approx(2.0)
+    # Другой пассажир не ждёт из-за первого
+    assert limiter.acquire(2) == 0
+    clock.advance(2)
+    assert limiter.acquire(1) == 0
+    assert limiter.stats() == {"users": 2, "allowed": 4, "throttled_user": 1, "throttled_global": 0}
+
+
+def test_global_limit_keeps_passenger_token(clock):
+    limiter = RateLimiter(user_rate=1, user_burst=1, global_rate=1, global_burst=1, clock=clock)
+    assert limiter.acquire(1) == 0
+    assert limiter.acquire(2) == pytest.approx(1.0)
+    clock.advance(1)
+    # Отказ по общей корзине не списал токен пассажира 2
+    assert limiter.acquire(2) == 0
+    assert limiter.stats()["throttled_global"] == 1
+
+
+def test_passengers_are_bounded(clock):
+    limiter = RateLimiter(user_rate=1e-3, user_burst=1, global_rate=1e9, global_burst=1000, max_users=10, clock=clock)
+    for user_id in range(100):
+        limiter.acquire(user_id)
+    assert limiter.stats()["users"] <= 10
+    # Недавний пассажир остался и по-прежнему ограничен
+    assert limiter.acquire(99) > 0
@@ -0,0 +1,77 @@
+import asyncio
+
+from scheduler import MAX_BATCH, DeletionScheduler
+
+
+def run(scheduler, actions, wait=0.1):
+    """Запускает планировщик, выполняет actions(scheduler) и ждёт wait секунд до остановки"""
+
+    async def main():
+        await scheduler.start()
+        actions(scheduler)
+        await asyncio.sleep(wait)
+        await scheduler.stop()
+
+    asyncio.run(main())
+
+
+def test_due_messages_deleted_in_one_call_per_chat(bot_api, tmp_path):
+    scheduler = DeletionScheduler(bot_api, str(tmp_path / "queue.json"), batch_window=1.0)
+
+    def actions(scheduler):
+        scheduler.schedule(1, 10, 0.01)
+        scheduler.schedule(2, 20, 0.02)
+        # Попадает в окно пачки вместе с первым сообщением чата
+        scheduler.schedule(1, 11, 0.5)
+        scheduler.schedule(1, 12, 60)
+
+    run(scheduler, actions)
+    assert sorted(bot_api.deleted) == [(1, [10, 11]), (2, [20])]
+    assert len(scheduler) == 1
+    assert (scheduler.deleted, scheduler.api_calls) == (3, 2)
+
+
+def test_rescheduled_and_cancelled_messages_stay(bot_api, tmp_path):
+    scheduler = DeletionScheduler(bot_api, str(tmp_path / "queue.json"), batch_window=0.01)
+
+    def actions(scheduler):
+        scheduler.schedule(1, 10, 0.01)
+        scheduler.schedule(1, 10, 60)
+        scheduler.schedule(1, 11, 0.01)
+        scheduler.cancel(1, 11)
+
+    run(scheduler, actions)
+    assert bot_api.deleted == []
+    assert len(scheduler) == 1
+
+
+def test_batches_split_at_api_limit(bot_api, tmp_path):
+    scheduler = DeletionScheduler(bot_api, str(tmp_path / "queue.json"))
+    run(scheduler, lambda scheduler: [scheduler.schedule(1, i, 0.01) for i in range(MAX_BATCH + 1)])
+    assert [len(ids) for _, ids in bot_api.deleted] == [MAX_BATCH, 1]
+    assert scheduler.deleted == MAX_BATCH + 1 and scheduler.api_calls == 2
+
+
+def test_failed_deletions_are_counted(bot_api, tmp_path):
+    bot_api.error = RuntimeError("Bot API недоступен")
+    scheduler = DeletionScheduler(bot_api, str(tmp_path / "queue.json"))
+    run(scheduler, lambda scheduler: scheduler.schedule(1, 10, 0.01))
+    assert scheduler.failed == 1 and len(scheduler) == 0
+
+
+def test_queue_survives_restart(bot_api, tmp_path):
+    path = str(tmp_path / "state" / "queue.json")
+
+    def actions(scheduler):
+        scheduler.schedule(1, 10, 0.2)
+        scheduler.schedule(2, 20, 60)
+        scheduler.cancel(2, 20)
+
+    scheduler = DeletionScheduler(bot_api, path)
+    run(scheduler, actions, wait=0)
+    assert bot_api.deleted == []
+
+    restored = DeletionScheduler(bot_api, path)
+    run(restored, lambda scheduler: None, wait=0.4)
+    assert bot_api.deleted == [(1, [10])]
+    assert len(restored) == 0
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+def test_identical_requests_share_one_call():
+    flights = SingleFlight()
+    calls = []
+
+    async def factory():
+        calls.append(True)
+        await asyncio.sleep(0.01)
+        return "ответ"
+
+    async def main():
+        first = asyncio.create_task(flights.run("кипяток", factory))
+        await asyncio.sleep(0)
+        assert "кипяток" in flights
+        return await asyncio.gather(first, flights.run("кипяток", factory), flights.run("бельё", factory))
+
+    results = asyncio.run(main())
+    assert results == [("ответ", True), ("ответ", False), ("ответ", True)]
+    assert len(calls) == 2
+    assert flights.stats() == {"in_flight": 0, "leaders": 2, "followers": 1}
+
+
+def test_error_reaches_every_waiter_and_is_not_kept():
+    flights = SingleFlight()
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("GigaChat недоступен")
+
+    async def main():
+        first = asyncio.create_task(flights.run("кипяток", failing))
+        await asyncio.sleep(0)
+        results = await asyncio.gather(first, flights.run("кипяток", failing), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+        async def answer():
+            return "ответ"
+
+        # Ошибка не запоминается: следующий вызов выполняет запрос заново
+        assert await flights.run("кипяток", answer) == ("ответ", True)
+
+    asyncio.run(main())
+    assert "кипяток" not in flights
+
+
+def test_cancelled_follower_does_not_cancel_the_request():
+    flights = SingleFlight()
+
+    async def factory():
+        await asyncio.sleep(0.02)
+        return "ответ"
+
+    async def main():
+        leader = asyncio.create_task(flights.run("кипяток", factory))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flights.run("кипяток", factory))
+        await asyncio.sleep(0)
+        follower.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+        return await leader
+
+    assert asyncio.run(main()) == ("ответ", True)
@@ -0,0 +1,30 @@
+import asyncio
+
+from streaming import MAX_MESSAGE_LENGTH, StreamStats, stream_to_message
+
+
+async def chunks(*parts):
+    for part in parts:
+        yield part
+
+
+def stream(message, *parts):
+    stats = StreamStats()
+    answer = asyncio.run(stream_to_message(message, chunks(*parts), "<b>AI:</b>\n", min_interval=0, stats=stats))
+    return stats, answer
+
+
+def test_edits_follow_the_text(new_message):
+    message = new_message()
+    stats, answer = stream(message, "Кипяток ", "в конце ", "вагона <3")
+    assert answer == "Кипяток в конце вагона &lt;3"
+    assert message.edits[-1] == "<b>AI:</b>\nКипяток в конце вагона &lt;3"
+    assert stats.answers == 1 and stats.edits == len(message.edits) == 4
+
+
+def test_unchanged_text_is_not_edited_again(new_message):
+    # Пустой фрагмент и текст сверх лимита длины не меняют показанное сообщение
+    message = new_message()
+    stream(message, "Кипяток", "", "я" * MAX_MESSAGE_LENGTH, "ещё")
+    assert len(message.edits) == 3
+    assert len(message.text) == MAX_MESSAGE_LENGTH
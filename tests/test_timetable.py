@@ -0,0 +1,71 @@
+from datetime import date, datetime
+
+from timetable import MSK, Timetable, Train
+
+# Рейс идёт три дня, а поезд отправляется каждый день: в пути сразу три рейса
+SPEC = {
+    "first_departure": "2026-10-01 10:00",
+    "period_days": 1,
+    "stops": [
+        {"station": "А", "km": 0, "depart": "0 10:00"},
+        {"station": "Б", "km": 1000, "arrive": "1 10:00", "depart": "1 10:30"},
+        {"station": "В", "km": 2000, "arrive": "2 22:00"},
+    ],
+}
+
+
+def at(day, hour, minute=0):
+    return datetime(2026, 10, day, hour, minute, tzinfo=MSK)
+
+
+def timetable(now):
+    return Timetable({"001А": Train("001А", SPEC)}, clock=lambda: now)
+
+
+def test_trips_in_progress_longer_than_period():
+    train = Train("001А", SPEC)
+    assert train.trips(at(10, 12)) == [at(10, 0), at(9, 0), at(8, 0)]
+
+
+def test_position_of_older_trip_reaches_end_of_route():
+    now = at(10, 12)
+    table = timetable(now)
+    newest = table.position("001А")
+    older = table.position("001А", "2026-10-08")
+    assert newest.trip_start == at(10, 0)
+    assert newest.km < 1000
+    # Рейс позавчерашнего дня на второй половине маршрута, а не на первой
+    assert older.trip_start == at(8, 0)
+    assert older.index == 1 and not older.standing
+    assert older.km > 1000
+
+
+def test_positions_cached_per_trip():
+    table = timetable(at(10, 12))
+    first = table.position("001А", "2026-10-09")
+    assert table.position("001А", "2026-10-09") is first
+    assert table.position("001А", "2026-10-08") is not first
+
+
+def test_find_trip_by_passenger_date():
+    table = timetable(at(10, 12))
+    assert table.find_trip("001А", "08.10") == "2026-10-08"
+    assert table.find_trip("001А", "8.10.2026") == "2026-10-08"
+    assert table.find_trip("001А", "11.10") == "2026-10-11"
+    # Рейс от 06.10 уже прибыл, до рейса от 12.10 больше суток, а «31.02» - не дата
+    assert table.find_trip("001А", "06.10") is None
+    assert table.find_trip("001А", "12.10") is None
+    assert table.find_trip("001А", "31.02") is None
+
+
+def test_is_over():
+    table = timetable(at(10, 12))
+    assert not table.is_over("001А", "2026-10-08")
+    assert table.is_over("001А", "2026-10-07")
+    assert table.is_over("001А", None)
+
+
+def test_trip_on_skips_days_without_departure():
+    train = Train("001А", {**SPEC, "period_days": 2})
+    assert train.trip_on(date(2026, 10, 3)) == at(3, 0)
+    assert train.trip_on(date(2026, 10, 4)) is None
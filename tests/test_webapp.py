@@ -0,0 +1,62 @@
+import asyncio
+import gzip
+
+import pytest
+
+import bot
+from content import SCREENS
+from httpserver import Request
+from webapp import Page, WebApp
+
+
+@pytest.fixture(scope="module")
+def app():
+    return WebApp.build(bot.TEMPLATES_DIR, SCREENS, prefix="/app/")
+
+
+def get(app, path, **headers):
+    request = Request("GET", path, {name.replace("_", "-"): value for name, value in headers.items()}, b"")
+    return asyncio.run(app.handler()(request))
+
+
+def test_sections_and_menu_built(app):
+    assert {"/app/", "/app/services", "/app/conductor", "/app/help.html"} <= set(app.pages)
+    # Экраны с живыми данными остаются в чате
+    assert "/app/my_train" not in app.pages and "/app/section.html" not in app.pages
+    menu = app.pages["/app/"].body.decode()
+    assert 'href="services"' in menu and "Услуги в поезде" in menu
+
+
+def test_compressed_for_accepting_client(app):
+    response = get(app, "/app/services", accept_encoding="gzip, deflate")
+    assert response.status == 200 and response.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.body) == app.pages["/app/services"].body
+    assert response.headers["ETag"] == app.pages["/app/services"].etag
+
+
+def test_not_modified_for_known_etag(app):
+    etag = app.pages["/app/services"].etag
+    views = app.stats()["views"]
+    for if_none_match in (etag, f'"другой", W/{etag}', "*"):
+        response = get(app, "/app/services", if_none_match=if_none_match)
+        assert response.status == 304 and response.body == b""
+    assert get(app, "/app/services", if_none_match='"другой"').status == 200
+    assert app.stats()["views"] == views + 1
+
+
+def test_refused_encoding_not_used():
+    page = Page("Справка " * 100)
+    assert page.encoded("gzip;q=0, identity") == (page.body, None)
+    assert page.encoded("*") == (page.gzip, "gzip")
+    assert page.encoded("") == (page.body, None)
+
+
+def test_brotli_preferred():
+    pytest.importorskip("brotli")
+    page = Page("Справка " * 100)
+    assert page.encoded("gzip, br")[1] == "br"
+
+
+def test_prefix_without_slash_redirects(app):
+    response = asyncio.run(app.redirect(Request("GET", "/app", {}, b"")))
+    assert response.status == 301 and response.headers["Location"] == "/app/"
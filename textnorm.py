@@ -0,0 +1,140 @@
+"""Нормализация русского текста: токены без пунктуации и эмодзи, стемминг"""
+import re
+from functools import lru_cache
+
+VOWELS = "аеиоуыэюя"
+
+
+def _by_length(*endings):
+    """Окончания от длинных к коротким: ищется самое длинное совпадение"""
+    return tuple(sorted(endings, key=len, reverse=True))
+
+
+PERFECTIVE_GERUND_1 = _by_length("вшись", "вши", "в")
+PERFECTIVE_GERUND_2 = _by_length("ившись", "ывшись", "ивши", "ывши", "ив", "ыв")
+REFLEXIVE = ("ся", "сь")
+ADJECTIVE = _by_length(
+    "ими", "ыми", "его", "ого", "ему", "ому", "ее", "ие", "ые", "ое", "ей", "ий", "ый",
+    "ой", "ем", "им", "ым", "ом", "их", "ых", "ую", "юю", "ая", "яя", "ою", "ею",
+)
+PARTICIPLE_1 = _by_length("ем", "нн", "вш", "ющ", "щ")
+PARTICIPLE_2 = _by_length("ивш", "ывш", "ующ")
+VERB_1 = _by_length("ла", "на", "ете", "йте", "ли", "й", "л", "ем", "н", "ло", "но", "ет", "ют", "ны", "ть", "ешь", "нно")
+VERB_2 = _by_length(
+    "ила", "ыла", "ена", "ейте", "уйте", "ите", "или", "ыли", "ей", "уй", "ил", "ыл", "им",
+    "ым", "ен", "ило", "ыло", "ено", "ят", "ует", "уют", "ит", "ыт", "ены", "ить", "ыть",
+    "ишь", "ую", "ю",
+)
+NOUN = _by_length(
+    "иями", "ями", "ами", "ией", "иям", "ием", "иях", "ев", "ов", "ие", "ье", "еи", "ии",
+    "ей", "ой", "ий", "ям", "ем", "ам", "ом", "ах", "ях", "ию", "ью", "ия", "ья",
+    "а", "е", "и", "й", "о", "у", "ы", "ь", "ю", "я",
+)
+SUPERLATIVE = ("ейше", "ейш")
+DERIVATIONAL = ("ость", "ост")
+
+# Слова-связки, не влияющие на смысл вопроса
+STOP_WORDS = frozenset((
+    "а", "и", "ну", "же", "ли", "бы", "вот", "пожалуйста", "подскажите", "скажите",
+    "здравствуйте", "привет", "извините",
+))
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def _regions(word):
+    """Границы областей RV и R2 алгоритма Snowball"""
+    rv = r1 = r2 = len(word)
+    for i, ch in enumerate(word):
+        if ch in VOWELS:
+            rv = i + 1
+            break
+    for i in range(1, len(word)):
+        if word[i] not in VOWELS and word[i - 1] in VOWELS:
+            r1 = i + 1
+            break
+    for i in range(r1 + 1, len(word)):
+        if word[i] not in VOWELS and word[i - 1] in VOWELS:
+            r2 = i + 1
+            break
+    return rv, r2
+
+
+def _strip(word, start, endings, after_a=False):
+    """Отрезает самое длинное окончание из списка, если оно лежит в области"""
+    for ending in endings:
+        if word.endswith(ending):
+            cut = len(word) - len(ending)
+            if cut < start:
+                continue
+            if after_a and (cut - 1 < start or word[cut - 1] not in "ая"):
+                continue
+            return word[:cut]
+    return None
+
+
+def _strip_any(word, start, group_1, group_2):
+    result = _strip(word, start, group_1, after_a=True)
+    candidate = _strip(word, start, group_2)
+    if candidate is not None and (result is None or len(candidate) < len(result)):
+        result = candidate
+    return result
+
+
+@lru_cache(maxsize=20000)
+def stem(word):
+    """Стемминг русского слова по алгоритму Snowball (Портер для русского языка)"""
+    word = word.lower().replace("ё", "е")
+    rv, r2 = _regions(word)
+
+    # Шаг 1: деепричастие, иначе возвратность и прилагательное/глагол/существительное
+    result = _strip_any(word, rv, PERFECTIVE_GERUND_1, PERFECTIVE_GERUND_2)
+    if result is None:
+        word = _strip(word, rv, REFLEXIVE) or word
+        result = _strip(word, rv, ADJECTIVE)
+        if result is not None:
+            result = _strip_any(result, rv, PARTICIPLE_1, PARTICIPLE_2) or result
+        else:
+            result = _strip_any(word, rv, VERB_1, VERB_2)
+            if result is None:
+                result = _strip(word, rv, NOUN)
+    if result is not None:
+        word = result
+
+    # Шаг 2
+    if word.endswith("и") and len(word) - 1 >= rv:
+        word = word[:-1]
+
+    # Шаг 3: словообразовательные суффиксы в R2
+    word = _strip(word, r2, DERIVATIONAL) or word
+
+    # Шаг 4
+    if word.endswith("нн") and len(word) - 1 >= rv:
+        word = word[:-1]
+    else:
+        superlative = _strip(word, rv, SUPERLATIVE)
+        if superlative is not None:
+            word = superlative
+            if word.endswith("нн"):
+                word = word[:-1]
+        elif word.endswith("ь") and len(word) - 1 >= rv:
+            word = word[:-1]
+    return word
+
+
+def tokenize(text):
+    """Слова в нижнем регистре без пунктуации и эмодзи"""
+    return _TOKEN_RE.findall(text.lower().replace("ё", "е"))
+
+
+def stems(text, drop_stop_words=True):
+    """Основы слов текста"""
+    return [
+        stem(token) for token in tokenize(text)
+        if not (drop_stop_words and token in STOP_WORDS)
+    ]
+
+
+def normalize_question(text):
+    """Нормализованная форма вопроса: «Где КИПЯТОК?? ♨️» -> «где кипяток»"""
+    return " ".join(stems(text))
@@ -0,0 +1,277 @@
+"""Положение поезда по расписанию: текущий перегон, следующая остановка и пройденный путь"""
+import json
+import logging
+from bisect import bisect_right
+from datetime import date, datetime, timedelta, timezone
+
+logger = logging.getLogger(__name__)
+
+# Расписания РЖД ведутся по московскому времени
+MSK = timezone(timedelta(hours=3), "МСК")
+
+# Буквы в номерах поездов, которые набирают латиницей
+_LATIN_TO_CYRILLIC = str.maketrans("AEKMHOPCTYX", "АЕКМНОРСТУХ")
+
+
+def trip_label(trip):
+    """«2026-10-15» -> «15.10»: дата рейса, как её пишут пассажиры"""
+    return f"{trip[8:10]}.{trip[5:7]}"
+
+
+def _offset(value):
+    """«Д ЧЧ:ММ» (день пути от даты отправления и московское время) -> секунды от полуночи дня отправления"""
+    day, clock = value.split()
+    hours, minutes = clock.split(":")
+    return int(day) * 86400 + int(hours) * 3600 + int(minutes) * 60
+
+
+class Stop:
+    """Остановка: станция, километр от начала маршрута и время от полуночи дня отправления"""
+
+    __slots__ = ("station", "short", "km", "tz", "arrive", "depart", "main", "amenities")
+
+    def __init__(self, spec):
+        self.station = spec["station"]
+        self.short = spec.get("short", self.station)
+        self.km = spec["km"]
+        # Разница с Москвой в часах, для местного времени
+        self.tz = spec.get("tz", 0)
+        self.arrive = _offset(spec["arrive"]) if "arrive" in spec else None
+        self.depart = _offset(spec["depart"]) if "depart" in spec else None
+        self.main = spec.get("main", False)
+        self.amenities = spec.get("amenities")
+
+    @property
+    def stay(self):
+        """Стоянка в секундах; у начальной и конечной станций - 0"""
+        if self.arrive is None or self.depart is None:
+            return 0
+        return self.depart - self.arrive
+
+
+class Position:
+    """Где поезд в момент now: стоит на станции stops[index] или едет от stops[index] к следующей"""
+
+    __slots__ = ("train", "now", "trip_start", "index", "standing", "km")
+
+    def __init__(self, train, now, trip_start, index, standing, km):
+        self.train = train
+        self.now = now
+        self.trip_start = trip_start
+        self.index = index
+        self.standing = standing
+        self.km = km
+
+    @property
+    def last(self):
+        """Станция, на которой поезд стоит или которую проехал последней"""
+        return self.train.stops[self.index]
+
+    @property
+    def next(self):
+        """Следующая остановка; None, если поезд прибыл на конечную"""
+        stops = self.train.stops
+        return stops[self.index + 1] if self.index + 1 < len(stops) else None
+
+    @property
+    def departed(self):
+        return self.now >= self.trip_start + timedelta(seconds=self.train.stops[0].depart)
+
+    @property
+    def arrived(self):
+        return self.next is None
+
+    @property
+    def progress(self):
+        """Доля пройденного пути, 0..1"""
+        return self.km / self.train.length if self.train.length else 1.0
+
+    @property
+    def remaining_km(self):
+        return self.train.length - self.km
+
+    def at(self, offset):
+        """Момент времени по смещению от полуночи дня отправления"""
+        return self.trip_start + timedelta(seconds=offset)
+
+    def local_time(self):
+        """Местное время в районе, где сейчас поезд"""
+        stop = self.last
+        return self.now.astimezone(MSK) + timedelta(hours=stop.tz)
+
+
+class Train:
+    """Поезд: номер, название и остановки; отправляется каждые period_days дней с first_departure"""
+
+    def __init__(self, number, spec):
+        self.number = number
+        self.name = spec.get("name", "")
+        self.stops = [Stop(stop) for stop in spec["stops"]]
+        if len(self.stops) < 2:
+            raise ValueError(f"У поезда {number} меньше двух остановок")
+        first = datetime.strptime(spec["first_departure"], "%Y-%m-%d %H:%M").replace(tzinfo=MSK)
+        # Отсчёт рейсов ведётся от полуночи дня отправления
+        self.first_day = first.replace(hour=0, minute=0)
+        self.period = timedelta(days=spec.get("period_days", 1))
+        self.length = self.stops[-1].km
+
+        # Отсортированные моменты прибытия и отправления для поиска бисекцией:
+        # у начальной станции прибытие совпадает с отправлением, у конечной - наоборот
+        self._arrivals = [stop.arrive if stop.arrive is not None else stop.depart for stop in self.stops]
+        self._departures = [stop.depart if stop.depart is not None else stop.arrive for stop in self.stops]
+        for previous, current in zip(self._departures, self._arrivals[1:]):
+            if current < previous:
+                raise ValueError(f"Расписание поезда {number} идёт не по порядку")
+
+    @property
+    def route(self):
+        return f"{self.stops[0].short} → {self.stops[-1].short}"
+
+    @property
+    def duration(self):
+        """От полуночи дня отправления до прибытия на конечную"""
+        return timedelta(seconds=self._arrivals[-1])
+
+    def trip_start(self, now):
+        """Полночь дня отправления последнего рейса, ушедшего не позже now"""
+        elapsed = now - self.first_day - timedelta(seconds=self.stops[0].depart)
+        trips = max(0, elapsed // self.period)
+        return self.first_day + trips * self.period
+
+    def trip_on(self, day):
+        """Полночь дня отправления рейса, уходящего в день day; None, если в этот день поезд не отправляется"""
+        start = datetime(day.year, day.month, day.day, tzinfo=MSK)
+        if start < self.first_day or (start - self.first_day) % self.period:
+            return None
+        return start
+
+    def trips(self, now):
+        """Рейсы в пути в момент now, от последнего ушедшего к самому раннему.
+
+        Рейс идёт дольше периода отправления (042А уходит раз в два дня и едет
+        почти шесть), поэтому в пути одновременно бывает несколько рейсов"""
+        trips = []
+        start = self.trip_start(now)
+        while start >= self.first_day and start + self.duration > now:
+            trips.append(start)
+            start -= self.period
+        return trips
+
+    def position(self, now, trip_start=None):
+        """Положение поезда на рейсе trip_start (по умолчанию - последнем ушедшем) в момент now"""
+        if trip_start is None:
+            trip_start = self.trip_start(now)
+        offset = (now - trip_start).total_seconds()
+        # Сколько станций поезд уже покинул
+        index = bisect_right(self._departures, offset)
+        if index == 0:
+            return Position(self, now, trip_start, 0, True, 0)
+        if index == len(self.stops):
+            return Position(self, now, trip_start, len(self.stops) - 1, True, self.length)
+        if offset >= self._arrivals[index]:
+            return Position(self, now, trip_start, index, True, self.stops[index].km)
+        # В пути между index-1 и index: километр пропорционален времени на перегоне
+        previous, current = self.stops[index - 1], self.stops[index]
+        share = (offset - self._departures[index - 1]) / (self._arrivals[index] - self._departures[index - 1])
+        return Position(self, now, trip_start, index - 1, False, previous.km + share * (current.km - previous.km))
+
+
+class Timetable:
+    """Поезда из файла расписаний; положение считается не чаще раза в минуту на рейс.
+
+    Рейс - дата отправления строкой «2026-10-15»: так он хранится в профиле
+    пассажира. Без рейса берётся последний ушедший."""
+
+    def __init__(self, trains, default=None, clock=None):
+        self.trains = trains
+        self.default = default if default in trains else next(iter(trains))
+        self.clock = clock or (lambda: datetime.now(MSK))
+        self.lookups = 0
+        self.hits = 0
+        self._minute = None
+        self._positions = {}
+
+    @classmethod
+    def load(cls, path, default=None):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        trains = {number: Train(number, spec) for number, spec in data["trains"].items()}
+        logger.info(f"🗺️ Расписание: поездов {len(trains)}, остановок {sum(len(t.stops) for t in trains.values())}")
+        return cls(trains, default or data.get("default"))
+
+    def train(self, number=None):
+        """Поезд по номеру; неизвестный номер - поезд по умолчанию"""
+        return self.trains.get(number) or self.trains[self.default]
+
+    def find(self, text):
+        """Номер поезда, как его пишут пассажиры («42а», «042A»), или None, если такого нет"""
+        # Латинская буква в номере выглядит так же, как кириллическая
+        wanted = text.strip().upper().translate(_LATIN_TO_CYRILLIC).lstrip("0")
+        for number in self.trains:
+            if number.upper().lstrip("0") == wanted:
+                return number
+        return None
+
+    def _trip_start(self, train, trip):
+        """Полночь дня отправления рейса trip; None - рейс не задан или поезд в этот день не уходил"""
+        if not trip:
+            return None
+        try:
+            return train.trip_on(date.fromisoformat(trip))
+        except ValueError:
+            return None
+
+    def trips(self, number=None):
+        """Рейсы поезда, которые сейчас в пути, от последнего ушедшего к раннему"""
+        return [start.date().isoformat() for start in self.train(number).trips(self.clock())]
+
+    def find_trip(self, number, text):
+        """Рейс по дате отправления, как её пишут пассажиры («15.10», «15.10.2026»), или None.
+
+        Без года берётся ближайшая к сегодняшнему дню дата. Не подходят прибывшие рейсы
+        и рейсы, до отправления которых больше суток"""
+        parts = text.strip().split(".")
+        if len(parts) not in (2, 3) or not all(part.isdigit() for part in parts):
+            return None
+        today = self.clock().date()
+        years = [int(parts[2])] if len(parts) == 3 else [today.year - 1, today.year, today.year + 1]
+        days = []
+        for year in years:
+            try:
+                days.append(date(year, int(parts[1]), int(parts[0])))
+            except ValueError:
+                continue
+        if not days:
+            return None
+        train = self.train(number)
+        start = train.trip_on(min(days, key=lambda day: abs(day - today)))
+        now = self.clock()
+        if start is None or start + train.duration <= now or start - now > timedelta(days=1):
+            return None
+        return start.date().isoformat()
+
+    def is_over(self, number, trip):
+        """Прибыл ли рейс на конечную; рейс не из расписания считается законченным"""
+        train = self.train(number)
+        start = self._trip_start(train, trip)
+        return start is None or start + train.duration <= self.clock()
+
+    def position(self, number=None, trip=None):
+        """Положение поезда на рейсе trip сейчас с точностью до минуты: пассажиры рейса делят один расчёт"""
+        now = self.clock().replace(second=0, microsecond=0)
+        self.lookups += 1
+        if now != self._minute:
+            self._minute = now
+            self._positions.clear()
+        train = self.train(number)
+        trip_start = self._trip_start(train, trip)
+        key = (train.number, trip_start)
+        position = self._positions.get(key)
+        if position is None:
+            position = self._positions[key] = train.position(now, trip_start)
+        else:
+            self.hits += 1
+        return position
+
+    def stats(self):
+        return {"trains": len(self.trains), "lookups": self.lookups, "hits": self.hits}
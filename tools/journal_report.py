@@ -0,0 +1,79 @@
+"""Разбор журнала вопросов: частые вопросы и чем на них ответил бот.
+
+Запуск из корня репозитория (читает и сжатые части журнала):
+    python -m tools.journal_report state/requests.jsonl --top 20
+
+Одинаковые по смыслу вопросы («Где кипяток?», «где КИПЯТОК») считаются
+вместе по нормализованной форме. Вопросы, на которые часто отвечал
+GigaChat, - кандидаты в разделы справки (content.KNOWLEDGE_SECTIONS)
+или в кэш с большим сроком жизни.
+"""
+import argparse
+import os
+from collections import Counter, defaultdict
+
+from journal import read_journal
+from textnorm import normalize_question
+
+
+def percentile(values, share):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))] if values else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", nargs="?", default=os.getenv("JOURNAL_PATH", "state/requests.jsonl"))
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--min-count", type=int, default=3, help="сколько раз вопрос должен встретиться")
+    args = parser.parse_args()
+
+    outcomes = defaultdict(list)
+    questions = defaultdict(Counter)
+    examples = {}
+    total = 0
+    for entry in read_journal(args.path):
+        if entry.get("event") != "question":
+            continue
+        total += 1
+        outcome = entry.get("outcome") or "unknown"
+        outcomes[outcome].append(entry.get("ms", 0))
+        key = normalize_question(entry.get("question", ""))
+        if key:
+            questions[key][outcome] += 1
+            examples.setdefault(key, entry["question"])
+
+    if not total:
+        print(f"В журнале {args.path} нет вопросов")
+        return
+
+    print(f"Вопросов: {total}, разных: {len(questions)}\n")
+    print(f"{'ответ':>10} {'вопросов':>9} {'доля':>7} {'p50, мс':>8} {'p95, мс':>8}")
+    for outcome, latencies in sorted(outcomes.items(), key=lambda item: -len(item[1])):
+        print(
+            f"{outcome:>10} {len(latencies):>9} {len(latencies) / total:7.1%} "
+            f"{percentile(latencies, 0.5):8.0f} {percentile(latencies, 0.95):8.0f}"
+        )
+
+    ranked = sorted(questions.items(), key=lambda item: -sum(item[1].values()))
+    print(f"\nЧастые вопросы (топ {args.top}):")
+    for key, counts in ranked[:args.top]:
+        asked = sum(counts.values())
+        local = counts["knowledge"] + counts["cache"] + counts["order"] + counts["order_refused"]
+        print(f"{asked:>7}  локально {local / asked:4.0%}  {examples[key]}")
+
+    # Вопросы, которые снова и снова уходят в GigaChat: справка или кэш сэкономили бы вызовы
+    candidates = [
+        (counts["gigachat"] + counts["shared"], key) for key, counts in ranked
+        if counts["gigachat"] + counts["shared"] >= args.min_count
+    ]
+    candidates.sort(reverse=True)
+    print(f"\nКандидаты в справку или кэш (GigaChat отвечал не меньше {args.min_count} раз):")
+    for count, key in candidates[:args.top]:
+        print(f"{count:>7}  {examples[key]}")
+    if not candidates:
+        print("    нет")
+
+
+if __name__ == "__main__":
+    main()
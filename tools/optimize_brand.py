@@ -0,0 +1,44 @@
+"""Сборка сжатого варианта логотипа для первой загрузки в Telegram.
+
+Запускается при сборке (например, в Build Command на Render):
+    pip install Pillow && python tools/optimize_brand.py
+
+Создаёт рядом с исходником assets/brand.opt.jpg - прогрессивный JPEG,
+его бот загружает вместо оригинала.
+
+Telegram всё равно ужимает фото до 1280 точек по длинной стороне,
+поэтому больший размер только удлиняет загрузку.
+"""
+import argparse
+import os
+import sys
+
+MAX_SIDE = 1280
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", nargs="?", default=os.getenv("BRAND_IMAGE_PATH", "assets/brand.jpg"))
+    parser.add_argument("--quality", type=int, default=82)
+    args = parser.parse_args()
+
+    try:
+        from PIL import Image
+    except ImportError:
+        print("❌ Нужен Pillow: pip install Pillow")
+        sys.exit(1)
+
+    root, _ = os.path.splitext(args.source)
+    image = Image.open(args.source).convert("RGB")
+    image.thumbnail((MAX_SIDE, MAX_SIDE))
+
+    jpeg_path = f"{root}.opt.jpg"
+    image.save(jpeg_path, "JPEG", quality=args.quality, optimize=True, progressive=True)
+
+    original = os.path.getsize(args.source)
+    size = os.path.getsize(jpeg_path)
+    print(f"✅ {jpeg_path}: {size} байт ({size / original:.0%} от {original} байт оригинала)")
+
+
+if __name__ == "__main__":
+    main()
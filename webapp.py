@@ -0,0 +1,154 @@
+"""Telegram Web App со справкой бота: страницы собираются и сжимаются один раз при запуске"""
+import gzip
+import hashlib
+import html
+import logging
+import os
+from string import Template
+
+from httpserver import Response
+
+try:
+    import brotli
+except ImportError:
+    # Brotli есть в requirements.txt; если его не удалось установить, браузер получит gzip
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Разделы меню бота, которые показываются в Web App; экраны с живыми данными
+# («Мой поезд», «Где мы сейчас») остаются в чате, справка - в templates/help.html
+SECTIONS = ("menu", "services", "info", "faq", "entertainment", "conductor")
+
+
+class Page:
+    """Готовый ответ: тело, сжатые варианты и ETag"""
+
+    __slots__ = ("body", "gzip", "brotli", "etag", "content_type")
+
+    def __init__(self, body, content_type="text/html; charset=utf-8"):
+        self.body = body.encode("utf-8") if isinstance(body, str) else body
+        self.content_type = content_type
+        self.etag = f'"{hashlib.sha1(self.body).hexdigest()[:20]}"'
+        # Сжатый вариант хранится, только если он меньше исходного
+        compressed = gzip.compress(self.body, compresslevel=9, mtime=0)
+        self.gzip = compressed if len(compressed) < len(self.body) else None
+        compressed = brotli.compress(self.body, quality=11) if brotli else None
+        self.brotli = compressed if compressed and len(compressed) < len(self.body) else None
+
+    def encoded(self, accept_encoding):
+        """(тело, Content-Encoding) для заголовка Accept-Encoding клиента"""
+        accepted = set()
+        for part in accept_encoding.split(","):
+            coding, _, params = part.partition(";")
+            # «gzip;q=0» - клиент явно отказывается от кодировки
+            _, _, quality = params.partition("q=")
+            try:
+                refused = quality.strip() and float(quality) == 0
+            except ValueError:
+                refused = False
+            if not refused:
+                accepted.add(coding.strip().lower())
+        if self.brotli and "br" in accepted:
+            return self.brotli, "br"
+        if self.gzip and ("gzip" in accepted or "*" in accepted):
+            return self.gzip, "gzip"
+        return self.body, None
+
+
+def telegram_html(text):
+    """Текст экрана бота (HTML Telegram с переводами строк) -> фрагмент веб-страницы"""
+    return text.strip().replace("\n", "<br>\n")
+
+
+def _titles(screens):
+    """Подписи кнопок меню: callback_data -> текст кнопки"""
+    titles = {}
+    for spec in screens.values():
+        for label, data in spec.get("buttons", ()):
+            titles.setdefault(data, label)
+    return titles
+
+
+class WebApp:
+    """Страницы Web App по путям; отвечает 304 на If-None-Match и отдаёт сжатые варианты"""
+
+    def __init__(self, pages, prefix="/app", max_age=3600):
+        self.pages = pages
+        self.prefix = prefix.rstrip("/")
+        self.cache_control = f"public, max-age={max_age}"
+        self.views = 0
+        self.not_modified = 0
+        self.bytes_sent = 0
+
+    @classmethod
+    def build(cls, templates_dir, screens, prefix="/app", max_age=3600, sections=SECTIONS):
+        """Разделы из content.SCREENS в шаблоне section.html, оглавление в menu.html
+        и остальные файлы templates/ как есть"""
+        prefix = prefix.rstrip("/")
+        titles = _titles(screens)
+        pages = {}
+        links = []
+        with open(os.path.join(templates_dir, "section.html"), encoding="utf-8") as f:
+            section = Template(f.read())
+        for key in sections:
+            spec = screens.get(key)
+            if spec is None or "dynamic" in spec:
+                continue
+            title = titles.get(key, key)
+            pages[f"{prefix}/{key}"] = Page(section.substitute(
+                title=html.escape(title), content=telegram_html(spec["text"])
+            ))
+            links.append(
+                f'    <a class="menu-item" href="{key}">\n'
+                f"        <h3>{html.escape(title)}</h3>\n"
+                "    </a>"
+            )
+        for name in sorted(os.listdir(templates_dir)):
+            if not name.endswith(".html") or name == "section.html":
+                continue
+            with open(os.path.join(templates_dir, name), encoding="utf-8") as f:
+                text = f.read()
+            if name == "menu.html":
+                pages[f"{prefix}/"] = Page(Template(text).substitute(sections="\n\n".join(links)))
+            else:
+                pages[f"{prefix}/{name}"] = Page(text)
+        app = cls(pages, prefix, max_age)
+        logger.info(
+            f"🌐 Web App: страниц {len(pages)}, {sum(len(page.body) for page in pages.values())} Б, "
+            f"сжатых {sum(len(page.brotli or page.gzip or page.body) for page in pages.values())} Б"
+        )
+        return app
+
+    def route(self, server):
+        """Регистрирует страницы на встроенном HTTP-сервере"""
+        handler = self.handler()
+        for path in self.pages:
+            server.route("GET", path, handler)
+            server.route("HEAD", path, handler)
+        # Без косой черты относительные ссылки оглавления вели бы мимо prefix
+        server.route("GET", self.prefix, self.redirect)
+
+    async def redirect(self, request):
+        return Response(301, headers={"Location": f"{self.prefix}/"})
+
+    def handler(self):
+        async def handle(request):
+            page = self.pages[request.path]
+            headers = {"ETag": page.etag, "Cache-Control": self.cache_control, "Vary": "Accept-Encoding"}
+            if_none_match = request.headers.get("if-none-match", "")
+            if if_none_match == "*" or page.etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")):
+                self.not_modified += 1
+                return Response(304, headers=headers, content_type=page.content_type)
+            body, encoding = page.encoded(request.headers.get("accept-encoding", ""))
+            if encoding:
+                headers["Content-Encoding"] = encoding
+            self.views += 1
+            self.bytes_sent += len(body)
+            return Response(200, body, headers=headers, content_type=page.content_type)
+
+        return handle
+
+    def stats(self):
+        return {"pages": len(self.pages), "views": self.views, "not_modified": self.not_modified,
+                "bytes_sent": self.bytes_sent}
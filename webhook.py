@@ -0,0 +1,74 @@
+"""Режим вебхука: Telegram присылает обновления на встроенный HTTP-сервер"""
+import asyncio
+import hmac
+import logging
+import signal
+
+from telegram import Update
+
+from httpserver import Response
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "x-telegram-bot-api-secret-token"
+
+
+def webhook_handler(application, secret):
+    """Обработчик POST от Telegram: проверка секрета и постановка обновления в очередь"""
+    expected = secret.encode("utf-8")
+
+    async def handle(request):
+        token = request.headers.get(SECRET_HEADER, "").encode("utf-8", "replace")
+        if not hmac.compare_digest(token, expected):
+            return Response(403, "forbidden")
+        try:
+            data = request.json()
+        except ValueError:
+            return Response(400, "bad json")
+        await application.update_queue.put(Update.de_json(data, application.bot))
+        return Response(200)
+
+    return handle
+
+
+def health_handler(application):
+    """Проверка живости для платформы хостинга"""
+
+    async def handle(request):
+        return Response.json({"status": "ok", "update_queue": application.update_queue.qsize()})
+
+    return handle
+
+
+async def serve_webhook(application, server, webhook_url, secret, host, port, allowed_updates, on_ready=None):
+    """Запускает приложение без Updater и принимает обновления через server до SIGTERM/SIGINT;
+    on_ready вызывается, когда сервер начал принимать вебхуки"""
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:
+            pass
+
+    await application.initialize()
+    if application.post_init:
+        await application.post_init(application)
+    await application.start()
+    try:
+        await application.bot.set_webhook(
+            url=webhook_url,
+            secret_token=secret,
+            allowed_updates=allowed_updates
+        )
+        bound_port = await server.start(host, port)
+        logger.info(f"🌐 Вебхук {webhook_url} принимается на {host}:{bound_port}")
+        if on_ready:
+            on_ready()
+        await stop_event.wait()
+    finally:
+        await server.stop()
+        await application.stop()
+        await application.shutdown()
+        if application.post_shutdown:
+            await application.post_shutdown(application)